@@ -11,13 +11,37 @@ from .behaviors import (
     raise_intentional_failure,
 )
 from .lib_list import (
+    ApproximateSubstraction,
+    BloomFilter,
+    FilterRules,
+    GlobSet,
+    JunkProcessingError,
+    ListView,
+    PathGlobSet,
+    SubstringIndex,
+    SubstringSet,
+    approximate_substract,
+    classify_contains,
+    classify_fnmatch,
+    cluster_near_duplicates,
     deduplicate,
     del_elements_containing,
+    del_elements_containing_any,
+    external_deduplicate,
+    external_substract,
     filter_contains,
+    filter_contains_any,
     filter_fnmatch,
+    filter_regex,
+    find_near_duplicates,
+    intersect_keep_order,
     is_element_containing,
+    is_element_containing_any,
     is_fnmatching,
     is_fnmatching_one_pattern,
+    is_sorted,
+    iter_deduplicate,
+    iter_junks,
     ls_del_empty_elements,
     ls_double_quote_if_contains_blank,
     ls_elements_replace_strings,
@@ -28,25 +52,59 @@ from .lib_list import (
     ls_strip_elements,
     ls_strip_list,
     ls_substract,
+    map_junks,
+    partition_balanced,
+    sorted_deduplicate,
+    sorted_intersect,
+    sorted_substract,
+    sorted_union,
+    split_by_weight,
     split_list_into_junks,
+    str_in_list_de_double_non_case_sensitive,
     str_in_list_lower_and_de_double,
     str_in_list_non_case_sensitive,
     str_in_list_to_lower,
     strip_and_add_non_empty_args_to_list,
     substract_all_keep_sorting,
     substract_all_unsorted_fast,
+    symmetric_difference,
+    union_keep_order,
 )
 
 __all__ = [
     "CANONICAL_GREETING",
+    "ApproximateSubstraction",
+    "BloomFilter",
+    "FilterRules",
+    "GlobSet",
+    "JunkProcessingError",
+    "ListView",
+    "PathGlobSet",
+    "SubstringIndex",
+    "SubstringSet",
+    "approximate_substract",
+    "classify_contains",
+    "classify_fnmatch",
+    "cluster_near_duplicates",
     "deduplicate",
     "del_elements_containing",
+    "del_elements_containing_any",
     "emit_greeting",
+    "external_deduplicate",
+    "external_substract",
     "filter_contains",
+    "filter_contains_any",
     "filter_fnmatch",
+    "filter_regex",
+    "find_near_duplicates",
+    "intersect_keep_order",
     "is_element_containing",
+    "is_element_containing_any",
     "is_fnmatching",
     "is_fnmatching_one_pattern",
+    "is_sorted",
+    "iter_deduplicate",
+    "iter_junks",
     "lib_list",
     "ls_del_empty_elements",
     "ls_double_quote_if_contains_blank",
@@ -58,14 +116,24 @@ __all__ = [
     "ls_strip_elements",
     "ls_strip_list",
     "ls_substract",
+    "map_junks",
     "noop_main",
+    "partition_balanced",
     "print_info",
     "raise_intentional_failure",
+    "sorted_deduplicate",
+    "sorted_intersect",
+    "sorted_substract",
+    "sorted_union",
+    "split_by_weight",
     "split_list_into_junks",
+    "str_in_list_de_double_non_case_sensitive",
     "str_in_list_lower_and_de_double",
     "str_in_list_non_case_sensitive",
     "str_in_list_to_lower",
     "strip_and_add_non_empty_args_to_list",
     "substract_all_keep_sorting",
     "substract_all_unsorted_fast",
+    "symmetric_difference",
+    "union_keep_order",
 ]
@@ -5,20 +5,69 @@ Purpose
     scripting tools while conforming to the repository's clean-code guidance.
 
 Contents
-    * Set-like helpers (:func:`deduplicate`, :func:`substract_all_unsorted_fast`).
-    * Filtering primitives (:func:`filter_contains`, :func:`filter_fnmatch`).
+    * Set-like helpers (:func:`deduplicate`, :func:`substract_all_unsorted_fast`,
+      :func:`intersect_keep_order`, ...).
+    * Filtering primitives (:func:`filter_contains`, :func:`filter_fnmatch`,
+      :func:`filter_regex`)
+      and their multi-needle variants backed by an Aho-Corasick automaton
+      (:class:`SubstringSet`, :func:`filter_contains_any`, ...).
+    * Persistent trigram index for repeated substring queries
+      (:class:`SubstringIndex`).
+    * Pre-compiled pattern matchers (:class:`GlobSet`) and single-pass
+      multi-pattern bucketing (:func:`classify_fnmatch`).
+    * Ordered include/exclude rule sets (:class:`FilterRules`) and ``**``-aware
+      path globbing over a segment trie (:class:`PathGlobSet`).
     * String trimming/quoting helpers (:func:`ls_strip_afz`, etc.).
-    * Chunking/normalisation utilities (:func:`split_list_into_junks`,
-      :func:`str_in_list_lower_and_de_double`).
+    * Chunking/normalisation utilities (:func:`iter_junks`,
+      :func:`split_list_into_junks`, zero-copy :class:`ListView` batches,
+      parallel :func:`map_junks`, size-capped :func:`split_by_weight`,
+      balanced :func:`partition_balanced`,
+      :func:`str_in_list_lower_and_de_double`,
+      :func:`str_in_list_de_double_non_case_sensitive`).
 
 Performance
     Unless otherwise noted, helpers iterate the input once (``O(n)``). The
     following are worth highlighting:
 
     * :func:`deduplicate` and :func:`substract_all_unsorted_fast` build a
-      ``set`` internally (``O(n)``) which also removes duplicate survivors.
-    * :func:`split_list_into_junks` walks the list once (``O(n)``) while keeping
-      references to the original slices.
+      ``set`` internally (``O(n)``) which also removes duplicate survivors;
+      ``deduplicate(keep_order=True)`` keeps first occurrences in the same
+      single pass and compares unhashable values through a canonical form.
+    * :func:`iter_deduplicate` streams any iterable; its ``"window"`` and
+      ``"bloom"`` modes (:class:`BloomFilter`) keep memory fixed.
+    * :func:`external_deduplicate` and :func:`external_substract` sort
+      budget-sized runs into temporary files and merge them lazily, so memory
+      stays bounded by ``max_items_in_memory``.
+    * :func:`approximate_substract` replaces ``set(subtrahend)`` with a
+      :class:`BloomFilter` of about 1.8 bytes per entry.
+    * The ``sorted_*`` helpers (:func:`sorted_substract`, ...) walk
+      pre-sorted inputs with two pointers and never hash.
+    * :func:`intersect_keep_order`, :func:`union_keep_order` and
+      :func:`symmetric_difference` hash every input list once.
+    * :func:`find_near_duplicates` and :func:`cluster_near_duplicates` bucket
+      MinHash signatures with locality-sensitive hashing instead of comparing
+      all ``n²`` pairs, and verify candidates with exact Jaccard similarity.
+    * :func:`ls_substract` counts the subtrahend once and compacts the
+      minuend in one ``O(n + m)`` pass, lists, dicts and sets included
+      (sorted merge for other unhashable values).
+    * :class:`GlobSet` classifies all patterns once: literals, ``*suffix`` and
+      ``prefix*`` shapes are answered by hash or :mod:`bisect` lookups, and
+      only the remaining patterns share one combined regular expression. The
+      glob helpers route single patterns through the same fast paths.
+    * :class:`SubstringSet` finds all of its needles with one scan per
+      element, independent of the number of needles.
+    * :class:`SubstringIndex` answers substring queries of three or more
+      characters by intersecting trigram posting lists instead of scanning.
+    * :func:`iter_junks` batches any iterable lazily in ``O(n)`` total;
+      :func:`split_list_into_junks` collects it and returns a list that fits
+      into one chunk without copying it. ``as_views=True`` yields
+      :class:`ListView` batches, one small object each instead of a copy.
+      :func:`map_junks` feeds the same lazy batches into an executor with a
+      bounded number of batches in flight. :func:`split_by_weight` packs by
+      summed weight in one pass, calling ``weight`` once per element.
+    * :func:`partition_balanced` assigns weighted elements with a heap
+      (``O(n log n)``) or finds the optimal contiguous cut by binary search
+      over prefix sums.
     * String trimming helpers operate element-wise in ``O(n)`` with small
       constants.
 
@@ -31,18 +80,65 @@ System Role
 
 from __future__ import annotations
 
+import array
+import bisect
+import collections
+import collections.abc
+import concurrent.futures
+import contextlib
 import fnmatch
+import hashlib
+import heapq
+import itertools
+import math
+import operator
+import os
+import pickle
+import re
 import sys
-from typing import Any
+import tempfile
+import unicodedata
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Literal, cast, overload
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator, Sequence
+    from typing import IO
+
+_UINT32_MAX = 0xFFFFFFFF
 
 __all__ = [
+    "ApproximateSubstraction",
+    "BloomFilter",
+    "FilterRules",
+    "GlobSet",
+    "JunkProcessingError",
+    "ListView",
+    "PathGlobSet",
+    "SubstringIndex",
+    "SubstringSet",
+    "approximate_substract",
+    "classify_contains",
+    "classify_fnmatch",
+    "cluster_near_duplicates",
     "deduplicate",
     "del_elements_containing",
+    "del_elements_containing_any",
+    "external_deduplicate",
+    "external_substract",
     "filter_contains",
+    "filter_contains_any",
     "filter_fnmatch",
+    "filter_regex",
+    "find_near_duplicates",
+    "intersect_keep_order",
     "is_element_containing",
+    "is_element_containing_any",
     "is_fnmatching",
     "is_fnmatching_one_pattern",
+    "is_sorted",
+    "iter_deduplicate",
+    "iter_junks",
     "ls_del_empty_elements",
     "ls_double_quote_if_contains_blank",
     "ls_elements_replace_strings",
@@ -53,35 +149,112 @@ __all__ = [
     "ls_strip_elements",
     "ls_strip_list",
     "ls_substract",
+    "map_junks",
+    "partition_balanced",
+    "sorted_deduplicate",
+    "sorted_intersect",
+    "sorted_substract",
+    "sorted_union",
+    "split_by_weight",
     "split_list_into_junks",
+    "str_in_list_de_double_non_case_sensitive",
     "str_in_list_lower_and_de_double",
     "str_in_list_non_case_sensitive",
     "str_in_list_to_lower",
     "strip_and_add_non_empty_args_to_list",
     "substract_all_keep_sorting",
     "substract_all_unsorted_fast",
+    "symmetric_difference",
+    "union_keep_order",
 ]
 
 
-def deduplicate(elements: list[Any]) -> list[Any]:
-    """Remove duplicate values without caring about order preservation.
+class _FrozenListTag:
+    """Marks a frozen list; a class rather than ``object()`` so it survives pickling."""
+
+
+class _FrozenDictTag:
+    """Marks a frozen dict; a class rather than ``object()`` so it survives pickling."""
+
+
+def _freeze(value: Any) -> Any:
+    """Return a hashable stand-in that compares equal exactly when ``value`` does.
+
+    Lists and dicts are tagged with private marker classes so a frozen list never
+    collides with a genuine tuple; sets become frozensets, which Python already
+    treats as equal to the matching set. Raises ``TypeError`` for unhashable
+    values of any other type.
+    """
+
+    if isinstance(value, list):
+        return (_FrozenListTag, tuple(_freeze(item) for item in cast("list[Any]", value)))
+    if isinstance(value, dict):
+        items = cast("dict[Any, Any]", value).items()
+        return (_FrozenDictTag, frozenset((item_key, _freeze(item_value)) for item_key, item_value in items))
+    if isinstance(value, (set, frozenset, tuple)):
+        frozen = (_freeze(item) for item in cast("Iterable[Any]", value))
+        return tuple(frozen) if isinstance(value, tuple) else frozenset(frozen)
+    hash(value)
+    return value
+
+
+def _deduplicate_stable(elements: list[Any], key: Callable[[Any], Any] | None) -> list[Any]:
+    """Keep the first occurrence of every element in one pass."""
+
+    seen: set[Any] = set()
+    unfreezable: list[Any] = []
+    result: list[Any] = []
+    for element in elements:
+        marker = element if key is None else key(element)
+        try:
+            hash(marker)
+        except TypeError:
+            try:
+                marker = _freeze(marker)
+            except TypeError:
+                if marker in unfreezable:
+                    continue
+                unfreezable.append(marker)
+                result.append(element)
+                continue
+        if marker in seen:
+            continue
+        seen.add(marker)
+        result.append(element)
+    return result
+
+
+def deduplicate(elements: list[Any], *, keep_order: bool = False, key: Callable[[Any], Any] | None = None) -> list[Any]:
+    """Remove duplicate values, optionally keeping first occurrences in order.
 
     Why
         CLI option parsing from the legacy project emitted repeated values; this
-        helper keeps downstream consumers resilient to that behaviour.
+        helper keeps downstream consumers resilient to that behaviour. JSON
+        payloads add unhashable dicts and lists, and callers that need a stable
+        order should not have to sort again afterwards.
 
     What
-        Converts the list into a ``set`` and back, ensuring each hashable value
-        appears at most once.
+        By default converts the list into a ``set`` and back. ``keep_order=True``
+        (or any ``key``) keeps the first occurrence of every value in a single
+        ``O(n)`` pass. Unhashable values never raise: lists, dicts, sets and
+        tuples are compared through a hashable canonical form, and anything
+        else falls back to an equality scan over the unhashable survivors.
 
     Parameters
         elements:
-            List of hashable items. The input list is returned unchanged when it
-            is empty.
+            List of items. The input list is returned unchanged when it is
+            empty.
+        keep_order:
+            Keep the first occurrence of every value in input order.
+        key:
+            Optional function evaluated once per element; elements with equal
+            keys are duplicates and the first one is kept. Implies
+            ``keep_order``.
 
     Returns
-        A list containing one instance of every unique element. Ordering follows
-        Python's ``set`` semantics and is therefore not guaranteed.
+        A list containing one instance of every unique element. Without
+        ``keep_order`` or ``key`` the ordering follows Python's ``set``
+        semantics and is therefore not guaranteed.
 
     Side Effects
         None.
@@ -95,14 +268,633 @@ def deduplicate(elements: list[Any]) -> list[Any]:
         ['a', 'b', 'c']
         >>> sorted(deduplicate(['x','x','x','y','y']))
         ['x', 'y']
+        >>> deduplicate(['b','a','c','b','a'], keep_order=True)
+        ['b', 'a', 'c']
+        >>> deduplicate(['Apple', 'apple', 'Berry'], key=str.lower)
+        ['Apple', 'Berry']
+        >>> deduplicate([{'id': 1}, [1, 2], {'id': 1}, [1, 2]], keep_order=True)
+        [{'id': 1}, [1, 2]]
     """
 
     if not elements:
         return []
-    return list(set(elements))
+    if key is None:
+        try:
+            return list(dict.fromkeys(elements)) if keep_order else list(set(elements))
+        except TypeError:
+            pass
+    return _deduplicate_stable(elements, key)
+
+
+_UINT64_MASK = 0xFFFFFFFFFFFFFFFF
+_DEDUPLICATE_MODES = ("exact", "window", "bloom")
+_DEFAULT_BLOOM_CAPACITY = 10_000_000
+
+
+def _hashable_marker(value: Any) -> Any:
+    """Return ``value`` itself when hashable, otherwise its canonical frozen form."""
+
+    try:
+        hash(value)
+    except TypeError:
+        return _freeze(value)
+    return value
+
+
+def _mix64(value: int) -> int:
+    """SplitMix64 finaliser: spread the bits of ``value`` over all 64 positions."""
+
+    value = (value + 0x9E3779B97F4A7C15) & _UINT64_MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _UINT64_MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _UINT64_MASK
+    return value ^ (value >> 31)
+
+
+class BloomFilter:
+    """Fixed-size probabilistic set answering "seen before?" with bounded error.
+
+    Why
+        An exact ``set`` grows with every distinct value; streams of hundreds
+        of millions of lines need membership tests whose memory is fixed up
+        front.
+
+    What
+        A bit array sized for ``capacity`` values at the requested
+        ``error_rate``. Each value sets ``hash_count`` bits derived from its
+        Python hash by double hashing. Membership answers never produce false
+        negatives; false positives occur at roughly ``error_rate`` once
+        ``capacity`` distinct values were added. Values are hashed with
+        :func:`hash`, so a filter is only meaningful inside one process.
+
+    Parameters
+        capacity:
+            Number of distinct values the filter is sized for (>= 1).
+        error_rate:
+            Target false-positive probability at ``capacity``, between 0 and 1.
+
+    Side Effects
+        None.
+
+    Examples
+        >>> seen = BloomFilter(1000, error_rate=0.01)
+        >>> seen.add('alpha')
+        False
+        >>> seen.add('alpha')
+        True
+        >>> 'alpha' in seen, 'beta' in seen
+        (True, False)
+        >>> len(seen), seen.hash_count, seen.size_in_bytes
+        (1, 7, 1199)
+    """
+
+    __slots__ = ("_bit_count", "_bits", "_capacity", "_count", "_error_rate", "_hash_count")
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        if capacity < 1:
+            msg = "capacity must be >= 1"
+            raise ValueError(msg)
+        if not 0 < error_rate < 1:
+            msg = "error_rate must be between 0 and 1"
+            raise ValueError(msg)
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._bit_count = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._hash_count = max(1, round(self._bit_count / capacity * math.log(2)))
+        self._bits = bytearray((self._bit_count + 7) // 8)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(capacity={self._capacity}, error_rate={self._error_rate})"
+
+    def __contains__(self, value: object) -> bool:
+        bits = self._bits
+        bit_count = self._bit_count
+        position, step = self._probe(value)
+        for _ in range(self._hash_count):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+            position = (position + step) % bit_count
+        return True
+
+    @property
+    def capacity(self) -> int:
+        """Number of distinct values the filter was sized for."""
+        return self._capacity
+
+    @property
+    def error_rate(self) -> float:
+        """Target false-positive probability at :attr:`capacity`."""
+        return self._error_rate
+
+    @property
+    def hash_count(self) -> int:
+        """Number of bits set per value."""
+        return self._hash_count
+
+    @property
+    def size_in_bytes(self) -> int:
+        """Size of the bit array."""
+        return len(self._bits)
+
+    @property
+    def estimated_error_rate(self) -> float:
+        """False-positive probability expected for the values added so far."""
+        return (1 - math.exp(-self._hash_count * self._count / self._bit_count)) ** self._hash_count
+
+    def _probe(self, value: object) -> tuple[int, int]:
+        """Return the first bit position of ``value`` and the stride between its positions."""
+        mixed = _mix64(hash(value) & _UINT64_MASK)
+        return mixed % self._bit_count, ((mixed >> 32) | 1) % self._bit_count or 1
+
+    def add(self, value: object) -> bool:
+        """Add ``value``; return ``True`` when it was (probably) present already."""
+        bits = self._bits
+        bit_count = self._bit_count
+        position, step = self._probe(value)
+        present = True
+        for _ in range(self._hash_count):
+            byte = position >> 3
+            mask = 1 << (position & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                present = False
+            position = (position + step) % bit_count
+        if not present:
+            self._count += 1
+        return present
+
+
+def _iter_deduplicate_exact(iterable: Iterable[Any], key: Callable[[Any], Any] | None) -> Iterator[Any]:
+    seen: set[Any] = set()
+    for element in iterable:
+        marker = _hashable_marker(element if key is None else key(element))
+        if marker not in seen:
+            seen.add(marker)
+            yield element
+
+
+def _iter_deduplicate_window(iterable: Iterable[Any], key: Callable[[Any], Any] | None, window: int) -> Iterator[Any]:
+    recent: collections.OrderedDict[Any, None] = collections.OrderedDict()
+    for element in iterable:
+        marker = _hashable_marker(element if key is None else key(element))
+        if marker in recent:
+            recent.move_to_end(marker)
+            continue
+        recent[marker] = None
+        if len(recent) > window:
+            recent.popitem(last=False)
+        yield element
+
+
+def _iter_deduplicate_bloom(iterable: Iterable[Any], key: Callable[[Any], Any] | None, seen: BloomFilter) -> Iterator[Any]:
+    for element in iterable:
+        if not seen.add(_hashable_marker(element if key is None else key(element))):
+            yield element
+
+
+def iter_deduplicate(
+    iterable: Iterable[Any],
+    *,
+    mode: str = "exact",
+    key: Callable[[Any], Any] | None = None,
+    window: int = 100_000,
+    bloom: BloomFilter | None = None,
+) -> Iterator[Any]:
+    """Lazily yield the first occurrence of every value of a stream.
+
+    Why
+        :func:`deduplicate` needs the whole list in memory. Log-derived streams
+        of hundreds of millions of lines must be deduplicated while they are
+        read, ideally with memory that does not grow with the stream.
+
+    What
+        A generator over any iterable that yields elements in input order and
+        drops repeats, comparing ``key(element)`` when ``key`` is given.
+        Unhashable values are compared through a canonical hashable form
+        (lists, dicts, sets). Three modes trade exactness for memory:
+
+        * ``"exact"`` remembers every distinct value (memory grows with the
+          number of distinct values, not with the stream length).
+        * ``"window"`` remembers the last ``window`` distinct values in LRU
+          order; a repeat refreshes its entry. Repeats further apart than the
+          window are yielded again. Memory is fixed.
+        * ``"bloom"`` records values in a :class:`BloomFilter` (by default
+          sized for ten million distinct values at a 0.1 % error rate, about
+          18 MB). Memory is fixed; a false positive drops a value that was
+          never seen, with probability of about the filter's ``error_rate``
+          once its ``capacity`` is reached.
+
+    Parameters
+        iterable:
+            Any iterable; it is consumed lazily.
+        mode:
+            ``"exact"``, ``"window"`` or ``"bloom"``.
+        key:
+            Optional function evaluated once per element.
+        window:
+            Number of distinct recent values remembered in ``"window"`` mode.
+        bloom:
+            Filter to record values in for ``"bloom"`` mode; pass your own to
+            choose capacity and error rate or to read
+            :attr:`BloomFilter.estimated_error_rate` afterwards.
+
+    Returns
+        An iterator over the retained elements.
+
+    Raises
+        ValueError: for an unknown ``mode``, a ``window`` below 1 or a
+        ``bloom`` filter outside ``"bloom"`` mode. Arguments are checked when
+        the function is called, not on first iteration.
+
+    Side Effects
+        Consumes ``iterable`` as the result is iterated.
+
+    Examples
+        >>> list(iter_deduplicate(['b', 'a', 'b', 'c', 'a']))
+        ['b', 'a', 'c']
+        >>> list(iter_deduplicate(['a', 'b', 'a', 'c', 'd', 'a'], mode='window', window=2))
+        ['a', 'b', 'c', 'd', 'a']
+        >>> list(iter_deduplicate(['x', 'X', 'y'], mode='bloom', bloom=BloomFilter(100), key=str.lower))
+        ['x', 'y']
+    """
+
+    if bloom is not None and mode != "bloom":
+        msg = "a bloom filter is only used with mode='bloom'"
+        raise ValueError(msg)
+    if mode == "exact":
+        return _iter_deduplicate_exact(iterable, key)
+    if mode == "window":
+        if window < 1:
+            msg = "window must be >= 1"
+            raise ValueError(msg)
+        return _iter_deduplicate_window(iterable, key, window)
+    if mode == "bloom":
+        return _iter_deduplicate_bloom(iterable, key, BloomFilter(_DEFAULT_BLOOM_CAPACITY) if bloom is None else bloom)
+    msg = f"unknown deduplicate mode {mode!r}; expected one of {', '.join(_DEDUPLICATE_MODES)}"
+    raise ValueError(msg)
+
+
+_SPILL_BLOCK_SIZE = 1024
+_MERGE_FAN_IN = 128
+_DEFAULT_MAX_ITEMS_IN_MEMORY = 1_000_000
+
+
+def _spill_run(records: list[Any], stack: contextlib.ExitStack, temp_dir: str | None, block_size: int = _SPILL_BLOCK_SIZE) -> IO[bytes]:
+    """Pickle ``records`` block by block into an anonymous temporary file."""
+
+    run = stack.enter_context(tempfile.TemporaryFile(dir=temp_dir))  # noqa: SIM115 - closed by the ExitStack
+    for start in range(0, len(records), block_size):
+        pickle.dump(records[start : start + block_size], run, protocol=pickle.HIGHEST_PROTOCOL)
+    run.seek(0)
+    return run
+
+
+def _read_run(run: IO[bytes]) -> Iterator[Any]:
+    while True:
+        try:
+            block: list[Any] = pickle.load(run)  # noqa: S301 - reads back a run this process just wrote
+        except EOFError:
+            return
+        yield from block
+
+
+def _merge_runs(runs: list[IO[bytes]], stack: contextlib.ExitStack, temp_dir: str | None, key: Callable[[Any], Any] | None, block_size: int) -> IO[bytes]:
+    """Merge sorted ``runs`` into one new run and close them."""
+
+    merged, _ = _spool(heapq.merge(*(_read_run(run) for run in runs), key=key), stack, temp_dir, block_size)
+    for run in runs:
+        run.close()
+    return merged
+
+
+def _external_sorted(records: Iterable[Any], *, max_items_in_memory: int, temp_dir: str | None, key: Callable[[Any], Any] | None = None) -> Iterator[Any]:
+    """External merge sort: sort budget-sized runs, spill them, merge lazily.
+
+    Everything stays in memory when the input fits into one run. Runs are
+    kept in levels: as soon as a level holds ``_MERGE_FAN_IN`` runs they are
+    merged into one run of the next level, and before the final lazy merge
+    the remaining runs are merged down to at most ``_MERGE_FAN_IN``, so the
+    number of open files stays bounded for any input size. Runs are pickled
+    in blocks of about ``max_items_in_memory / _MERGE_FAN_IN`` records, so the
+    blocks a merge holds, one per run, also fit into the budget.
+    """
+
+    block_size = max(1, min(_SPILL_BLOCK_SIZE, max_items_in_memory // _MERGE_FAN_IN))
+    with contextlib.ExitStack() as stack:
+        levels: list[list[IO[bytes]]] = [[]]
+
+        def add_run(run: IO[bytes]) -> None:
+            levels[0].append(run)
+            for level, level_runs in enumerate(levels):
+                if len(level_runs) < _MERGE_FAN_IN:
+                    break
+                if level + 1 == len(levels):
+                    levels.append([])
+                levels[level + 1].append(_merge_runs(level_runs, stack, temp_dir, key, block_size))
+                level_runs.clear()
+
+        buffer: list[Any] = []
+        for record in records:
+            buffer.append(record)
+            if len(buffer) >= max_items_in_memory:
+                buffer.sort(key=key)
+                add_run(_spill_run(buffer, stack, temp_dir, block_size))
+                buffer = []
+        buffer.sort(key=key)
+        if not any(levels):
+            yield from buffer
+            return
+        if buffer:
+            add_run(_spill_run(buffer, stack, temp_dir, block_size))
+            buffer = []
+        runs = [run for level_runs in levels for run in level_runs]
+        while len(runs) > _MERGE_FAN_IN:
+            runs = [*runs[_MERGE_FAN_IN:], _merge_runs(runs[:_MERGE_FAN_IN], stack, temp_dir, key, block_size)]
+        yield from heapq.merge(*(_read_run(run) for run in runs), key=key)
+
+
+def _hash_tagged(iterable: Iterable[Any], key: Callable[[Any], Any] | None) -> Iterator[tuple[int, int, Any, Any]]:
+    """Yield ``(hash, position, marker, element)`` records; sorting them groups equal markers."""
+
+    for position, element in enumerate(iterable):
+        marker = _hashable_marker(element if key is None else key(element))
+        yield hash(marker), position, marker, element
+
+
+def _in_input_order(survivors: Iterable[tuple[int, Any]], *, max_items_in_memory: int, temp_dir: str | None) -> Iterator[Any]:
+    """Restore input order of ``(position, element)`` survivors with a second external sort."""
+
+    for _, element in _external_sorted(survivors, max_items_in_memory=max_items_in_memory, temp_dir=temp_dir, key=operator.itemgetter(0)):
+        yield element
+
+
+def _validate_max_items_in_memory(max_items_in_memory: int) -> None:
+    if max_items_in_memory < 1:
+        msg = "max_items_in_memory must be >= 1"
+        raise ValueError(msg)
+
+
+def external_deduplicate(
+    iterable: Iterable[Any],
+    *,
+    key: Callable[[Any], Any] | None = None,
+    max_items_in_memory: int = _DEFAULT_MAX_ITEMS_IN_MEMORY,
+    temp_dir: str | None = None,
+) -> Iterator[Any]:
+    """Deduplicate an input larger than memory, keeping first occurrences in order.
 
+    Why
+        :func:`deduplicate` holds the list and a ``set`` of it in memory;
+        workers deduplicating inputs larger than RAM get OOM-killed.
+
+    What
+        Two external merge sorts under a memory budget. The first sorts
+        ``(hash, position)`` records into temporary runs so equal values become
+        adjacent and keeps the first occurrence of each; the second sorts the
+        survivors back into input order. Runs are pickled into anonymous
+        temporary files that are removed when the iterator is exhausted or
+        closed; at most 128 runs are merged at a time, so the number of open
+        files stays bounded. Inputs that fit into ``max_items_in_memory`` never touch the
+        disk. Unhashable values are compared through their canonical frozen
+        form, as in :func:`deduplicate`.
+
+    Parameters
+        iterable:
+            Any iterable of picklable values.
+        key:
+            Optional function evaluated once per element to decide equality.
+        max_items_in_memory:
+            Number of records buffered per sort run (>= 1).
+        temp_dir:
+            Directory for the temporary runs (defaults to :mod:`tempfile`'s).
+
+    Returns
+        An iterator over the retained elements in input order; write it to a
+        file with ``writelines`` to keep the result out of memory too.
+
+    Raises
+        ValueError: when ``max_items_in_memory`` is below 1 (at call time).
+
+    Side Effects
+        Creates and removes temporary files while the result is iterated.
+
+    Examples
+        >>> list(external_deduplicate(['b', 'a', 'b', 'c', 'a'], max_items_in_memory=2))
+        ['b', 'a', 'c']
+    """
+
+    _validate_max_items_in_memory(max_items_in_memory)
+
+    def survivors() -> Iterator[tuple[int, Any]]:
+        records = _external_sorted(_hash_tagged(iterable, key), max_items_in_memory=max_items_in_memory, temp_dir=temp_dir)
+        for _, group in itertools.groupby(records, key=operator.itemgetter(0)):
+            seen: list[Any] = []
+            for _, position, marker, element in group:
+                if marker not in seen:
+                    seen.append(marker)
+                    yield position, element
+
+    return _in_input_order(survivors(), max_items_in_memory=max_items_in_memory, temp_dir=temp_dir)
+
+
+def external_substract(
+    minuend: Iterable[Any],
+    subtrahend: Iterable[Any],
+    *,
+    key: Callable[[Any], Any] | None = None,
+    max_items_in_memory: int = _DEFAULT_MAX_ITEMS_IN_MEMORY,
+    temp_dir: str | None = None,
+) -> Iterator[Any]:
+    """Remove every occurrence of the subtrahend values from an input larger than memory.
+
+    Why
+        :func:`substract_all_keep_sorting` and
+        :func:`substract_all_unsorted_fast` hold both inputs plus a ``set`` in
+        memory, which fails for inputs larger than RAM.
+
+    What
+        Sorts the subtrahend by hash and the minuend by ``(hash, position)``
+        with budget-limited external merge sorts, walks both sorted streams
+        together to drop minuend values equal to any subtrahend value, and
+        sorts the survivors back into input order. The result matches
+        :func:`substract_all_keep_sorting`; chain :func:`external_deduplicate`
+        for the deduplicating behaviour of :func:`substract_all_unsorted_fast`.
+
+    Parameters
+        minuend:
+            Values to filter; any iterable of picklable values.
+        subtrahend:
+            Values to remove; any iterable of picklable values.
+        key:
+            Optional function applied to both sides to decide equality.
+        max_items_in_memory:
+            Number of records buffered per sort run (>= 1).
+        temp_dir:
+            Directory for the temporary runs (defaults to :mod:`tempfile`'s).
+
+    Returns
+        An iterator over the surviving minuend values in input order.
+
+    Raises
+        ValueError: when ``max_items_in_memory`` is below 1 (at call time).
+
+    Side Effects
+        Creates and removes temporary files while the result is iterated.
+
+    Examples
+        >>> list(external_substract(['a', 'b', 'c', 'a', 'd'], ['a', 'd', 'x'], max_items_in_memory=2))
+        ['b', 'c']
+    """
+
+    _validate_max_items_in_memory(max_items_in_memory)
+
+    def survivors() -> Iterator[tuple[int, Any]]:
+        removals = _external_sorted(
+            ((hash(marker), marker) for _, _, marker, _ in _hash_tagged(subtrahend, key)),
+            max_items_in_memory=max_items_in_memory,
+            temp_dir=temp_dir,
+            key=operator.itemgetter(0),
+        )
+        removal_groups = itertools.groupby(removals, key=operator.itemgetter(0))
+        removal_hash, removal_group = next(removal_groups, (None, iter(())))
+        records = _external_sorted(_hash_tagged(minuend, key), max_items_in_memory=max_items_in_memory, temp_dir=temp_dir)
+        for record_hash, group in itertools.groupby(records, key=operator.itemgetter(0)):
+            while removal_hash is not None and removal_hash < record_hash:
+                removal_hash, removal_group = next(removal_groups, (None, iter(())))
+            removed: set[Any] = {marker for _, marker in removal_group} if removal_hash == record_hash else set()
+            for _, position, marker, element in group:
+                if marker not in removed:
+                    yield position, element
+
+    return _in_input_order(survivors(), max_items_in_memory=max_items_in_memory, temp_dir=temp_dir)
+
+
+@dataclass(frozen=True)
+class ApproximateSubstraction:
+    """Outcome of :func:`approximate_substract` including its error report."""
+
+    survivors: list[Any]
+    removed: int
+    error_rate: float
+    estimated_error_rate: float
+    filter_bytes: int
+    false_positives: int | None = None
+
+
+def _spool(values: Iterable[Any], stack: contextlib.ExitStack, temp_dir: str | None, block_size: int = _SPILL_BLOCK_SIZE) -> tuple[IO[bytes], int]:
+    """Stream ``values`` into a pickled temporary file; return it rewound with the item count."""
+
+    spool = stack.enter_context(tempfile.TemporaryFile(dir=temp_dir))  # noqa: SIM115 - closed by the ExitStack
+    count = 0
+    for block in itertools.batched(values, block_size, strict=False):
+        pickle.dump(list(block), spool, protocol=pickle.HIGHEST_PROTOCOL)
+        count += len(block)
+    spool.seek(0)
+    return spool, count
+
+
+def approximate_substract(
+    minuend: Iterable[Any],
+    subtrahend: Iterable[Any],
+    *,
+    error_rate: float = 0.001,
+    verify: bool = False,
+    temp_dir: str | None = None,
+) -> ApproximateSubstraction:
+    """Subtract a huge exclusion list through a Bloom filter instead of a ``set``.
+
+    Why
+        :func:`substract_all_keep_sorting` builds ``set(subtrahend)``; for
+        exclusion lists of tens of millions of entries that set alone takes
+        gigabytes.
+
+    What
+        Streams ``subtrahend`` once into a :class:`BloomFilter` sized for its
+        length at ``error_rate`` (about 1.8 bytes per entry at the default
+        0.1 %, against several dozen for a ``set`` entry) and removes every
+        minuend element the filter reports as present, keeping order. Members
+        of the subtrahend are always removed; a non-member is wrongly removed
+        with probability ``error_rate``. With ``verify=True`` the removals are
+        only candidates: a second streaming pass over the subtrahend confirms
+        them exactly, so the result equals :func:`substract_all_keep_sorting`
+        and only the candidate values are held in a ``set``. Subtrahends that
+        are not sized collections are spooled to a temporary file so they can
+        be counted and replayed.
+
+    Parameters
+        minuend:
+            Values to filter.
+        subtrahend:
+            Values to remove; a sized collection is iterated directly,
+            anything else is spooled to disk first.
+        error_rate:
+            False-positive probability the filter is sized for.
+        verify:
+            Confirm every candidate removal against the subtrahend.
+        temp_dir:
+            Directory for the spool file (defaults to :mod:`tempfile`'s).
+
+    Returns
+        An :class:`ApproximateSubstraction` with the surviving elements, the
+        number removed, the configured and estimated error rates, the filter
+        size, and, when verifying, the number of false positives that were
+        restored.
+
+    Side Effects
+        May create and remove a temporary spool file.
+
+    Examples
+        >>> outcome = approximate_substract(['a', 'b', 'c', 'a', 'd'], ['a', 'd', 'x'], verify=True)
+        >>> outcome.survivors, outcome.removed
+        (['b', 'c'], 3)
+    """
 
-def del_elements_containing(elements: list[str], search_string: str) -> list[str]:
+    with contextlib.ExitStack() as stack:
+        if isinstance(subtrahend, collections.abc.Sized):
+            capacity = len(subtrahend)
+
+            def replay() -> Iterator[Any]:
+                return iter(subtrahend)
+        else:
+            spool, capacity = _spool(subtrahend, stack, temp_dir)
+
+            def replay() -> Iterator[Any]:
+                spool.seek(0)
+                return _read_run(spool)
+
+        bloom = BloomFilter(max(capacity, 1), error_rate)
+        for value in replay():
+            bloom.add(_hashable_marker(value))
+        estimated_error_rate = bloom.estimated_error_rate
+
+        retained: list[Any] = []
+        candidates: list[tuple[int, Any]] = []
+        for element in minuend:
+            marker = _hashable_marker(element)
+            if marker in bloom:
+                candidates.append((len(retained), marker))
+            retained.append(element)
+
+        if not verify:
+            rejected = {position for position, _ in candidates}
+            survivors = [element for position, element in enumerate(retained) if position not in rejected]
+            return ApproximateSubstraction(survivors, len(rejected), error_rate, estimated_error_rate, bloom.size_in_bytes)
+
+        candidate_markers = {marker for _, marker in candidates}
+        confirmed: set[Any] = set()
+        for value in replay():
+            marker = _hashable_marker(value)
+            if marker in candidate_markers:
+                confirmed.add(marker)
+        rejected = {position for position, marker in candidates if marker in confirmed}
+        survivors = [element for position, element in enumerate(retained) if position not in rejected]
+        return ApproximateSubstraction(survivors, len(rejected), error_rate, estimated_error_rate, bloom.size_in_bytes, len(candidates) - len(rejected))
+
+
+def del_elements_containing(elements: list[str], search_string: str, *, in_place: bool = False) -> list[str]:
     """Filter out strings that contain a forbidden substring.
 
     Why
@@ -119,12 +911,18 @@ def del_elements_containing(elements: list[str], search_string: str) -> list[str
             List of candidate strings; reused when the list is empty.
         search_string:
             Substring whose presence removes items from the result.
+        in_place:
+            Compact ``elements`` itself instead of building a new list:
+            survivors move toward the front block by block and the list is
+            truncated once, keeping peak memory near one list of references.
 
     Returns
-        A list comprising all strings that lack the given substring.
+        A list comprising all strings that lack the given substring;
+        ``elements`` itself when ``in_place`` is set.
 
     Side Effects
-        None; the input list is not mutated.
+        None unless ``in_place`` is set, in which case ``elements`` is
+        mutated.
 
     Examples
         >>> del_elements_containing(['a', 'abba', 'c'], 'b')
@@ -135,11 +933,58 @@ def del_elements_containing(elements: list[str], search_string: str) -> list[str
         ['a', 'abba', 'c']
         >>> del_elements_containing([], 'b')
         []
+        >>> items = ['a', 'abba', 'c']
+        >>> del_elements_containing(items, 'b', in_place=True) is items, items
+        (True, ['a', 'c'])
     """
     if not elements or not search_string:
         return elements
 
-    return [element for element in elements if search_string not in element]
+    def select(block: list[str]) -> list[str]:
+        return [element for element in block if search_string not in element]
+
+    if in_place:
+        return _compact_in_place(elements, select)
+    return select(elements)
+
+
+def del_elements_containing_any(elements: list[str], needles: Iterable[str] | SubstringSet) -> list[str]:
+    """Filter out strings that contain any of several forbidden substrings.
+
+    Why
+        Multi-needle counterpart of :func:`del_elements_containing` for
+        blacklists with thousands of entries.
+
+    What
+        Scans each element once with a :class:`SubstringSet` (Aho-Corasick)
+        and keeps the elements containing none of the needles. When either
+        argument is empty, the original list is returned untouched.
+
+    Parameters
+        elements:
+            List of candidate strings.
+        needles:
+            Substrings whose presence removes items, or a pre-built
+            :class:`SubstringSet` to reuse across calls.
+
+    Returns
+        A list comprising all strings that contain none of the needles.
+
+    Side Effects
+        None; the input list is not mutated.
+
+    Examples
+        >>> del_elements_containing_any(['a', 'abba', 'cd', 'e'], ['b', 'd'])
+        ['a', 'e']
+        >>> del_elements_containing_any(['a', 'b'], [])
+        ['a', 'b']
+    """
+    needle_set = _as_substring_set(needles)
+    if not elements or not needle_set:
+        return elements
+
+    search = needle_set.search
+    return [element for element in elements if not search(element)]
 
 
 def filter_contains(elements: list[Any], search_string: str) -> list[str]:
@@ -182,247 +1027,1899 @@ def filter_contains(elements: list[Any], search_string: str) -> list[str]:
     return [element for element in elements if isinstance(element, str) and search_string in element]
 
 
-def filter_fnmatch(elements: list[Any], search_pattern: str) -> list[str]:
-    """Return strings that satisfy an ``fnmatch`` pattern.
+def filter_contains_any(elements: list[Any], needles: Iterable[str] | SubstringSet) -> list[str]:
+    """Return string elements that contain at least one of several fragments.
 
     Why
-        File-globbing support in deployment scripts reused this helper to avoid
-        rewriting pattern checks throughout the codebase.
+        Multi-needle counterpart of :func:`filter_contains`.
 
     What
-        Applies :func:`fnmatch.fnmatch` to each string element and retains the
-        ones that match ``search_pattern``. Non-string entries are skipped.
+        Scans each string element once with a :class:`SubstringSet`
+        (Aho-Corasick) and keeps those containing any needle. Non-string
+        entries are ignored.
 
     Parameters
         elements:
-            Sequence of mixed values to inspect.
-        search_pattern:
-            Shell-style pattern understood by :mod:`fnmatch`.
+            Any list of mixed values.
+        needles:
+            Substrings to locate, or a pre-built :class:`SubstringSet`. An
+            empty collection matches nothing.
 
     Returns
-        List of matching string items. Empty input results in an empty list.
+        New list holding the matching string elements in input order.
 
     Side Effects
         None.
 
     Examples
-        >>> filter_fnmatch([], 'a*')
+        >>> filter_contains_any(['abcd', 'def', 'xyz', 1, None], ['bc', 'yz'])
+        ['abcd', 'xyz']
+        >>> filter_contains_any(['abc'], [])
         []
-        >>> filter_fnmatch(['abc', 'def', 1, None], 'a*')
-        ['abc']
     """
     if not elements:
-        return elements
+        return []
 
-    return [element for element in elements if isinstance(element, str) and fnmatch.fnmatch(element, search_pattern)]
+    search = _as_substring_set(needles).search
+    return [element for element in elements if isinstance(element, str) and search(element)]
 
 
-def is_element_containing(elements: list[str], search_string: str) -> bool:
-    """Report whether any string contains the requested fragment.
+class SubstringSet:
+    """Aho-Corasick automaton answering "does any needle occur" in one scan.
 
     Why
-        Provides the boolean probe used by older code paths to skip expensive
-        filesystem checks when a quick list scan suffices.
+        Looping :func:`filter_contains` or :func:`del_elements_containing` over
+        thousands of blacklisted substrings rescans every element once per
+        needle.
 
     What
-        Returns ``True`` if at least one element is a string that includes
-        ``search_string``. An empty list yields ``False``.
+        Builds a trie of all needles with failure and output links once. A
+        search then walks each text a single time, independent of the number
+        of needles, and either stops at the first hit (:meth:`search`) or
+        collects every needle that occurs (:meth:`find_all`). An empty needle
+        occurs in every string, exactly like ``'' in text``.
+
+    Parameters
+        needles:
+            Substrings to look for. The order is kept and exposed through
+            :attr:`needles`.
+
+    Side Effects
+        None; instances are immutable after construction.
+
+    Examples
+        >>> needles = SubstringSet(['he', 'she', 'hers'])
+        >>> needles.search('ushers')
+        True
+        >>> needles.find_all('ushers')
+        ['he', 'she', 'hers']
+        >>> needles.search('xyz')
+        False
+        >>> SubstringSet([]).search('anything')
+        False
+    """
+
+    __slots__ = ("_fail", "_goto", "_has_empty", "_hits", "_needles", "_output_link", "_outputs")
+
+    def __init__(self, needles: Iterable[str]) -> None:
+        self._needles: tuple[str, ...] = tuple(needles)
+        self._has_empty = "" in self._needles
+        goto: list[dict[str, int]] = [{}]
+        outputs: list[list[int]] = [[]]
+        for index, needle in enumerate(self._needles):
+            state = 0
+            for char in needle:
+                following = goto[state].get(char)
+                if following is None:
+                    following = len(goto)
+                    goto[state][char] = following
+                    goto.append({})
+                    outputs.append([])
+                state = following
+            if state:
+                outputs[state].append(index)
+        fail = [0] * len(goto)
+        output_link = [0] * len(goto)
+        queue = collections.deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in goto[state].items():
+                queue.append(child)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                target = goto[fallback].get(char, 0) if state else 0
+                fail[child] = target
+                output_link[child] = target if outputs[target] else output_link[target]
+        self._goto: tuple[dict[str, int], ...] = tuple(goto)
+        self._fail: tuple[int, ...] = tuple(fail)
+        self._outputs: tuple[tuple[int, ...], ...] = tuple(tuple(indices) for indices in outputs)
+        self._output_link: tuple[int, ...] = tuple(output_link)
+        self._hits: tuple[bool, ...] = tuple(bool(outputs[state]) or bool(output_link[state]) for state in range(len(goto)))
+
+    @property
+    def needles(self) -> tuple[str, ...]:
+        """Return the needles in the order they were supplied."""
+        return self._needles
+
+    def __len__(self) -> int:
+        return len(self._needles)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self._needles)!r})"
+
+    def _states(self, text: str) -> Iterator[int]:
+        """Yield the automaton state reached after every character of ``text``."""
+        goto, fail = self._goto, self._fail
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            yield state
+
+    def search(self, text: str) -> bool:
+        """Return ``True`` when at least one needle occurs in ``text``."""
+        if self._has_empty:
+            return True
+        hits = self._hits
+        return any(hits[state] for state in self._states(text))
+
+    def find_all_indices(self, text: str) -> list[int]:
+        """Return the ascending positions in :attr:`needles` of every needle occurring in ``text``."""
+        found: set[int] = set()
+        if self._has_empty:
+            found.update(index for index, needle in enumerate(self._needles) if not needle)
+        outputs, output_link, hits = self._outputs, self._output_link, self._hits
+        for state in self._states(text):
+            current = state
+            while hits[current]:
+                found.update(outputs[current])
+                current = output_link[current]
+        return sorted(found)
+
+    def find_all(self, text: str) -> list[str]:
+        """Return every needle occurring in ``text``, in needle order."""
+        return [self._needles[index] for index in self.find_all_indices(text)]
+
+
+_TRIGRAM_LENGTH = 3
+_TRIGRAM_INTERSECT_RATIO = 8
+
+
+class SubstringIndex:
+    """Trigram index answering repeated substring queries against one list.
+
+    Why
+        Running thousands of :func:`filter_contains` queries against the same
+        large inventory costs a full ``O(n)`` scan per query.
+
+    What
+        Snapshots the list once and records, for every trigram (three
+        consecutive characters), the positions of the string elements that
+        contain it. A query of three or more characters intersects the
+        posting lists of its trigrams, starting with the rarest, and verifies
+        the few remaining candidates with ``in``. Shorter queries fall back to
+        a plain scan. Results are identical to the module-level helpers.
 
     Parameters
         elements:
-            Values to inspect, typically strings.
-        search_string:
-            Substring to locate. Blank values treat empty strings as matches.
+            Values to index; non-string entries are kept for
+            :meth:`del_elements_containing` but never match.
+
+    Side Effects
+        None. Later changes to the source list are not reflected; build a new
+        index instead.
+
+    Examples
+        >>> index = SubstringIndex(['alpha', 'beta', 'alphabet', 1])
+        >>> index.filter_contains('alph')
+        ['alpha', 'alphabet']
+        >>> index.is_element_containing('bet')
+        True
+        >>> index.del_elements_containing('pha')
+        ['beta', 1]
+        >>> index.filter_contains('a')
+        ['alpha', 'beta', 'alphabet']
+    """
+
+    __slots__ = ("_elements", "_postings")
+
+    def __init__(self, elements: Iterable[Any]) -> None:
+        self._elements: list[Any] = list(elements)
+        typecode = "I" if len(self._elements) <= _UINT32_MAX else "Q"
+        self._postings: dict[str, array.array[int]] = {}
+        postings = self._postings
+        for position, element in enumerate(self._elements):
+            if isinstance(element, str):
+                for trigram in {element[offset : offset + _TRIGRAM_LENGTH] for offset in range(len(element) - _TRIGRAM_LENGTH + 1)}:
+                    posting = postings.get(trigram)
+                    if posting is None:
+                        posting = postings[trigram] = array.array(typecode)
+                    posting.append(position)
+
+    def __len__(self) -> int:
+        return len(self._elements)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(<{len(self._elements)} elements, {len(self._postings)} trigrams>)"
+
+    def _positions(self, search_string: str) -> Iterator[int]:
+        """Yield, in ascending order, the positions of string elements containing ``search_string``."""
+        elements = self._elements
+        if len(search_string) < _TRIGRAM_LENGTH:
+            return (position for position, element in enumerate(elements) if isinstance(element, str) and search_string in element)
+        trigrams = {search_string[offset : offset + _TRIGRAM_LENGTH] for offset in range(len(search_string) - _TRIGRAM_LENGTH + 1)}
+        postings: list[array.array[int]] = []
+        for trigram in trigrams:
+            posting = self._postings.get(trigram)
+            if posting is None:
+                return iter(())
+            postings.append(posting)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if len(posting) > _TRIGRAM_INTERSECT_RATIO * len(candidates):
+                break
+            candidates.intersection_update(posting)
+        return (position for position in sorted(candidates) if search_string in elements[position])
+
+    def filter_contains(self, search_string: str) -> list[str]:
+        """Return the string elements containing ``search_string`` (see :func:`filter_contains`)."""
+        elements = self._elements
+        return [elements[position] for position in self._positions(search_string)]
+
+    def is_element_containing(self, search_string: str) -> bool:
+        """Report whether any string element contains ``search_string`` (see :func:`is_element_containing`)."""
+        return next(self._positions(search_string), None) is not None
+
+    def del_elements_containing(self, search_string: str) -> list[Any]:
+        """Return the elements not containing ``search_string`` (see :func:`del_elements_containing`)."""
+        if not search_string:
+            return list(self._elements)
+        hits = set(self._positions(search_string))
+        return [element for position, element in enumerate(self._elements) if position not in hits]
+
+
+def _as_substring_set(needles: Iterable[str] | SubstringSet) -> SubstringSet:
+    """Reuse a pre-built :class:`SubstringSet` or compile ``needles`` into one."""
+    return needles if isinstance(needles, SubstringSet) else SubstringSet(needles)
+
+
+def classify_contains(elements: Iterable[Any], needles: Iterable[str] | SubstringSet) -> dict[str, list[str]]:
+    """Bucket string elements by every needle they contain.
+
+    Why
+        Reports which blacklist entries hit which elements without one
+        :func:`filter_contains` scan per needle.
+
+    What
+        Compiles the needles into one :class:`SubstringSet` and walks the
+        elements once. An element containing several needles lands in every
+        corresponding bucket. Non-string entries are skipped.
+
+    Parameters
+        elements:
+            Any iterable of mixed values; consumed once.
+        needles:
+            Substrings to look for, or a pre-built :class:`SubstringSet`.
 
     Returns
-        ``True`` when a matching string exists, otherwise ``False``.
+        Dictionary mapping every needle (in needle order) to the elements
+        containing it (in input order).
 
     Side Effects
         None.
 
     Examples
-        >>> is_element_containing([], '')
-        False
+        >>> classify_contains(['abc', 'bcd', 'xyz', 1], ['bc', 'y', 'q'])
+        {'bc': ['abc', 'bcd'], 'y': ['xyz'], 'q': []}
+    """
+    needle_set = _as_substring_set(needles)
+    buckets: list[list[str]] = [[] for _ in needle_set.needles]
+    for element in elements:
+        if isinstance(element, str):
+            for index in needle_set.find_all_indices(element):
+                buckets[index].append(element)
+    return dict(zip(needle_set.needles, buckets, strict=True))
 
-        >>> is_element_containing(['abcd', 'def', 1, None], '')
-        True
 
-        >>> is_element_containing(['abcd', 'def', 1, None], 'bc')
+_GLOB_SPECIAL_CHARS = frozenset("*?[")
+
+
+def _classify_glob(pattern: str) -> tuple[str, str]:
+    """Return the fast-path kind of ``pattern`` and the text it compares against.
+
+    Kinds are ``"any"`` (only ``*``), ``"literal"`` (no wildcard),
+    ``"suffix"`` (``*text``), ``"prefix"`` (``text*``) and ``"regex"`` for
+    everything that needs :func:`fnmatch.translate`.
+
+    >>> [_classify_glob(p) for p in ['*', 'a.txt', '*.log', 'build/*', 'a?c']]
+    [('any', ''), ('literal', 'a.txt'), ('suffix', '.log'), ('prefix', 'build/'), ('regex', 'a?c')]
+    """
+    if not _GLOB_SPECIAL_CHARS.intersection(pattern):
+        return "literal", pattern
+    if not pattern.strip("*"):
+        return "any", ""
+    if pattern[0] == "*" and not _GLOB_SPECIAL_CHARS.intersection(pattern[1:]):
+        return "suffix", pattern[1:]
+    if pattern[-1] == "*" and not _GLOB_SPECIAL_CHARS.intersection(pattern[:-1]):
+        return "prefix", pattern[:-1]
+    return "regex", pattern
+
+
+def _iter_prefix_hits(sorted_prefixes: list[str], name: str) -> Iterator[str]:
+    """Yield every entry of ``sorted_prefixes`` that ``name`` starts with, longest first.
+
+    Each bisection either finds a prefix or shortens the search key to the
+    part shared with the nearest smaller entry, so the loop ends after at most
+    ``len(name)`` steps without touching unrelated prefixes.
+
+    >>> list(_iter_prefix_hits(['a', 'ab', 'abc', 'b'], 'abd'))
+    ['ab', 'a']
+    """
+    key = name
+    while True:
+        position = bisect.bisect_right(sorted_prefixes, key)
+        if not position:
+            return
+        candidate = sorted_prefixes[position - 1]
+        if key.startswith(candidate):
+            yield candidate
+            if not candidate:
+                return
+            key = candidate[:-1]
+        else:
+            shared = next((index for index, (left, right) in enumerate(zip(key, candidate, strict=False)) if left != right), len(key))
+            key = key[:shared]
+
+
+def _glob_normalizer(*, case_sensitive: bool | None) -> Callable[[str], str] | None:
+    """Return the per-string normalisation for a glob case mode (``None`` = identity).
+
+    >>> _glob_normalizer(case_sensitive=True) is None
+    True
+    >>> _glob_normalizer(case_sensitive=False)('ABC')
+    'abc'
+    """
+    if case_sensitive is None:
+        return os.path.normcase if os.name == "nt" else None
+    if case_sensitive:
+        return None
+    return str.casefold
+
+
+def _as_glob_set(search_patterns: Iterable[str] | GlobSet, *, case_sensitive: bool | None) -> GlobSet:
+    """Reuse a pre-built :class:`GlobSet` or compile ``search_patterns`` into one."""
+    if isinstance(search_patterns, GlobSet):
+        return search_patterns
+    return GlobSet(search_patterns, case_sensitive=case_sensitive)
+
+
+class GlobSet:
+    """Compiled set of ``fnmatch`` patterns answering "does any pattern match".
+
+    Why
+        Checking thousands of include patterns against large path lists with
+        :func:`fnmatch.fnmatch` rescans every element once per pattern. A
+        ``GlobSet`` is built once and reused across calls and lists.
+
+    What
+        Classifies every pattern once. Literals become a hash lookup,
+        ``*suffix`` patterns a per-length suffix table and ``prefix*`` patterns
+        a sorted list searched with :mod:`bisect`. Only the remaining complex
+        patterns are translated with :func:`fnmatch.translate` and joined into
+        one alternation, so at most a single :meth:`re.Pattern.match` runs per
+        element.
+
+    Parameters
+        patterns:
+            Shell-style patterns understood by :mod:`fnmatch`. The order is
+            kept and exposed through :attr:`patterns`.
+        case_sensitive:
+            ``None`` (default) mirrors :func:`fnmatch.fnmatch` and applies
+            :func:`os.path.normcase`, which folds case on Windows only.
+            ``True`` follows :func:`fnmatch.fnmatchcase` on every platform and
+            never normalises elements. ``False`` casefolds the patterns once at
+            construction and every element once per match.
+
+    Side Effects
+        None; instances are immutable after construction.
+
+    Examples
+        >>> globs = GlobSet(['*.py', 'docs/*'])
+        >>> globs.match('setup.py')
+        True
+        >>> globs.match('README.md')
+        False
+        >>> globs.filter(['a.py', 'b.txt', 'docs/x', 1])
+        ['a.py', 'docs/x']
+        >>> GlobSet([]).match('anything')
+        False
+        >>> GlobSet(['*.TXT'], case_sensitive=True).match('a.txt')
+        False
+        >>> GlobSet(['*.TXT'], case_sensitive=False).match('a.txt')
         True
+    """
 
-        >>> is_element_containing(['abcd', 'def', 1, None], 'fg')
+    __slots__ = (
+        "_all_indices",
+        "_complex",
+        "_indices_regex",
+        "_literals",
+        "_normalize",
+        "_patterns",
+        "_prefix_indices",
+        "_prefixes",
+        "_regex",
+        "_suffixes",
+    )
+
+    def __init__(self, patterns: Iterable[str], *, case_sensitive: bool | None = None) -> None:
+        self._patterns: tuple[str, ...] = tuple(patterns)
+        self._normalize: Callable[[str], str] | None = _glob_normalizer(case_sensitive=case_sensitive)
+        self._all_indices: list[int] = []
+        self._literals: dict[str, list[int]] = {}
+        self._suffixes: dict[int, dict[str, list[int]]] = {}
+        self._prefix_indices: dict[str, list[int]] = {}
+        self._complex: dict[str, list[int]] = {}
+        for index, pattern in enumerate(self._patterns):
+            kind, text = _classify_glob(pattern if self._normalize is None else self._normalize(pattern))
+            if kind == "any":
+                self._all_indices.append(index)
+            elif kind == "literal":
+                self._literals.setdefault(text, []).append(index)
+            elif kind == "suffix":
+                self._suffixes.setdefault(len(text), {}).setdefault(text, []).append(index)
+            elif kind == "prefix":
+                self._prefix_indices.setdefault(text, []).append(index)
+            else:
+                self._complex.setdefault(text, []).append(index)
+        self._prefixes: list[str] = sorted(self._prefix_indices)
+        self._regex: re.Pattern[str] | None = None
+        if self._complex:
+            self._regex = re.compile("|".join(f"(?:{fnmatch.translate(pattern)})" for pattern in self._complex))
+        self._indices_regex: re.Pattern[str] | None = None
+
+    @property
+    def patterns(self) -> tuple[str, ...]:
+        """Return the patterns in the order they were supplied."""
+        return self._patterns
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self._patterns)!r})"
+
+    def match(self, element: str) -> bool:
+        """Return ``True`` when at least one pattern matches ``element``."""
+        if self._all_indices:
+            return True
+        name = element if self._normalize is None else self._normalize(element)
+        if name in self._literals:
+            return True
+        for length, suffixes in self._suffixes.items():
+            if name[-length:] in suffixes:
+                return True
+        if self._prefixes and next(_iter_prefix_hits(self._prefixes, name), None) is not None:
+            return True
+        return self._regex is not None and self._regex.match(name) is not None
+
+    def match_indices(self, element: str) -> list[int]:
+        """Return the ascending positions in :attr:`patterns` of every pattern matching ``element``.
+
+        Complex patterns are evaluated by one regular expression that wraps
+        each of them in an optional lookahead group, so a single
+        :meth:`re.Pattern.match` reports all of them at once.
+        """
+        name = element if self._normalize is None else self._normalize(element)
+        hits: list[int] = list(self._all_indices)
+        hits.extend(self._literals.get(name, ()))
+        for length, suffixes in self._suffixes.items():
+            hits.extend(suffixes.get(name[-length:], ()))
+        for prefix in _iter_prefix_hits(self._prefixes, name):
+            hits.extend(self._prefix_indices[prefix])
+        if self._complex:
+            matched = self._complex_indices_regex().match(name)
+            if matched is not None:
+                for group, indices in zip(matched.groups(), self._complex.values(), strict=True):
+                    if group is not None:
+                        hits.extend(indices)
+        hits.sort()
+        return hits
+
+    def _complex_indices_regex(self) -> re.Pattern[str]:
+        """Compile (once) the lookahead regex reporting every matching complex pattern."""
+        if self._indices_regex is None:
+            self._indices_regex = re.compile("".join(f"(?:(?=({fnmatch.translate(pattern)})))?" for pattern in self._complex))
+        return self._indices_regex
+
+    def filter(self, elements: Iterable[Any]) -> list[str]:
+        """Return the string elements matched by at least one pattern."""
+        return [element for element in elements if isinstance(element, str) and self.match(element)]
+
+
+class _PathGlobNode:
+    """One segment position inside the :class:`PathGlobSet` trie."""
+
+    __slots__ = ("child_nodes", "children", "globstar", "is_globstar", "matcher", "terminal")
+
+    def __init__(self, *, is_globstar: bool = False) -> None:
+        self.is_globstar = is_globstar
+        self.terminal = False
+        self.children: dict[str, _PathGlobNode] = {}
+        self.globstar: _PathGlobNode | None = None
+        self.matcher: GlobSet | None = None
+        self.child_nodes: tuple[_PathGlobNode, ...] = ()
+
+    @property
+    def is_live(self) -> bool:
+        """Return ``True`` when more segments can still lead to a match."""
+        return self.is_globstar or self.globstar is not None or bool(self.children)
+
+    def freeze(self, *, case_sensitive: bool | None) -> None:
+        """Compile the segment matcher of this node and all of its descendants."""
+        self.matcher = GlobSet(self.children, case_sensitive=case_sensitive) if self.children else None
+        self.child_nodes = tuple(self.children.values())
+        for child in self.child_nodes:
+            child.freeze(case_sensitive=case_sensitive)
+        if self.globstar is not None:
+            self.globstar.freeze(case_sensitive=case_sensitive)
+
+
+def _path_glob_closure(nodes: Iterable[_PathGlobNode]) -> frozenset[_PathGlobNode]:
+    """Add the ``**`` nodes reachable without consuming a segment."""
+    closed: set[_PathGlobNode] = set()
+    for node in nodes:
+        current: _PathGlobNode | None = node
+        while current is not None and current not in closed:
+            closed.add(current)
+            current = current.globstar
+    return frozenset(closed)
+
+
+def _path_glob_step(states: frozenset[_PathGlobNode], segment: str) -> frozenset[_PathGlobNode]:
+    """Consume one path segment from every active trie node."""
+    reached: list[_PathGlobNode] = []
+    for node in states:
+        if node.is_globstar:
+            reached.append(node)
+        if node.matcher is not None:
+            reached.extend(node.child_nodes[index] for index in node.matcher.match_indices(segment))
+    return _path_glob_closure(reached)
+
+
+class PathGlobSet:
+    """Path-aware glob set with ``**`` support, compiled into a segment trie.
+
+    Why
+        :func:`filter_fnmatch` treats paths as flat strings, so ``*`` crosses
+        ``/`` and ``src/**/test_*.py`` style patterns cannot be expressed.
+        Matching every pattern against every full path also scales with the
+        number of patterns.
+
+    What
+        Splits every pattern on ``/`` and inserts the segments into a trie;
+        ``**`` matches zero or more whole segments while ``*``, ``?`` and
+        ``[...]`` stay inside one segment. As in
+        :meth:`pathlib.PurePath.full_match` and ``.gitignore``, a trailing
+        ``**`` matches one or more segments, so ``build/**`` matches
+        everything inside ``build`` but not ``build`` itself. Each trie node answers all of its
+        child segments with one :class:`GlobSet`, so a path only visits the
+        branches its segments actually match. :meth:`filter` caches the trie
+        state per directory, so sibling files reuse the work done for their
+        parent and directories that no pattern can reach are rejected with a
+        single lookup.
+
+    Parameters
+        patterns:
+            ``/``-separated glob patterns. Convert Windows paths with
+            :meth:`pathlib.PurePath.as_posix` first.
+        case_sensitive:
+            Case mode for segment matching (see :class:`GlobSet`).
+
+    Side Effects
+        None; instances are immutable after construction.
+
+    Examples
+        >>> globs = PathGlobSet(['src/**/test_*.py', 'docs/*.md'])
+        >>> globs.match('src/pkg/sub/test_io.py')
+        True
+        >>> globs.match('src/test_io.py')
+        True
+        >>> globs.match('docs/api/index.md')
+        False
+        >>> PathGlobSet(['build/**']).match('build')
         False
+        >>> globs.can_match_below('build')
+        False
+        >>> globs.filter(['src/a/test_x.py', 'src/a/x.py', 'build/test_y.py', 'docs/i.md'])
+        ['src/a/test_x.py', 'docs/i.md']
     """
-    if not elements:
-        return False
 
-    return any(search_string in element for element in elements if isinstance(element, str))  # pyright: ignore[reportUnnecessaryIsInstance]
+    __slots__ = ("_patterns", "_root")
+
+    def __init__(self, patterns: Iterable[str], *, case_sensitive: bool | None = None) -> None:
+        self._patterns: tuple[str, ...] = tuple(patterns)
+        root = _PathGlobNode()
+        for pattern in self._patterns:
+            node = root
+            for segment in pattern.split("/"):
+                if segment == "**":
+                    if not node.is_globstar:
+                        if node.globstar is None:
+                            node.globstar = _PathGlobNode(is_globstar=True)
+                        node = node.globstar
+                else:
+                    node = node.children.setdefault(segment, _PathGlobNode())
+            if node.is_globstar:
+                node = node.children.setdefault("*", _PathGlobNode())
+            node.terminal = True
+        root.freeze(case_sensitive=case_sensitive)
+        self._root: frozenset[_PathGlobNode] = _path_glob_closure((root,))
+
+    @property
+    def patterns(self) -> tuple[str, ...]:
+        """Return the patterns in the order they were supplied."""
+        return self._patterns
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self._patterns)!r})"
+
+    def _directory_states(self, segments: Iterable[str]) -> frozenset[_PathGlobNode]:
+        states = self._root
+        for segment in segments:
+            if not states:
+                break
+            states = frozenset(node for node in _path_glob_step(states, segment) if node.is_live)
+        return states
+
+    def match(self, path: str) -> bool:
+        """Return ``True`` when at least one pattern matches the whole ``path``."""
+        *directories, name = path.split("/")
+        states = self._directory_states(directories)
+        return any(node.terminal for node in _path_glob_step(states, name))
+
+    def can_match_below(self, directory: str) -> bool:
+        """Return ``False`` when no pattern can match anything inside ``directory``.
+
+        Directory walkers use this to skip whole subtrees. An empty string
+        stands for the root.
+        """
+        return bool(self._directory_states(directory.split("/") if directory else ()))
+
+    def filter(self, elements: Iterable[Any]) -> list[str]:
+        """Return the string paths matched by at least one pattern, in input order."""
+        cache: dict[str, frozenset[_PathGlobNode]] = {}
+
+        def states_for(directory: str) -> frozenset[_PathGlobNode]:
+            states = cache.get(directory)
+            if states is None:
+                parent, separator, segment = directory.rpartition("/")
+                parent_states = states_for(parent) if separator else self._root
+                states = frozenset(node for node in _path_glob_step(parent_states, segment) if node.is_live) if parent_states else parent_states
+                cache[directory] = states
+            return states
+
+        matched: list[str] = []
+        for element in elements:
+            if not isinstance(element, str):
+                continue
+            directory, separator, name = element.rpartition("/")
+            states = states_for(directory) if separator else self._root
+            if states and any(node.terminal for node in _path_glob_step(states, name)):
+                matched.append(element)
+        return matched
+
+
+_FILTER_RULE_ACTIONS: dict[str, tuple[bool, bool]] = {
+    "include": (True, True),
+    "exclude": (False, True),
+    "include_containing": (True, False),
+    "exclude_containing": (False, False),
+}
+
+
+class FilterRules:
+    """Ordered include/exclude rule set evaluated in a single streaming pass.
 
+    Why
+        rsync/gitignore-style filtering built from chained
+        :func:`filter_fnmatch`, :func:`del_elements_containing` and
+        :func:`substract_all_keep_sorting` calls materialises one list per
+        stage and rescans the data each time.
 
-def is_fnmatching(elements: list[Any], search_pattern: str) -> bool:
-    """Return ``True`` when any element matches an ``fnmatch`` pattern.
+    What
+        Compiles the rules once. Consecutive rules with the same verdict are
+        merged into one block backed by a :class:`GlobSet` plus a
+        :class:`SubstringSet`, so an element is decided by at most one probe
+        per block.
+        With ``last_match_wins=False`` the first matching rule decides (rsync
+        order); with ``True`` the last matching rule decides (gitignore
+        order). Elements matched by no rule follow ``default_include``.
+
+    Parameters
+        rules:
+            ``(action, text)`` pairs in priority order. ``action`` is one of
+            ``"include"`` / ``"exclude"`` (``text`` is an ``fnmatch`` pattern)
+            or ``"include_containing"`` / ``"exclude_containing"`` (``text``
+            is a substring).
+        last_match_wins:
+            Pick the last instead of the first matching rule.
+        default_include:
+            Verdict for elements that no rule matches.
+        case_sensitive:
+            Case mode forwarded to the glob rules (see :class:`GlobSet`).
+
+    Raises
+        ValueError: when a rule uses an unknown action.
+
+    Side Effects
+        None; instances are immutable after construction.
+
+    Examples
+        >>> rules = FilterRules([('exclude_containing', '/.git/'), ('include', '*.py'), ('exclude', '*')])
+        >>> rules.filter(['src/a.py', 'src/.git/x.py', 'README.md', 7])
+        ['src/a.py']
+        >>> FilterRules([('exclude', '*.log'), ('include', 'keep.log')], last_match_wins=True).filter(['a.log', 'keep.log', 'b'])
+        ['keep.log', 'b']
+    """
+
+    __slots__ = ("_blocks", "_default_include", "_rules")
+
+    def __init__(
+        self,
+        rules: Iterable[tuple[str, str]],
+        *,
+        last_match_wins: bool = False,
+        default_include: bool = True,
+        case_sensitive: bool | None = None,
+    ) -> None:
+        self._rules: tuple[tuple[str, str], ...] = tuple(rules)
+        self._default_include = default_include
+        grouped: list[tuple[bool, list[str], list[str]]] = []
+        for action, text in self._rules:
+            if action not in _FILTER_RULE_ACTIONS:
+                msg = f"unknown filter rule action {action!r}; expected one of {sorted(_FILTER_RULE_ACTIONS)}"
+                raise ValueError(msg)
+            verdict, is_glob = _FILTER_RULE_ACTIONS[action]
+            if not grouped or grouped[-1][0] != verdict:
+                grouped.append((verdict, [], []))
+            _, globs, substrings = grouped[-1]
+            (globs if is_glob else substrings).append(text)
+        if last_match_wins:
+            grouped.reverse()
+        self._blocks: tuple[tuple[bool, GlobSet, SubstringSet], ...] = tuple(
+            (verdict, GlobSet(globs, case_sensitive=case_sensitive), SubstringSet(substrings)) for verdict, globs, substrings in grouped
+        )
+
+    @property
+    def rules(self) -> tuple[tuple[str, str], ...]:
+        """Return the ``(action, text)`` rules in the order they were supplied."""
+        return self._rules
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self._rules)!r})"
+
+    def is_included(self, element: str) -> bool:
+        """Return the verdict of the deciding rule for ``element``."""
+        for verdict, globs, substrings in self._blocks:
+            if globs.match(element) or substrings.search(element):
+                return verdict
+        return self._default_include
+
+    def iter_filter(self, elements: Iterable[Any]) -> Iterator[str]:
+        """Lazily yield the included string elements; non-strings are skipped."""
+        is_included = self.is_included
+        return (element for element in elements if isinstance(element, str) and is_included(element))
+
+    def filter(self, elements: Iterable[Any]) -> list[str]:
+        """Return the included string elements in input order."""
+        return list(self.iter_filter(elements))
+
+
+def classify_fnmatch(elements: Iterable[Any], search_patterns: list[str] | GlobSet, *, case_sensitive: bool | None = None) -> dict[str, list[str]]:
+    """Bucket string elements by every ``fnmatch`` pattern they satisfy.
 
     Why
-        Allows callers to guard path-heavy operations with a quick shell-style
-        glob check.
+        Sorting a file list into per-pattern buckets with
+        :func:`filter_fnmatch` rescans the whole list once per pattern.
 
     What
-        Evaluates :func:`fnmatch.fnmatch` for every string element and short
-        circuits on the first match.
+        Compiles the patterns into one :class:`GlobSet` and walks the elements
+        once, asking :meth:`GlobSet.match_indices` for all matching patterns of
+        each element. An element matching several patterns lands in every
+        corresponding bucket. Non-string entries are skipped.
 
     Parameters
         elements:
-            Mixed list of candidate values.
-        search_pattern:
-            Shell glob expression passed to :mod:`fnmatch`.
+            Any iterable of mixed values; consumed once.
+        search_patterns:
+            ``fnmatch``-compatible patterns, or a pre-built :class:`GlobSet`.
+        case_sensitive:
+            Case mode forwarded to :class:`GlobSet`; ignored when a
+            :class:`GlobSet` is passed.
 
     Returns
-        ``True`` when a matching string exists, otherwise ``False``.
+        Dictionary mapping every pattern (in pattern order) to the matching
+        elements (in input order). Patterns without matches map to an empty
+        list.
 
     Side Effects
         None.
 
     Examples
-        >>> is_fnmatching([], 'bc')
-        False
-        >>> is_fnmatching(['abcd', 'def', 1, None], '*bc*')
+        >>> classify_fnmatch(['a.py', 'b.txt', 'a.txt', 1], ['a*', '*.txt', '*.rs'])
+        {'a*': ['a.py', 'a.txt'], '*.txt': ['b.txt', 'a.txt'], '*.rs': []}
+        >>> classify_fnmatch([], ['*'])
+        {'*': []}
+    """
+    glob_set = _as_glob_set(search_patterns, case_sensitive=case_sensitive)
+    buckets: list[list[str]] = [[] for _ in glob_set.patterns]
+    for element in elements:
+        if isinstance(element, str):
+            for index in glob_set.match_indices(element):
+                buckets[index].append(element)
+    return dict(zip(glob_set.patterns, buckets, strict=True))
+
+
+def filter_fnmatch(elements: list[Any], search_pattern: str | GlobSet | PathGlobSet, *, case_sensitive: bool | None = None) -> list[str]:
+    """Return strings that satisfy an ``fnmatch`` pattern.
+
+    Why
+        File-globbing support in deployment scripts reused this helper to avoid
+        rewriting pattern checks throughout the codebase.
+
+    What
+        Applies :func:`fnmatch.fnmatch` semantics to each string element and
+        retains the ones that match ``search_pattern``. Non-string entries are
+        skipped. The pattern is compiled once through :class:`GlobSet`, so
+        literal, ``*suffix`` and ``prefix*`` patterns skip regex matching
+        entirely. A pre-built :class:`GlobSet` keeps the elements matching any
+        of its patterns; a :class:`PathGlobSet` switches to path-aware
+        matching where ``*`` stays inside one segment and ``**`` spans
+        directories.
+
+    Parameters
+        elements:
+            Sequence of mixed values to inspect.
+        search_pattern:
+            Shell-style pattern understood by :mod:`fnmatch`, or a
+            :class:`GlobSet` / :class:`PathGlobSet` holding several patterns.
+        case_sensitive:
+            ``None`` keeps :func:`fnmatch.fnmatch` behaviour, ``True`` matches
+            case-sensitively on every platform, ``False`` casefolds once per
+            element. Ignored when a pre-built set is passed.
+
+    Returns
+        List of matching string items. Empty input results in an empty list.
+
+    Side Effects
+        None.
+
+    Examples
+        >>> filter_fnmatch([], 'a*')
+        []
+        >>> filter_fnmatch(['abc', 'def', 1, None], 'a*')
+        ['abc']
+        >>> filter_fnmatch(['abc', 'def', 1, None], GlobSet(['a*', 'd*']))
+        ['abc', 'def']
+        >>> filter_fnmatch(['ABC', 'abc'], 'a*', case_sensitive=True)
+        ['abc']
+        >>> filter_fnmatch(['a/b.py', 'a/b/c.py'], PathGlobSet(['a/*.py']))
+        ['a/b.py']
+    """
+    if not elements:
+        return elements
+
+    if isinstance(search_pattern, PathGlobSet):
+        return search_pattern.filter(elements)
+
+    glob_set = _as_glob_set((search_pattern,) if isinstance(search_pattern, str) else search_pattern, case_sensitive=case_sensitive)
+    return glob_set.filter(elements)
+
+
+def filter_regex(elements: list[Any], pattern: str | re.Pattern[str]) -> list[str]:
+    """Return string elements in which a regular expression finds a match.
+
+    Why
+        Complements :func:`filter_contains` and :func:`filter_fnmatch` when a
+        substring or a shell glob cannot express the selection.
+
+    What
+        Keeps each string element for which :meth:`re.Pattern.search`
+        succeeds. Non-string entries are ignored.
+
+    Parameters
+        elements:
+            Any list of mixed values.
+        pattern:
+            Regular expression source or compiled pattern.
+
+    Returns
+        New list holding the matching string elements in input order.
+
+    Side Effects
+        None.
+
+    Examples
+        >>> filter_regex(['a1', 'b', 'c22', 3], r'\\d+')
+        ['a1', 'c22']
+        >>> filter_regex(['abc', 'xab', 'ab'], '^ab')
+        ['abc', 'ab']
+        >>> filter_regex([], 'a')
+        []
+    """
+    if not elements:
+        return []
+
+    compiled = re.compile(pattern)
+    return [element for element in elements if isinstance(element, str) and compiled.search(element)]
+
+
+def is_element_containing(elements: list[str], search_string: str) -> bool:
+    """Report whether any string contains the requested fragment.
+
+    Why
+        Provides the boolean probe used by older code paths to skip expensive
+        filesystem checks when a quick list scan suffices.
+
+    What
+        Returns ``True`` if at least one element is a string that includes
+        ``search_string``. An empty list yields ``False``.
+
+    Parameters
+        elements:
+            Values to inspect, typically strings.
+        search_string:
+            Substring to locate. Blank values treat empty strings as matches.
+
+    Returns
+        ``True`` when a matching string exists, otherwise ``False``.
+
+    Side Effects
+        None.
+
+    Examples
+        >>> is_element_containing([], '')
+        False
+
+        >>> is_element_containing(['abcd', 'def', 1, None], '')
+        True
+
+        >>> is_element_containing(['abcd', 'def', 1, None], 'bc')
+        True
+
+        >>> is_element_containing(['abcd', 'def', 1, None], 'fg')
+        False
+    """
+    if not elements:
+        return False
+
+    return any(search_string in element for element in elements if isinstance(element, str))  # pyright: ignore[reportUnnecessaryIsInstance]
+
+
+def is_element_containing_any(elements: list[str], needles: Iterable[str] | SubstringSet) -> bool:
+    """Report whether any string contains at least one of several fragments.
+
+    Why
+        Multi-needle counterpart of :func:`is_element_containing`.
+
+    What
+        Scans string elements with a :class:`SubstringSet` (Aho-Corasick) and
+        stops at the first element containing any needle.
+
+    Parameters
+        elements:
+            Values to inspect, typically strings.
+        needles:
+            Substrings to locate, or a pre-built :class:`SubstringSet`.
+
+    Returns
+        ``True`` when a matching string exists, otherwise ``False``.
+
+    Side Effects
+        None.
+
+    Examples
+        >>> is_element_containing_any(['abcd', 'def', 1, None], ['zz', 'ef'])
+        True
+        >>> is_element_containing_any(['abcd'], ['zz', 'yy'])
+        False
+        >>> is_element_containing_any([], ['a'])
+        False
+    """
+    if not elements:
+        return False
+
+    search = _as_substring_set(needles).search
+    return any(search(element) for element in elements if isinstance(element, str))  # pyright: ignore[reportUnnecessaryIsInstance]
+
+
+def is_fnmatching(elements: list[Any], search_pattern: str | GlobSet, *, case_sensitive: bool | None = None) -> bool:
+    """Return ``True`` when any element matches an ``fnmatch`` pattern.
+
+    Why
+        Allows callers to guard path-heavy operations with a quick shell-style
+        glob check.
+
+    What
+        Evaluates :func:`fnmatch.fnmatch` semantics for every string element
+        and short circuits on the first match. The pattern is compiled once
+        through :class:`GlobSet`, which answers simple pattern shapes without
+        regex matching.
+
+    Parameters
+        elements:
+            Mixed list of candidate values.
+        search_pattern:
+            Shell glob expression passed to :mod:`fnmatch`, or a pre-built
+            :class:`GlobSet`.
+        case_sensitive:
+            ``None`` keeps :func:`fnmatch.fnmatch` behaviour, ``True`` matches
+            case-sensitively on every platform, ``False`` casefolds once per
+            element. Ignored when a :class:`GlobSet` is passed.
+
+    Returns
+        ``True`` when a matching string exists, otherwise ``False``.
+
+    Side Effects
+        None.
+
+    Examples
+        >>> is_fnmatching([], 'bc')
+        False
+        >>> is_fnmatching(['abcd', 'def', 1, None], '*bc*')
         True
         >>> is_fnmatching(['abcd', 'def', 1, None], '*1*')
         False
+        >>> is_fnmatching(['ABCD'], '*bc*', case_sensitive=False)
+        True
+
+    """
+    if not elements:
+        return False
+
+    glob_set = _as_glob_set((search_pattern,) if isinstance(search_pattern, str) else search_pattern, case_sensitive=case_sensitive)
+    return any(glob_set.match(element) for element in elements if isinstance(element, str))
+
+
+def is_fnmatching_one_pattern(elements: list[Any], search_patterns: list[str] | GlobSet, *, case_sensitive: bool | None = None) -> bool:
+    """Check a list of patterns for at least one match within the elements.
+
+    Why
+        Bundled pattern checks reduce the boilerplate around nested ``if``/``or``
+        logic in legacy scripts.
+
+    What
+        Returns ``True`` if any pattern in ``search_patterns`` matches at least
+        one string in ``elements``. Empty inputs never match. The patterns are
+        compiled into a :class:`GlobSet` so every element is inspected once,
+        regardless of how many patterns are supplied.
+
+    Parameters
+        elements:
+            Values to test.
+        search_patterns:
+            ``fnmatch``-compatible patterns, or a pre-built :class:`GlobSet`
+            to reuse across calls; an empty list yields ``False``.
+        case_sensitive:
+            ``None`` keeps :func:`fnmatch.fnmatch` behaviour, ``True`` matches
+            case-sensitively on every platform, ``False`` casefolds once per
+            element. Ignored when a :class:`GlobSet` is passed.
+
+    Returns
+        Boolean indicating whether any pattern matched any string element.
+
+    Side Effects
+        None.
+
+    Examples
+        >>> is_fnmatching_one_pattern([], [])
+        False
+
+        >>> is_fnmatching_one_pattern(['abcd', 'def', 1, None], [])
+        False
+
+        >>> is_fnmatching_one_pattern(['abcd', 'def', 1, None], ['*bc*', '*fg*'])
+        True
+
+        >>> is_fnmatching_one_pattern(['abcd', 'def', 1, None], ['*fg*', '*gh*'])
+        False
+
+        >>> is_fnmatching_one_pattern(['abcd', 'def', 1, None], GlobSet(['*fg*', '*ef']))
+        True
+    """
+    if not elements or not search_patterns:
+        return False
+
+    glob_set = _as_glob_set(search_patterns, case_sensitive=case_sensitive)
+    return any(glob_set.match(element) for element in elements if isinstance(element, str))
+
+
+def _subtrahend_keys(subtrahend: Iterable[Any], key: Callable[[Any], Any] | None) -> set[Any]:
+    """Collect the comparison keys of ``subtrahend``, freezing unhashable ones."""
+
+    keys = subtrahend if key is None else map(key, subtrahend)
+    return {_hashable_marker(value) for value in keys}
+
+
+_COMPACT_BLOCK_SIZE = 65_536
+
+
+def _compact_in_place(elements: list[Any], select: Callable[[list[Any]], list[Any]]) -> list[Any]:
+    """Overwrite ``elements`` with its survivors front to back, then truncate once.
+
+    ``select(block)`` returns the survivors of one block of ``elements``.
+    Blocks are copied one at a time, so the extra memory is one block instead
+    of a second full list. Writing never overtakes reading, and if ``select``
+    raises, the stale gap between the two is deleted so the list keeps the
+    survivors so far followed by the unprocessed rest.
+    """
+
+    write = 0
+    read = 0
+    try:
+        while read < len(elements):
+            block = elements[read : read + _COMPACT_BLOCK_SIZE]
+            survivors = select(block)
+            elements[write : write + len(survivors)] = survivors
+            write += len(survivors)
+            read += len(block)
+    except BaseException:
+        del elements[write:read]
+        raise
+    del elements[write:]
+    return elements
+
+
+def _exclusion_select(subtrahend: list[Any], key: Callable[[Any], Any] | None) -> Callable[[list[Any]], list[Any]]:
+    """Build a block filter dropping values (or keys) found in ``subtrahend``.
+
+    Each block is tried with plain hashing first and redone through the
+    canonical frozen form when it contains an unhashable value.
+    """
+
+    try:
+        excluded = set(subtrahend) if key is None else set(map(key, subtrahend))
+    except TypeError:
+        excluded = _subtrahend_keys(subtrahend, key)
+
+    def select(block: list[Any]) -> list[Any]:
+        try:
+            if key is None:
+                return [element for element in block if element not in excluded]
+            return [element for element in block if key(element) not in excluded]
+        except TypeError:
+            if key is None:
+                return [element for element in block if _hashable_marker(element) not in excluded]
+            return [element for element in block if _hashable_marker(key(element)) not in excluded]
+
+    return select
+
+
+def substract_all_keep_sorting(minuend: list[Any], subtrahend: list[Any], *, key: Callable[[Any], Any] | None = None, low_memory: bool = False) -> list[Any]:
+    """Remove all occurrences of specific values while preserving order.
+
+    Why
+        Keeps deterministic ordering for consumers that compare results against
+        previously sorted state.
+
+    What
+        Mutates ``minuend`` in place by removing every occurrence of items that
+        appear in ``subtrahend``. With ``key``, records are compared by
+        ``key(record)``: the key is computed once per element, only the
+        subtrahend keys are stored, and the full minuend records are kept.
+        Unhashable values or keys are compared through their canonical frozen
+        form (keys are then computed a second time). By default the survivors
+        are collected into a new list that replaces the contents of
+        ``minuend``; ``low_memory=True`` compacts ``minuend`` in place instead,
+        moving survivors toward the front block by block and truncating once,
+        so peak memory stays near one list of references rather than two.
+
+    Parameters
+        minuend:
+            List to prune. Returned after mutation.
+        subtrahend:
+            Values whose occurrences should be removed.
+        key:
+            Optional function applied to the elements of both lists.
+        low_memory:
+            Compact ``minuend`` in place instead of building a second list.
+
+    Returns
+        The mutated ``minuend`` list for fluency.
+
+    Side Effects
+        ``minuend`` is modified in place.
+
+    Examples
+        >>> substract_all_keep_sorting([], ['a'])
+        []
+        >>> substract_all_keep_sorting(['a', 'a'], [])
+        ['a', 'a']
+
+        >>> my_l_minuend = ['a','a','b']
+        >>> my_l_subtrahend = ['a','c']
+        >>> substract_all_keep_sorting(my_l_minuend, my_l_subtrahend)
+        ['b']
+        >>> records = [{'id': 1, 'n': 'x'}, {'id': 2, 'n': 'y'}, {'id': 3, 'n': 'z'}]
+        >>> substract_all_keep_sorting(records, [{'id': 2}], key=lambda record: record['id'])
+        [{'id': 1, 'n': 'x'}, {'id': 3, 'n': 'z'}]
+        >>> substract_all_keep_sorting(['a', 'b', 'c', 'b'], ['b'], low_memory=True)
+        ['a', 'c']
+    """
+    if not minuend or not subtrahend:
+        return minuend
+
+    select = _exclusion_select(subtrahend, key)
+    if low_memory:
+        return _compact_in_place(minuend, select)
+    minuend[:] = select(minuend)
+    return minuend
+
+
+def substract_all_unsorted_fast(minuend: list[Any], subtrahend: list[Any], *, key: Callable[[Any], Any] | None = None) -> list[Any]:
+    """Return the set difference of two lists without keeping order.
+
+    Why
+        Provides a faster alternative to
+        :func:`substract_all_keep_sorting` when ordering is irrelevant.
+
+    What
+        Converts both lists into ``set`` objects (which also causes deduplication!), subtracts them, and emits a
+        new list with the remaining values. With ``key``, records are compared
+        by ``key(record)`` (computed once per element); the first record of
+        every surviving key is returned and only the subtrahend keys are
+        stored.
+
+    Parameters
+        minuend:
+            Source values.
+        subtrahend:
+            Values to remove.
+        key:
+            Optional function applied to the elements of both lists.
+
+    Returns
+        Fresh list containing the set difference.
+
+    Side Effects
+        None; the inputs are not modified.
+
+    Examples
+        >>> my_minuend = ['a','a','b']
+        >>> my_subtrahend = ['a','c']
+        >>> substract_all_unsorted_fast(my_minuend, my_subtrahend)
+        ['b']
+        >>> my_minuend = ['a','a','b']
+        >>> my_subtrahend = ['b']
+        >>> substract_all_unsorted_fast(my_minuend, my_subtrahend)
+        ['a']
+        >>> substract_all_unsorted_fast([('a', 1), ('b', 2), ('a', 3)], [('x', 2)], key=lambda pair: pair[1])
+        [('a', 1), ('a', 3)]
+
+    """
+    if not minuend:
+        return minuend
+
+    if key is None:
+        return list(set(minuend) - set(subtrahend))
+    try:
+        excluded = set(map(key, subtrahend))
+        survivors = _first_per_key(minuend, key, excluded)
+    except TypeError:
+        excluded = _subtrahend_keys(subtrahend, key)
+        survivors = _first_per_key(minuend, lambda element: _hashable_marker(key(element)), excluded)
+    return list(survivors.values())
+
+
+def _first_per_key(elements: list[Any], key: Callable[[Any], Any], excluded: set[Any]) -> dict[Any, Any]:
+    survivors: dict[Any, Any] = {}
+    for element in elements:
+        marker = key(element)
+        if marker not in excluded and marker not in survivors:
+            survivors[marker] = element
+    return survivors
+
+
+def _walk_sorted(elements: Iterable[Any], key: Callable[[Any], Any] | None, name: str) -> Iterator[tuple[Any, Any]]:
+    """Yield ``(key, element)`` pairs, raising ``ValueError`` once a key drops below its predecessor."""
+
+    iterator = iter(elements)
+    for first in iterator:
+        previous = first if key is None else key(first)
+        yield previous, first
+        for element in iterator:
+            current = element if key is None else key(element)
+            if current < previous:
+                msg = f"{name} is not sorted"
+                raise ValueError(msg)
+            previous = current
+            yield current, element
+
+
+def is_sorted(elements: Iterable[Any], *, key: Callable[[Any], Any] | None = None) -> bool:
+    """Report whether ``elements`` are in ascending order.
+
+    Why
+        The ``sorted_*`` helpers need sorted inputs; callers receiving data of
+        unknown provenance can check first instead of sorting defensively.
+
+    What
+        Compares each element with its predecessor using ``<`` only, stopping
+        at the first descent.
+
+    Parameters
+        elements:
+            Values to inspect.
+        key:
+            Optional function evaluated once per element.
+
+    Returns
+        ``True`` when no element is smaller than its predecessor.
+
+    Side Effects
+        None.
+
+    Examples
+        >>> is_sorted(['a', 'b', 'b', 'c'])
+        True
+        >>> is_sorted([3, 1, 2])
+        False
+        >>> is_sorted(['a', 'B'], key=str.lower)
+        True
+    """
+
+    try:
+        for _ in _walk_sorted(elements, key, "elements"):
+            pass
+    except ValueError:
+        return False
+    return True
+
+
+def sorted_substract(minuend: Iterable[Any], subtrahend: Iterable[Any], *, key: Callable[[Any], Any] | None = None) -> list[Any]:
+    """Remove every occurrence of the subtrahend values from a sorted minuend.
+
+    Why
+        :func:`substract_all_keep_sorting` hashes everything, even when both
+        lists are already sorted (directory listings, sorted exports), and
+        fails for unhashable values.
+
+    What
+        Walks both sorted inputs with two pointers using ``<`` comparisons
+        only: no hashing, ``O(n + m)`` time and ``O(1)`` extra memory besides
+        the result. Equal values are those where neither is smaller than the
+        other. Works for any mutually orderable values, hashable or not.
+
+    Parameters
+        minuend:
+            Ascending values to filter.
+        subtrahend:
+            Ascending values to remove.
+        key:
+            Optional function evaluated once per element of either input.
+
+    Returns
+        A new list with the surviving minuend values, still sorted.
+
+    Raises
+        ValueError: when an input turns out not to be sorted while walking it.
+
+    Side Effects
+        None; the inputs are not modified.
+
+    Examples
+        >>> sorted_substract(['a', 'b', 'b', 'c', 'd'], ['b', 'd', 'e'])
+        ['a', 'c']
+        >>> sorted_substract([[1], [2], [3]], [[2]])
+        [[1], [3]]
+    """
+
+    removals = _walk_sorted(subtrahend, key, "subtrahend")
+    removal = next(removals, None)
+    result: list[Any] = []
+    for current, element in _walk_sorted(minuend, key, "minuend"):
+        while removal is not None and removal[0] < current:
+            removal = next(removals, None)
+        if removal is None or current < removal[0]:
+            result.append(element)
+    return result
+
+
+def sorted_intersect(left: Iterable[Any], right: Iterable[Any], *, key: Callable[[Any], Any] | None = None) -> list[Any]:
+    """Keep the elements of a sorted list that also occur in another sorted list.
+
+    Why
+        Counterpart of :func:`sorted_substract` for pre-sorted inputs, without
+        building a ``set``.
+
+    What
+        Two-pointer walk with ``<`` comparisons only, ``O(n + m)`` time and
+        ``O(1)`` extra memory. Every occurrence in ``left`` whose value occurs
+        in ``right`` is kept, so ``sorted_intersect`` and
+        :func:`sorted_substract` partition ``left``.
+
+    Parameters
+        left:
+            Ascending values to filter.
+        right:
+            Ascending values to look up.
+        key:
+            Optional function evaluated once per element of either input.
+
+    Returns
+        A new sorted list with the matching elements of ``left``.
+
+    Raises
+        ValueError: when an input turns out not to be sorted while walking it.
+
+    Side Effects
+        None.
+
+    Examples
+        >>> sorted_intersect(['a', 'b', 'b', 'c', 'd'], ['b', 'd', 'e'])
+        ['b', 'b', 'd']
+    """
+
+    lookups = _walk_sorted(right, key, "right")
+    lookup = next(lookups, None)
+    result: list[Any] = []
+    for current, element in _walk_sorted(left, key, "left"):
+        while lookup is not None and lookup[0] < current:
+            lookup = next(lookups, None)
+        if lookup is None:
+            break
+        if not current < lookup[0]:
+            result.append(element)
+    return result
+
+
+def sorted_union(left: Iterable[Any], right: Iterable[Any], *, key: Callable[[Any], Any] | None = None) -> list[Any]:
+    """Merge two sorted lists into one sorted list of distinct values.
+
+    Why
+        Combining sorted exports should not require hashing or re-sorting.
+
+    What
+        Lazily merges both inputs (:func:`heapq.merge`) and keeps the first
+        element of every run of equal values; ``left`` wins ties.
+        ``O(n + m)`` time, ``O(1)`` extra memory besides the result.
+
+    Parameters
+        left / right:
+            Ascending values.
+        key:
+            Optional function evaluated once per element of either input.
+
+    Returns
+        A new sorted list without duplicates.
+
+    Raises
+        ValueError: when an input turns out not to be sorted while walking it.
+
+    Side Effects
+        None.
+
+    Examples
+        >>> sorted_union(['a', 'b', 'b', 'd'], ['b', 'c', 'd', 'e'])
+        ['a', 'b', 'c', 'd', 'e']
+    """
+
+    merged = heapq.merge(_walk_sorted(left, key, "left"), _walk_sorted(right, key, "right"), key=operator.itemgetter(0))
+    return _sorted_distinct(merged)
+
+
+def _sorted_distinct(pairs: Iterable[tuple[Any, Any]]) -> list[Any]:
+    result: list[Any] = []
+    previous: tuple[Any, Any] | None = None
+    for pair in pairs:
+        if previous is None or previous[0] < pair[0]:
+            result.append(pair[1])
+            previous = pair
+    return result
+
+
+def sorted_deduplicate(elements: Iterable[Any], *, key: Callable[[Any], Any] | None = None) -> list[Any]:
+    """Drop repeated values from a sorted list.
+
+    Why
+        :func:`deduplicate` hashes every element; for sorted inputs the
+        duplicates are adjacent, so one comparison per element suffices.
+
+    What
+        Keeps the first element of every run of equal values, comparing with
+        ``<`` only. ``O(n)`` time, ``O(1)`` extra memory besides the result;
+        works for unhashable but orderable values.
+
+    Parameters
+        elements:
+            Ascending values.
+        key:
+            Optional function evaluated once per element.
+
+    Returns
+        A new sorted list without duplicates.
+
+    Raises
+        ValueError: when the input turns out not to be sorted.
+
+    Side Effects
+        None.
+
+    Examples
+        >>> sorted_deduplicate(['a', 'a', 'b', 'c', 'c'])
+        ['a', 'b', 'c']
+        >>> sorted_deduplicate([[1], [1], [2]])
+        [[1], [2]]
+    """
+
+    return _sorted_distinct(_walk_sorted(elements, key, "elements"))
+
+
+def _marker_lists(lists: tuple[list[Any], ...]) -> list[list[Any]]:
+    """Replace every element by its hashable marker (canonical form for unhashable values)."""
+
+    return [[_hashable_marker(element) for element in elements] for elements in lists]
+
+
+def _intersect_keep_order(keys: Sequence[list[Any]], lists: Sequence[list[Any]]) -> list[Any]:
+    others = sorted(keys[1:], key=len)
+    if not others:
+        return list(lists[0])
+    common = set(others[0])
+    for other in others[1:]:
+        if not common:
+            break
+        common.intersection_update(other)
+    return [element for marker, element in zip(keys[0], lists[0], strict=True) if marker in common]
+
+
+def _first_representatives(keys: Sequence[list[Any]], lists: Sequence[list[Any]]) -> dict[Any, Any]:
+    representatives: dict[Any, Any] = {}
+    for markers, elements in zip(keys, lists, strict=True):
+        for marker, element in zip(markers, elements, strict=True):
+            representatives.setdefault(marker, element)
+    return representatives
+
+
+def intersect_keep_order(*lists: list[Any]) -> list[Any]:
+    """Keep the elements of the first list that occur in every other list.
+
+    Why
+        Intersecting 10-50 lists by chaining two-list helpers rebuilds sets
+        over and over.
+
+    What
+        Hashes every input once: the other lists are intersected as sets
+        smallest-first (so the running intersection shrinks as early as
+        possible, stopping once it is empty), then one pass over the first list
+        keeps its elements in order. Duplicates within the first list are kept,
+        matching :func:`substract_all_keep_sorting`. Unhashable values are
+        compared through their canonical frozen form.
+
+    Parameters
+        lists:
+            Any number of lists; the first one defines order and multiplicity.
+
+    Returns
+        A new list; empty when no lists are given, a copy for a single list.
+
+    Side Effects
+        None.
+
+    Examples
+        >>> intersect_keep_order(['d', 'a', 'b', 'a', 'c'], ['a', 'b', 'c'], ['c', 'a'])
+        ['a', 'a', 'c']
+        >>> intersect_keep_order([[1], [2]], [[2]])
+        [[2]]
+    """
+
+    if not lists:
+        return []
+    try:
+        return _intersect_keep_order(lists, lists)
+    except TypeError:
+        return _intersect_keep_order(_marker_lists(lists), lists)
+
+
+def union_keep_order(*lists: list[Any]) -> list[Any]:
+    """Return every distinct value of all lists in first-occurrence order.
+
+    Why
+        Chained unions rebuild sets per call and lose the original ordering.
+
+    What
+        One pass over the concatenated inputs keeps the first occurrence of
+        each value (``dict.fromkeys`` for hashable values, the canonical
+        frozen form for unhashable ones).
+
+    Parameters
+        lists:
+            Any number of lists.
+
+    Returns
+        A new list of distinct values.
 
+    Side Effects
+        None.
+
+    Examples
+        >>> union_keep_order(['b', 'a'], ['c', 'a'], ['d', 'b'])
+        ['b', 'a', 'c', 'd']
     """
-    if not elements:
-        return False
 
-    return any(fnmatch.fnmatch(element, search_pattern) for element in elements if isinstance(element, str))
+    try:
+        return list(dict.fromkeys(itertools.chain.from_iterable(lists)))
+    except TypeError:
+        return list(_first_representatives(_marker_lists(lists), lists).values())
 
 
-def is_fnmatching_one_pattern(elements: list[Any], search_patterns: list[str]) -> bool:
-    """Check a list of patterns for at least one match within the elements.
+def symmetric_difference(*lists: list[Any]) -> list[Any]:
+    """Return the values that occur in an odd number of the lists.
 
     Why
-        Bundled pattern checks reduce the boilerplate around nested ``if``/``or``
-        logic in legacy scripts.
+        Completes the n-ary set algebra next to :func:`intersect_keep_order`
+        and :func:`union_keep_order`.
 
     What
-        Returns ``True`` if any pattern in ``search_patterns`` matches at least
-        one string in ``elements``. Empty inputs never match.
+        The n-ary generalisation of ``a ^ b ^ c ...``: counts, per distinct
+        value, how many lists contain it (repeats within one list count once)
+        and keeps the values with an odd count, in first-occurrence order.
+        For two lists this is the usual symmetric difference.
 
     Parameters
-        elements:
-            Values to test.
-        search_patterns:
-            ``fnmatch``-compatible patterns; an empty list yields ``False``.
+        lists:
+            Any number of lists.
 
     Returns
-        Boolean indicating whether any pattern matched any string element.
+        A new list of distinct values.
 
     Side Effects
         None.
 
     Examples
-        >>> is_fnmatching_one_pattern([], [])
-        False
+        >>> symmetric_difference(['a', 'b', 'c'], ['b', 'c', 'd'])
+        ['a', 'd']
+        >>> symmetric_difference(['a', 'b'], ['b', 'c'], ['c', 'a', 'e'])
+        ['e']
+    """
 
-        >>> is_fnmatching_one_pattern(['abcd', 'def', 1, None], [])
-        False
+    try:
+        membership = collections.Counter(itertools.chain.from_iterable(dict.fromkeys(elements) for elements in lists))
+    except TypeError:
+        keys = _marker_lists(lists)
+        representatives = _first_representatives(keys, lists)
+        membership = collections.Counter(itertools.chain.from_iterable(dict.fromkeys(markers) for markers in keys))
+        return [representatives[marker] for marker, count in membership.items() if count % 2]
+    return [value for value, count in membership.items() if count % 2]
 
-        >>> is_fnmatching_one_pattern(['abcd', 'def', 1, None], ['*bc*', '*fg*'])
-        True
 
-        >>> is_fnmatching_one_pattern(['abcd', 'def', 1, None], ['*fg*', '*gh*'])
-        False
+def _stable_hash64(text: str) -> int:
+    """64-bit BLAKE2b digest of ``text``; unlike :func:`hash` it does not change between interpreter runs."""
+
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest())
+
+
+def _shingle_hashes(text: str, shingle_size: int, cache: dict[str, int]) -> frozenset[int]:
+    """Hash the character shingles of ``text`` after casefolding and collapsing whitespace.
+
+    ``cache`` memoises shingle hashes across the strings of one call, since
+    short shingles repeat heavily.
     """
-    if not elements or not search_patterns:
-        return False
 
-    return any(is_fnmatching(elements, search_pattern) for search_pattern in search_patterns)
+    normalized = " ".join(text.casefold().split())
+    if len(normalized) <= shingle_size:
+        shingles = [normalized]
+    else:
+        shingles = [normalized[offset : offset + shingle_size] for offset in range(len(normalized) - shingle_size + 1)]
+    hashes: set[int] = set()
+    for shingle in shingles:
+        shingle_hash = cache.get(shingle)
+        if shingle_hash is None:
+            shingle_hash = cache[shingle] = _stable_hash64(shingle)
+        hashes.add(shingle_hash)
+    return frozenset(hashes)
 
 
-def substract_all_keep_sorting(minuend: list[Any], subtrahend: list[Any]) -> list[Any]:
-    """Remove all occurrences of specific values while preserving order.
+def _densification_probes(num_perm: int) -> list[list[int]]:
+    """Fixed pseudo-random probe order over all bins, one per bin, shared by every signature."""
+
+    return [sorted(range(num_perm), key=lambda source, slot=slot: _mix64(slot * num_perm + source)) for slot in range(num_perm)]
+
+
+def _one_permutation_signature(hashes: frozenset[int], probes: list[list[int]]) -> list[int]:
+    """One-permutation MinHash: split the hash space into ``len(probes)`` bins and keep each bin's minimum.
+
+    An empty bin copies the first filled bin along its own probe order
+    (optimal densification). Borrowing from the neighbouring bin instead
+    would let a single shingle fill a whole LSH band of a short string and
+    flood the buckets with unrelated candidates.
+    """
+
+    num_perm = len(probes)
+    signature = [-1] * num_perm
+    for shingle_hash in hashes:
+        slot = shingle_hash % num_perm
+        value = shingle_hash // num_perm
+        if signature[slot] < 0 or value < signature[slot]:
+            signature[slot] = value
+    filled = signature.copy()
+    for slot, value in enumerate(filled):
+        if value >= 0:
+            continue
+        for source in probes[slot]:
+            if filled[source] >= 0:
+                signature[slot] = filled[source]
+                break
+    return signature
+
+
+def _lsh_rows(threshold: float, num_perm: int) -> int:
+    """Pick the band height whose LSH threshold ``(1/bands) ** (1/rows)`` is the highest one not above ``threshold``."""
+
+    rows = 1
+    for candidate in range(1, num_perm + 1):
+        if num_perm % candidate == 0 and (candidate / num_perm) ** (1 / candidate) <= threshold:
+            rows = candidate
+    return rows
+
+
+def _near_duplicate_groups(elements: Sequence[str], threshold: float, shingle_size: int, num_perm: int) -> tuple[list[list[int]], list[tuple[int, int, float]]]:
+    """Group identical shingle sets, then return the verified similar group pairs."""
+
+    if not 0 < threshold <= 1:
+        msg = "threshold must be in (0, 1]"
+        raise ValueError(msg)
+    if shingle_size < 1 or num_perm < 1:
+        msg = "shingle_size and num_perm must be >= 1"
+        raise ValueError(msg)
+    by_shingles: dict[frozenset[int], list[int]] = {}
+    shingle_cache: dict[str, int] = {}
+    for position, element in enumerate(elements):
+        by_shingles.setdefault(_shingle_hashes(element, shingle_size, shingle_cache), []).append(position)
+    shingle_sets = list(by_shingles)
+    groups = list(by_shingles.values())
+
+    rows = _lsh_rows(threshold, num_perm)
+    probes = _densification_probes(num_perm)
+    buckets: dict[tuple[int, ...], list[int]] = {}
+    for group_index, shingles in enumerate(shingle_sets):
+        signature = _one_permutation_signature(shingles, probes)
+        for start in range(0, num_perm, rows):
+            buckets.setdefault((start, *signature[start : start + rows]), []).append(group_index)
+
+    candidates = {(first, second) for members in buckets.values() for first, second in itertools.combinations(members, 2)}
+    similar: list[tuple[int, int, float]] = []
+    for first, second in sorted(candidates):
+        left, right = shingle_sets[first], shingle_sets[second]
+        similarity = len(left & right) / len(left | right)
+        if similarity >= threshold:
+            similar.append((first, second, similarity))
+    return groups, similar
+
+
+def find_near_duplicates(elements: Sequence[str], *, threshold: float = 0.8, shingle_size: int = 3, num_perm: int = 128) -> list[tuple[int, int, float]]:
+    """Find pairs of strings whose shingle sets are at least ``threshold`` similar.
 
     Why
-        Keeps deterministic ordering for consumers that compare results against
-        previously sorted state.
+        :func:`deduplicate` and :func:`str_in_list_lower_and_de_double` only
+        catch exact or case-folded duplicates; inventories also hold strings
+        differing by whitespace, version suffixes or typos, and comparing all
+        pairs is ``O(n²)``.
 
     What
-        Mutates ``minuend`` in place by removing every occurrence of items that
-        appear in ``subtrahend``.
+        Each string is casefolded, its whitespace collapsed, and cut into
+        character shingles of ``shingle_size``. Identical shingle sets are
+        grouped first. Every distinct set gets a one-permutation MinHash
+        signature of ``num_perm`` bins (one hash per shingle instead of one per
+        shingle and permutation), and locality-sensitive hashing over bands of
+        the signature proposes candidate pairs in roughly linear time. The
+        band height is chosen so the LSH threshold sits just below
+        ``threshold``, favouring recall. Candidates are verified with the exact
+        Jaccard similarity of their shingle sets, so no reported pair is below
+        ``threshold``; a true pair close to ``threshold`` can occasionally be
+        missed. Shingles are hashed with a fixed BLAKE2b digest, so the
+        result for a given input is the same in every run.
 
     Parameters
-        minuend:
-            List to prune. Returned after mutation.
-        subtrahend:
-            Values whose occurrences should be removed.
+        elements:
+            Strings to compare.
+        threshold:
+            Minimum Jaccard similarity in ``(0, 1]``.
+        shingle_size:
+            Characters per shingle.
+        num_perm:
+            Signature length; more bins sharpen the LSH cut-off.
 
     Returns
-        The mutated ``minuend`` list for fluency.
+        ``(i, j, similarity)`` tuples with ``i < j`` indexing ``elements``,
+        sorted by ``i`` then ``j``.
+
+    Raises
+        ValueError: for a threshold outside ``(0, 1]`` or sizes below 1.
 
     Side Effects
-        ``minuend`` is modified in place.
+        None.
 
     Examples
-        >>> substract_all_keep_sorting([], ['a'])
-        []
-        >>> substract_all_keep_sorting(['a', 'a'], [])
-        ['a', 'a']
-
-        >>> my_l_minuend = ['a','a','b']
-        >>> my_l_subtrahend = ['a','c']
-        >>> substract_all_keep_sorting(my_l_minuend, my_l_subtrahend)
-        ['b']
+        >>> names = ['Quarterly report 2024.pdf', 'quarterly  report 2024.PDF', 'Quarterly report 2025.pdf', 'invoice 0042.txt']
+        >>> find_near_duplicates(names, threshold=0.7)
+        [(0, 1, 1.0), (0, 2, 0.7692307692307693), (1, 2, 0.7692307692307693)]
     """
-    if not minuend or not subtrahend:
-        return minuend
 
-    subtrahend_dedup = set(subtrahend)
-    retained = [element for element in minuend if element not in subtrahend_dedup]
-    minuend[:] = retained
-    return minuend
+    groups, similar = _near_duplicate_groups(elements, threshold, shingle_size, num_perm)
+    result = [(first, second, 1.0) for members in groups for first, second in itertools.combinations(members, 2)]
+    for first_group, second_group, similarity in similar:
+        result.extend((min(first, second), max(first, second), similarity) for first in groups[first_group] for second in groups[second_group])
+    result.sort()
+    return result
 
 
-def substract_all_unsorted_fast(minuend: list[Any], subtrahend: list[Any]) -> list[Any]:
-    """Return the set difference of two lists without keeping order.
+def cluster_near_duplicates(elements: Sequence[str], *, threshold: float = 0.8, shingle_size: int = 3, num_perm: int = 128) -> list[list[str]]:
+    """Group strings into clusters of near duplicates.
 
     Why
-        Provides a faster alternative to
-        :func:`substract_all_keep_sorting` when ordering is irrelevant.
+        Reviewing near-duplicate pairs is tedious; callers usually want each
+        family of variants once, e.g. to keep only its first member.
 
     What
-        Converts both lists into ``set`` objects (which also causes deduplication!), subtracts them, and emits a
-        new list with the remaining values.
+        Runs the same candidate search as :func:`find_near_duplicates` and
+        joins every verified pair with a union-find structure (single
+        linkage), so a chain of similar strings forms one cluster even when
+        its ends are less similar than ``threshold``.
 
     Parameters
-        minuend:
-            Source values.
-        subtrahend:
-            Values to remove.
+        elements:
+            Strings to cluster.
+        threshold / shingle_size / num_perm:
+            As for :func:`find_near_duplicates`.
 
     Returns
-        Fresh list containing the set difference.
+        Clusters with at least two members, each in input order, ordered by
+        their first member. Strings without a near duplicate are omitted.
+
+    Raises
+        ValueError: for a threshold outside ``(0, 1]`` or sizes below 1.
 
     Side Effects
-        None; the inputs are not modified.
+        None.
 
     Examples
-        >>> my_minuend = ['a','a','b']
-        >>> my_subtrahend = ['a','c']
-        >>> substract_all_unsorted_fast(my_minuend, my_subtrahend)
-        ['b']
-        >>> my_minuend = ['a','a','b']
-        >>> my_subtrahend = ['b']
-        >>> substract_all_unsorted_fast(my_minuend, my_subtrahend)
-        ['a']
-
+        >>> cluster_near_duplicates(['invoice 0042.txt', 'Report 2024.pdf', 'notes.md', 'report 2024.PDF', 'Invoice 0042.txt'])
+        [['invoice 0042.txt', 'Invoice 0042.txt'], ['Report 2024.pdf', 'report 2024.PDF']]
     """
-    if not minuend:
-        return minuend
 
-    return list(set(minuend) - set(subtrahend))
+    groups, similar = _near_duplicate_groups(elements, threshold, shingle_size, num_perm)
+    parents = list(range(len(groups)))
+
+    def root(group_index: int) -> int:
+        while parents[group_index] != group_index:
+            parents[group_index] = parents[parents[group_index]]
+            group_index = parents[group_index]
+        return group_index
 
+    for first_group, second_group, _ in similar:
+        first_root, second_root = root(first_group), root(second_group)
+        if first_root != second_root:
+            parents[max(first_root, second_root)] = min(first_root, second_root)
+    members_by_root: dict[int, list[int]] = {}
+    for group_index, members in enumerate(groups):
+        members_by_root.setdefault(root(group_index), []).extend(members)
+    clusters = [sorted(members) for members in members_by_root.values() if len(members) > 1]
+    clusters.sort()
+    return [[elements[position] for position in members] for members in clusters]
 
-def ls_del_empty_elements(ls_elements: list[Any]) -> list[Any]:
+
+def ls_del_empty_elements(ls_elements: list[Any], *, in_place: bool = False) -> list[Any]:
     """Remove empty or falsey entries from a list.
 
     Why
@@ -435,12 +2932,17 @@ def ls_del_empty_elements(ls_elements: list[Any]) -> list[Any]:
     Parameters
         ls_elements:
             Sequence potentially containing empty strings, ``None``, or zeros.
+        in_place:
+            Compact ``ls_elements`` itself block by block and truncate it once
+            instead of building a new list.
 
     Returns
-        New list with only truthy values.
+        New list with only truthy values; ``ls_elements`` itself when
+        ``in_place`` is set.
 
     Side Effects
-        None.
+        None unless ``in_place`` is set, in which case ``ls_elements`` is
+        mutated.
 
     Examples
         >>> ls_del_empty_elements([])
@@ -453,9 +2955,13 @@ def ls_del_empty_elements(ls_elements: list[Any]) -> list[Any]:
         ['   ', 'a', 'b']
         >>> ls_del_empty_elements(['   ','','a',None,'b',0])
         ['   ', 'a', 'b']
+        >>> ls_del_empty_elements(['', 'a', None], in_place=True)
+        ['a']
 
     """
 
+    if in_place:
+        return _compact_in_place(ls_elements, lambda block: list(filter(None, block)))
     return list(filter(None, ls_elements))
 
 
@@ -773,7 +3279,75 @@ def ls_strip_list(list_of_strings: list[str], chars: str = "") -> list[str]:
     return list_of_strings
 
 
-def ls_substract(ls_minuend: list[Any], ls_subtrahend: list[Any]) -> list[Any]:
+def _multiset_retained_hashed(minuend: list[Any], removal_keys: list[Any], key: Callable[[Any], Any] | None) -> list[Any]:
+    """Drop the first ``k`` occurrences of every key counted ``k`` times in ``removal_keys``.
+
+    Raises ``TypeError`` before producing anything when a key is unhashable.
+    """
+
+    pending = collections.Counter(removal_keys)
+    retained: list[Any] = []
+    for element in minuend:
+        marker = element if key is None else key(element)
+        remaining = pending.get(marker)
+        if remaining:
+            pending[marker] = remaining - 1
+        else:
+            retained.append(element)
+    return retained
+
+
+def _multiset_retained_frozen(minuend: list[Any], removal_keys: list[Any], key: Callable[[Any], Any] | None) -> list[Any]:
+    """Variant of :func:`_multiset_retained_hashed` counting canonical frozen forms of lists, dicts and sets.
+
+    Raises ``TypeError`` when a key has no frozen form.
+    """
+
+    pending = collections.Counter(_hashable_marker(removal_key) for removal_key in removal_keys)
+    retained: list[Any] = []
+    for element in minuend:
+        marker = _hashable_marker(element if key is None else key(element))
+        remaining = pending.get(marker)
+        if remaining:
+            pending[marker] = remaining - 1
+        else:
+            retained.append(element)
+    return retained
+
+
+def _multiset_retained_sorted(minuend: list[Any], removal_keys: list[Any], key: Callable[[Any], Any] | None) -> list[Any]:
+    """Sorted-merge variant of :func:`_multiset_retained_hashed` for orderable values.
+
+    Minuend positions are sorted stably by value, so each run of equal values
+    lists its occurrences front to back and the merge consumes the earliest
+    ones first. Values neither of which is ``<`` the other count as equal, so
+    this is only used for values without a frozen form (see
+    :func:`_multiset_retained_frozen`); partially ordered types such as sets
+    would otherwise match wrongly. Raises ``TypeError`` when the values cannot
+    be ordered.
+    """
+
+    removals = sorted(removal_keys)
+    keys = minuend if key is None else [key(element) for element in minuend]
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    removed = bytearray(len(minuend))
+    removal_index = 0
+    position_index = 0
+    while removal_index < len(removals) and position_index < len(order):
+        removal = removals[removal_index]
+        position = order[position_index]
+        if removal < keys[position]:
+            removal_index += 1
+        elif keys[position] < removal:
+            position_index += 1
+        else:
+            removed[position] = 1
+            removal_index += 1
+            position_index += 1
+    return [element for element, is_removed in zip(minuend, removed, strict=True) if not is_removed]
+
+
+def ls_substract(ls_minuend: list[Any], ls_subtrahend: list[Any], *, key: Callable[[Any], Any] | None = None) -> list[Any]:
     """Remove a single occurrence of each value in ``ls_subtrahend``.
 
     Why
@@ -781,14 +3355,24 @@ def ls_substract(ls_minuend: list[Any], ls_subtrahend: list[Any]) -> list[Any]:
         removal.
 
     What
-        Iterates through ``ls_subtrahend`` and removes the first matching value
-        from ``ls_minuend`` each time.
+        Every value listed ``k`` times in ``ls_subtrahend`` removes its first
+        ``k`` occurrences from ``ls_minuend`` (or all of them when there are
+        fewer). Hashable values are counted with a ``Counter`` and removed in
+        one ``O(n + m)`` pass; lists, dicts and sets are counted the same way
+        through a canonical hashable form. Other unhashable but orderable
+        values go through a sorted merge in ``O((n + m) log(n + m))``, and
+        only values that are neither fall back to the element-by-element
+        ``list.remove`` loop. With ``key``, elements are compared by
+        ``key(element)``: the subtrahend keys are computed once and stored,
+        the minuend keys are computed on the fly, and full records remain.
 
     Parameters
         ls_minuend:
             List to mutate.
         ls_subtrahend:
             Values to subtract.
+        key:
+            Optional function applied to the elements of both lists.
 
     Returns
         The mutated ``ls_minuend`` for fluent chaining.
@@ -801,15 +3385,219 @@ def ls_substract(ls_minuend: list[Any], ls_subtrahend: list[Any]) -> list[Any]:
         >>> l_subtrahend = ['a','c']
         >>> ls_substract(l_minuend, l_subtrahend)
         ['a', 'b']
+        >>> ls_substract([[1], [2], [1], [1]], [[1], [1]])
+        [[2], [1]]
+        >>> ls_substract([{1}, {2}, {3}], [{3}])
+        [{1}, {2}]
+        >>> ls_substract([('a', 1), ('b', 1), ('c', 2)], [('x', 1)], key=lambda pair: pair[1])
+        [('b', 1), ('c', 2)]
 
     """
-    for s_element in ls_subtrahend:
-        if s_element in ls_minuend:
-            ls_minuend.remove(s_element)
+    if not ls_minuend or not ls_subtrahend:
+        return ls_minuend
+    removal_keys = ls_subtrahend if key is None else [key(element) for element in ls_subtrahend]
+    for engine in (_multiset_retained_hashed, _multiset_retained_frozen, _multiset_retained_sorted):
+        try:
+            retained = engine(ls_minuend, removal_keys, key)
+        except TypeError:
+            continue
+        ls_minuend[:] = retained
+        return ls_minuend
+    if key is None:
+        for s_element in ls_subtrahend:
+            if s_element in ls_minuend:
+                ls_minuend.remove(s_element)
+        return ls_minuend
+    minuend_keys = [key(element) for element in ls_minuend]
+    for removal_key in removal_keys:
+        if removal_key in minuend_keys:
+            position = minuend_keys.index(removal_key)
+            del minuend_keys[position]
+            del ls_minuend[position]
     return ls_minuend
 
 
-def split_list_into_junks(source_list: list[Any], junk_size: int = sys.maxsize) -> list[list[Any]]:
+class ListView(collections.abc.Sequence[Any]):
+    """Read-only, zero-copy window onto a slice of a list.
+
+    Why
+        Read-only batch consumers do not need copies; slicing a huge list into
+        batches doubles its memory, while views cost one small object each.
+
+    What
+        Stores a reference to ``base`` plus the ``range`` of indices selected
+        by ``base[start:stop:step]``; the bounds are resolved against the
+        length of ``base`` at creation. Indexing reads through to ``base``,
+        slicing returns another view of the same list, and :meth:`tolist`
+        copies the selection when a real list is needed. Views compare equal
+        to lists and views with the same elements.
+
+    Parameters
+        base:
+            List to look into. Later writes to ``base`` are visible through
+            the view; shrinking it can make indices of the view invalid.
+        start / stop / step:
+            Slice bounds, with the same meaning and defaults as in
+            ``base[start:stop:step]``.
+
+    Side Effects
+        None; ``base`` is referenced, never copied or modified.
+
+    Examples
+        >>> numbers = list(range(10))
+        >>> view = ListView(numbers, 2, 8)
+        >>> len(view), view[0], view[-1]
+        (6, 2, 7)
+        >>> view[::2]
+        ListView([2, 4, 6])
+        >>> view[::2].tolist(), view == [2, 3, 4, 5, 6, 7]
+        ([2, 4, 6], True)
+    """
+
+    __slots__ = ("_base", "_indices")
+
+    def __init__(self, base: list[Any], start: int | None = None, stop: int | None = None, step: int | None = None) -> None:
+        self._base = base
+        self._indices = range(*slice(start, stop, step).indices(len(base)))
+
+    @classmethod
+    def _over(cls, base: list[Any], indices: range) -> ListView:
+        view = cls.__new__(cls)
+        view._base = base
+        view._indices = indices
+        return view
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.tolist()!r})"
+
+    @overload
+    def __getitem__(self, index: int) -> Any: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> ListView: ...
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            return ListView._over(self._base, self._indices[index])
+        return self._base[self._indices[index]]
+
+    def __iter__(self) -> Iterator[Any]:
+        return map(self._base.__getitem__, self._indices)
+
+    def __reversed__(self) -> Iterator[Any]:
+        return map(self._base.__getitem__, reversed(self._indices))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (ListView, list)):
+            return NotImplemented
+        elements = cast("Sequence[Any]", other)
+        return len(self) == len(elements) and all(mine == theirs for mine, theirs in zip(self, elements, strict=True))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def tolist(self) -> list[Any]:
+        """Copy the viewed elements into a new list."""
+        indices = self._indices
+        if not indices:
+            return []
+        return self._base[indices.start : indices.stop if indices.stop >= 0 else None : indices.step]
+
+
+def _iter_list_junks(source: list[Any], junk_size: int) -> Iterator[list[Any]]:
+    for start in range(0, len(source), junk_size):
+        yield source[start : start + junk_size]
+
+
+def _iter_list_junk_views(source: list[Any], junk_size: int) -> Iterator[ListView]:
+    for start in range(0, len(source), junk_size):
+        yield ListView(source, start, start + junk_size)
+
+
+def _iter_iterable_junks(source: Iterable[Any], junk_size: int) -> Iterator[list[Any]]:
+    iterator = iter(source)
+    while batch := list(itertools.islice(iterator, junk_size)):
+        yield batch
+
+
+@overload
+def iter_junks(source: Iterable[Any], junk_size: int = ..., *, as_views: Literal[False] = ...) -> Iterator[list[Any]]: ...
+
+
+@overload
+def iter_junks(source: list[Any], junk_size: int = ..., *, as_views: Literal[True]) -> Iterator[ListView]: ...
+
+
+def iter_junks(source: Iterable[Any], junk_size: int = sys.maxsize, *, as_views: bool = False) -> Iterator[list[Any]] | Iterator[ListView]:
+    """Lazily yield successive batches of at most ``junk_size`` elements.
+
+    Why
+        Batching 10M items should not cost more than touching each item once,
+        and streamed sources (files, generators, database cursors) should not
+        have to be materialised as a list first.
+
+    What
+        Lists are cut by index arithmetic, each batch being one slice of the
+        original list, so the total work is ``O(n)``. Any other iterable is
+        consumed ``junk_size`` elements at a time with :func:`itertools.islice`
+        and never read further ahead than the current batch. With
+        ``as_views=True`` a list is not copied at all: every batch is a
+        :class:`ListView` onto ``source``. Arguments are validated when the
+        function is called, not on the first ``next()``.
+
+    Parameters
+        source:
+            Iterable to batch.
+        junk_size:
+            Maximum number of elements per batch, ``>= 1``.
+        as_views:
+            Yield zero-copy :class:`ListView` batches; ``source`` must be a
+            list.
+
+    Returns
+        Iterator of non-empty lists (or views); an empty source yields
+        nothing.
+
+    Raises
+        ValueError: if ``junk_size`` is below 1.
+        TypeError: if ``as_views`` is requested for a source that is not a list.
+
+    Side Effects
+        Advances ``source`` if it is an iterator.
+
+    Examples
+        >>> list(iter_junks([1, 2, 3, 4, 5], junk_size=2))
+        [[1, 2], [3, 4], [5]]
+        >>> next(iter_junks(itertools.count(), junk_size=3))
+        [0, 1, 2]
+        >>> list(iter_junks([]))
+        []
+        >>> list(iter_junks([1, 2, 3, 4, 5], junk_size=2, as_views=True))
+        [ListView([1, 2]), ListView([3, 4]), ListView([5])]
+    """
+
+    if junk_size <= 0:
+        msg = "junk_size must be a positive integer"
+        raise ValueError(msg)
+    if isinstance(source, list):
+        return _iter_list_junk_views(source, junk_size) if as_views else _iter_list_junks(source, junk_size)
+    if as_views:
+        msg = f"as_views needs a list, not {type(source).__name__}"
+        raise TypeError(msg)
+    return _iter_iterable_junks(source, junk_size)
+
+
+@overload
+def split_list_into_junks(source_list: list[Any], junk_size: int = ..., *, as_views: Literal[False] = ...) -> list[list[Any]]: ...
+
+
+@overload
+def split_list_into_junks(source_list: list[Any], junk_size: int = ..., *, as_views: Literal[True]) -> list[ListView]: ...
+
+
+def split_list_into_junks(source_list: list[Any], junk_size: int = sys.maxsize, *, as_views: bool = False) -> list[list[Any]] | list[ListView]:
     """Split a list into evenly sized chunks.
 
     Why
@@ -817,9 +3605,12 @@ def split_list_into_junks(source_list: list[Any], junk_size: int = sys.maxsize)
         manageable batches without copying data unnecessarily.
 
     What
-        Returns successive slices of ``junk_size`` elements, including a final
-        slice containing the remainder. The final sub-list reuses the original
-        list reference to avoid extra allocations.
+        Collects :func:`iter_junks`: successive slices of ``junk_size``
+        elements, including a final slice containing the remainder, in
+        ``O(n)`` total. A list that already fits into one chunk is returned
+        as the only chunk itself, without a copy. ``as_views=True`` returns
+        :class:`ListView` chunks instead, so no element references are copied
+        at all.
 
     Preconditions
         ``junk_size`` must be >= 1. Invalid values raise :class:`ValueError` so
@@ -831,12 +3622,15 @@ def split_list_into_junks(source_list: list[Any], junk_size: int = sys.maxsize)
         junk_size:
             Maximum size of each chunk. Defaults to ``sys.maxsize`` which
             effectively returns the original list.
+        as_views:
+            Return read-only :class:`ListView` chunks instead of lists.
 
     Returns
-        List of sub-lists representing the chunks.
+        List of sub-lists (or views) representing the chunks.
 
     Side Effects
-        None beyond returning references to existing list segments.
+        None; a single chunk is ``source_list`` itself, so mutating it
+        mutates the input.
 
     Examples
         >>> result = split_list_into_junks([1,2,3,4,5,6,7,8,9,10],junk_size=11)
@@ -848,20 +3642,382 @@ def split_list_into_junks(source_list: list[Any], junk_size: int = sys.maxsize)
         >>> result = split_list_into_junks([1,2,3,4,5,6,7,8,9,10])
         >>> assert result == [[1, 2, 3, 4, 5, 6, 7, 8, 9, 10]]
 
+        >>> split_list_into_junks([1,2,3,4,5],junk_size=2,as_views=True)
+        [ListView([1, 2]), ListView([3, 4]), ListView([5])]
+
     """
     if junk_size <= 0:
         msg = "junk_size must be a positive integer"
         raise ValueError(msg)
+    if len(source_list) <= junk_size:
+        return [ListView(source_list)] if as_views else [source_list]
+    if as_views:
+        return list(iter_junks(source_list, junk_size, as_views=True))
+    return list(iter_junks(source_list, junk_size))
+
+
+def split_by_weight(source: Iterable[Any], max_weight: float, weight: Callable[[Any], float] = len) -> list[list[Any]]:
+    """Pack consecutive elements into batches whose summed weight stays within a cap.
+
+    Why
+        Downstream limits are often sizes, not counts: API payload bytes, SQL
+        packet sizes or token budgets. With element sizes varying by orders of
+        magnitude, a fixed element count either wastes capacity or overflows.
+
+    What
+        Walks ``source`` once, calling ``weight`` once per element, and closes
+        the current batch as soon as the next element would push its total
+        above ``max_weight`` (greedy next-fit, so order is kept). An element
+        that is heavier than ``max_weight`` on its own is put into a batch of
+        its own instead of failing.
+
+    Parameters
+        source:
+            Iterable to batch.
+        max_weight:
+            Cap on the summed weight of a batch, ``> 0``.
+        weight:
+            Cost of one element (default :func:`len`), ``>= 0``; for bytes on
+            the wire use e.g. ``lambda text: len(text.encode())``.
+
+    Returns
+        Non-empty batches in input order. Every batch weighs at most
+        ``max_weight`` except the single-element batches of oversized
+        elements.
+
+    Raises
+        ValueError: if ``max_weight`` is not positive or an element weighs
+            less than zero.
+
+    Side Effects
+        Advances ``source`` if it is an iterator.
+
+    Examples
+        >>> split_by_weight(['aaa', 'bb', 'c', 'dddddd', 'ee', 'f'], max_weight=5)
+        [['aaa', 'bb'], ['c'], ['dddddd'], ['ee', 'f']]
+        >>> split_by_weight([3, 4, 1, 2], max_weight=5, weight=lambda number: number)
+        [[3], [4, 1], [2]]
+    """
+
+    if max_weight <= 0:
+        msg = "max_weight must be positive"
+        raise ValueError(msg)
+    batches: list[list[Any]] = []
+    batch: list[Any] = []
+    batch_weight: float = 0
+    for element in source:
+        element_weight = weight(element)
+        if element_weight < 0:
+            msg = f"weight must be >= 0, got {element_weight!r} for {element!r}"
+            raise ValueError(msg)
+        if batch and batch_weight + element_weight > max_weight:
+            batches.append(batch)
+            batch, batch_weight = [], 0
+        batch.append(element)
+        batch_weight += element_weight
+        if batch_weight > max_weight:
+            batches.append(batch)
+            batch, batch_weight = [], 0
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _contiguous_count_partitions(elements: list[Any], n: int) -> list[list[Any]]:
+    size, larger = divmod(len(elements), n)
+    partitions: list[list[Any]] = []
+    start = 0
+    for index in range(n):
+        stop = start + size + (index < larger)
+        partitions.append(elements[start:stop])
+        start = stop
+    return partitions
+
+
+def _lpt_partitions(elements: list[Any], weights: list[float], n: int) -> list[list[Any]]:
+    """Longest-processing-time first: heaviest element to the currently lightest partition.
+
+    Ties on load go to the partition holding fewer elements, so zero-weight
+    elements still spread across empty partitions.
+    """
+
+    loads: list[tuple[float, int, int]] = [(0, 0, index) for index in range(n)]
+    positions: list[list[int]] = [[] for _ in range(n)]
+    for position in sorted(range(len(elements)), key=weights.__getitem__, reverse=True):
+        load, count, index = heapq.heappop(loads)
+        positions[index].append(position)
+        heapq.heappush(loads, (load + weights[position], count + 1, index))
+    return [[elements[position] for position in sorted(assigned)] for assigned in positions]
+
+
+def _contiguous_bounds(prefix: list[float], n: int, cap: float) -> list[int] | None:
+    """Greedy cut positions for at most ``cap`` per part, leaving one element for every later part; ``None`` if ``n`` parts do not suffice."""
+
+    length = len(prefix) - 1
+    bounds = [0]
+    for part in range(1, n):
+        start = bounds[-1]
+        if start >= length:
+            bounds.append(length)
+            continue
+        stop = min(bisect.bisect_right(prefix, prefix[start] + cap) - 1, length - (n - part))
+        bounds.append(max(stop, start + 1))
+    if prefix[length] - prefix[bounds[-1]] > cap:
+        return None
+    bounds.append(length)
+    return bounds
+
+
+def _contiguous_weight_partitions(elements: list[Any], weights: list[float], n: int) -> list[list[Any]]:
+    """Binary search on the largest part sum, checked by greedy cutting over prefix sums."""
+
+    prefix: list[float] = [0, *itertools.accumulate(weights)]
+    low: float = max(weights, default=0)
+    high: float = prefix[-1]
+    bounds = _contiguous_bounds(prefix, n, high)
+    if all(isinstance(value, int) for value in weights):
+        while low < high:
+            middle = (low + high) // 2
+            if (candidate := _contiguous_bounds(prefix, n, middle)) is None:
+                low = middle + 1
+            else:
+                high, bounds = middle, candidate
+    else:
+        while low < (middle := (low + high) / 2) < high:
+            if (candidate := _contiguous_bounds(prefix, n, middle)) is None:
+                low = middle
+            else:
+                high, bounds = middle, candidate
+    final_bounds = cast("list[int]", bounds)
+    return [elements[start:stop] for start, stop in itertools.pairwise(final_bounds)]
+
+
+def partition_balanced(source: Iterable[Any], n: int, weight: Callable[[Any], float] | None = None, *, contiguous: bool = False) -> list[list[Any]]:
+    """Split ``source`` into exactly ``n`` partitions of near-equal count or total weight.
+
+    Why
+        Spreading work over ``n`` workers with a guessed ``junk_size`` leaves
+        a straggler batch, and equal counts do not help when per-element
+        costs differ; the slowest partition decides when all work is done.
+
+    What
+        Without ``weight`` the elements are cut into ``n`` contiguous slices
+        whose lengths differ by at most one. With ``weight`` (called once per
+        element) the largest partition total is minimised:
+
+        * ``contiguous=False`` uses greedy longest-processing-time-first
+          scheduling: elements are taken heaviest first and each goes to the
+          currently lightest partition (a heap), which is within 4/3 of the
+          optimum. Every partition keeps its elements in input order.
+        * ``contiguous=True`` keeps partitions as consecutive runs of the
+          input and finds the optimal cut: a binary search over the largest
+          partition total, each probe cutting greedily along prefix sums with
+          :mod:`bisect` in ``O(n log len)``. Integer weights are searched
+          exactly; float weights to floating-point resolution.
+
+    Parameters
+        source:
+            Iterable to partition; it is materialised once.
+        n:
+            Number of partitions, ``>= 1``.
+        weight:
+            Optional cost of one element, ``>= 0``.
+        contiguous:
+            Keep every partition a consecutive run of ``source``; only
+            affects weighted partitioning.
+
+    Returns
+        Exactly ``n`` lists. Partitions are only empty when ``source`` has
+        fewer than ``n`` elements; the empty ones come last.
+
+    Raises
+        ValueError: if ``n`` is below 1 or an element weighs less than zero.
+
+    Side Effects
+        Advances ``source`` if it is an iterator.
+
+    Examples
+        >>> partition_balanced(range(7), 3)
+        [[0, 1, 2], [3, 4], [5, 6]]
+        >>> partition_balanced([5, 1, 4, 2, 3], 2, weight=lambda cost: cost)
+        [[5, 1, 2], [4, 3]]
+        >>> partition_balanced([1, 2, 3, 4, 5, 6], 3, weight=lambda cost: cost, contiguous=True)
+        [[1, 2, 3], [4, 5], [6]]
+    """
+
+    if n < 1:
+        msg = "n must be >= 1"
+        raise ValueError(msg)
+    elements = list(source)
+    if weight is None:
+        return _contiguous_count_partitions(elements, n)
+    weights = [weight(element) for element in elements]
+    if any(element_weight < 0 for element_weight in weights):
+        msg = "weight must be >= 0 for every element"
+        raise ValueError(msg)
+    if contiguous:
+        return _contiguous_weight_partitions(elements, weights, n)
+    return _lpt_partitions(elements, weights, n)
+
+
+class JunkProcessingError(Exception):
+    """Raised by :func:`map_junks` when the function failed on a batch.
+
+    The original exception is chained as ``__cause__``; ``batch_index`` is the
+    zero-based position of the failing batch.
+    """
+
+    def __init__(self, batch_index: int, error: BaseException) -> None:
+        super().__init__(f"batch {batch_index} failed: {error!r}")
+        self.batch_index = batch_index
+
+
+_JUNK_EXECUTOR_KINDS = ("thread", "process")
+
+
+def _junk_result(future: concurrent.futures.Future[Any], batch_index: int) -> Any:
+    try:
+        return future.result()
+    except Exception as error:
+        raise JunkProcessingError(batch_index, error) from error
+
+
+def _map_junks(
+    fn: Callable[[list[Any]], Any], batches: Iterator[list[Any]], executor: concurrent.futures.Executor, *, ordered: bool, max_in_flight: int
+) -> Iterator[Any]:
+    pending: dict[concurrent.futures.Future[Any], int] = {}
+    submitted: collections.deque[concurrent.futures.Future[Any]] = collections.deque()
+    indexed_batches = enumerate(batches)
+
+    def fill() -> None:
+        while len(pending) < max_in_flight:
+            batch_index, batch = next(indexed_batches, (-1, None))
+            if batch is None:
+                return
+            future = executor.submit(fn, batch)
+            pending[future] = batch_index
+            if ordered:
+                submitted.append(future)
+
+    try:
+        fill()
+        while pending:
+            if ordered:
+                done = [submitted.popleft()]
+            else:
+                done = sorted(concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED).done, key=pending.__getitem__)
+            for future in done:
+                result = _junk_result(future, pending.pop(future))
+                fill()
+                yield result
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _map_junks_in_own_pool(
+    fn: Callable[[list[Any]], Any],
+    batches: Iterator[Any],
+    make_pool: Callable[[], concurrent.futures.Executor],
+    *,
+    ordered: bool,
+    max_in_flight: int,
+) -> Iterator[Any]:
+    """Run :func:`_map_junks` in a pool created on first iteration and shut down when iteration ends."""
+
+    pool = make_pool()
+    try:
+        yield from _map_junks(fn, batches, pool, ordered=ordered, max_in_flight=max_in_flight)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def map_junks(  # noqa: PLR0913 - fn, source and junk_size plus keyword-only scheduling options
+    fn: Callable[[list[Any]], Any],
+    source: Iterable[Any],
+    junk_size: int = sys.maxsize,
+    *,
+    executor: concurrent.futures.Executor | str = "thread",
+    workers: int | None = None,
+    ordered: bool = True,
+    max_in_flight: int | None = None,
+) -> Iterator[Any]:
+    """Apply ``fn`` to batches of ``source`` in a thread or process pool.
+
+    Why
+        Feeding :func:`split_list_into_junks` into an executor by hand means
+        materialising every batch, writing the ordering bookkeeping and
+        working out which batch an exception came from.
+
+    What
+        Streams the batches of :func:`iter_junks` into ``executor`` and yields
+        ``fn(batch)`` per batch. At most ``max_in_flight`` batches are queued
+        or running at a time and the next batch is only read from ``source``
+        when one of them finished, so memory stays bounded for any length of
+        ``source`` and a slow consumer throttles the producer. With
+        ``ordered=True`` results come in batch order; otherwise each result
+        is yielded as soon as its batch completes. A failing batch raises
+        :class:`JunkProcessingError` carrying its ``batch_index``, after
+        which the batches not yet started are cancelled.
+
+    Parameters
+        fn:
+            Function called with one list batch. For process pools it must be
+            picklable (a module-level function), as must the elements.
+        source:
+            Iterable to batch.
+        junk_size:
+            Maximum number of elements per batch, ``>= 1``.
+        executor:
+            An existing :class:`concurrent.futures.Executor`, which is used
+            but not shut down, or ``"thread"`` / ``"process"`` for a pool
+            created on first iteration and shut down when iteration ends, so
+            a result iterator that is never iterated holds no pool.
+        workers:
+            Worker count for a pool created from ``"thread"`` /
+            ``"process"``; ``None`` uses the executor default.
+        ordered:
+            Yield results in batch order (default) or as completed.
+        max_in_flight:
+            Bound on queued or running batches; defaults to twice the worker
+            count (``workers`` or the CPU count).
 
-    l_lists: list[list[Any]] = []
-    remaining_list: list[Any] = source_list
+    Returns
+        Iterator over the results of ``fn``, one per batch.
+
+    Raises
+        ValueError: for invalid sizes or an unknown executor kind, or when
+            ``workers`` is combined with an existing executor.
+        JunkProcessingError: while iterating, when ``fn`` raised for a batch.
+
+    Side Effects
+        Runs ``fn`` concurrently; advances ``source`` if it is an iterator.
 
-    while len(remaining_list) > junk_size:
-        part_list = remaining_list[:junk_size]
-        l_lists.append(part_list)
-        remaining_list = remaining_list[junk_size:]
-    l_lists.append(remaining_list)
-    return l_lists
+    Examples
+        >>> list(map_junks(sum, range(10), junk_size=4))
+        [6, 22, 17]
+        >>> sorted(map_junks(len, 'abcdefg', junk_size=3, workers=2, ordered=False))
+        [1, 3, 3]
+    """
+
+    batches = iter_junks(source, junk_size)
+    if max_in_flight is not None and max_in_flight < 1:
+        msg = "max_in_flight must be >= 1"
+        raise ValueError(msg)
+    if workers is not None and workers < 1:
+        msg = "workers must be >= 1"
+        raise ValueError(msg)
+    in_flight = max_in_flight if max_in_flight is not None else 2 * (workers or os.process_cpu_count() or 1)
+    if isinstance(executor, concurrent.futures.Executor):
+        if workers is not None:
+            msg = "workers only applies when map_junks creates the executor"
+            raise ValueError(msg)
+        return _map_junks(fn, batches, executor, ordered=ordered, max_in_flight=in_flight)
+    if executor not in _JUNK_EXECUTOR_KINDS:
+        msg = f"unknown executor kind {executor!r}; expected an Executor or one of {', '.join(_JUNK_EXECUTOR_KINDS)}"
+        raise ValueError(msg)
+    pool_type = concurrent.futures.ThreadPoolExecutor if executor == "thread" else concurrent.futures.ProcessPoolExecutor
+    return _map_junks_in_own_pool(fn, batches, lambda: pool_type(max_workers=workers), ordered=ordered, max_in_flight=in_flight)
 
 
 def str_in_list_lower_and_de_double(list_of_strings: list[str]) -> list[str]:
@@ -879,7 +4035,9 @@ def str_in_list_lower_and_de_double(list_of_strings: list[str]) -> list[str]:
             Strings to normalise.
 
     Returns
-        List of unique, lowercased strings. Ordering is not guaranteed.
+        List of unique, lowercased strings. Ordering is not guaranteed; use
+        :func:`str_in_list_de_double_non_case_sensitive` to keep the original
+        spelling and order.
 
     Side Effects
         None.
@@ -899,6 +4057,64 @@ def str_in_list_lower_and_de_double(list_of_strings: list[str]) -> list[str]:
     return list_of_strings_lower_and_de_double
 
 
+_NORMALIZE_FORMS = ("NFC", "NFD", "NFKC", "NFKD")
+
+
+def str_in_list_de_double_non_case_sensitive(list_of_strings: list[str], *, normalize_form: str | None = None) -> list[str]:
+    """Remove case-insensitive duplicates, keeping the first spelling in input order.
+
+    Why
+        :func:`str_in_list_lower_and_de_double` returns lowered strings in no
+        particular order, so callers that display or persist the values need
+        a second pass to recover the original spelling and sequence.
+
+    What
+        Walks the list once and keys a ``dict`` on ``casefold()`` (which also
+        folds ``'ß'`` and ``'SS'`` together, unlike ``lower()``). The first
+        original string per key is stored, so no lowered copy of the list is
+        built. With ``normalize_form`` the string is Unicode-normalised before
+        and after casefolding, making composed and decomposed spellings such
+        as ``'é'`` and ``'e\u0301'`` equal (``'NFKC'`` additionally folds
+        compatibility characters such as full-width ``'\\uff21'``).
+
+    Parameters
+        list_of_strings:
+            Strings to deduplicate.
+        normalize_form:
+            ``None`` (default), ``'NFC'``, ``'NFD'``, ``'NFKC'`` or ``'NFKD'``.
+
+    Returns
+        The first occurrence of every case-insensitively distinct string, in
+        input order and with its original spelling.
+
+    Raises
+        ValueError: for an unknown ``normalize_form``.
+
+    Side Effects
+        None.
+
+    Examples
+        >>> str_in_list_de_double_non_case_sensitive(['Beta', 'alpha', 'BETA', 'Alpha', 'gamma'])
+        ['Beta', 'alpha', 'gamma']
+        >>> str_in_list_de_double_non_case_sensitive(['Straße', 'STRASSE'])
+        ['Straße']
+        >>> str_in_list_de_double_non_case_sensitive(['Café', 'CAFE\u0301'], normalize_form='NFC')
+        ['Café']
+    """
+
+    if normalize_form is not None and normalize_form not in _NORMALIZE_FORMS:
+        msg = f"unknown normalize_form {normalize_form!r}; expected one of {', '.join(_NORMALIZE_FORMS)}"
+        raise ValueError(msg)
+    first_spellings: dict[str, str] = {}
+    for string in list_of_strings:
+        folded = (
+            string.casefold() if normalize_form is None else unicodedata.normalize(normalize_form, unicodedata.normalize(normalize_form, string).casefold())
+        )
+        if folded not in first_spellings:
+            first_spellings[folded] = string
+    return list(first_spellings.values())
+
+
 def str_in_list_non_case_sensitive(string: str, list_of_strings: list[str]) -> bool:
     """Case-insensitive membership test.
 
@@ -7,13 +7,27 @@ Each test checks exactly one behavior.
 
 from __future__ import annotations
 
-from typing import Any
+import concurrent.futures
+import fnmatch
+import itertools
+import operator
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from typing import TYPE_CHECKING, Any
 
 import pytest
 
 import btx_lib_list
 from btx_lib_list import lib_list
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
 # ---------------------------------------------------------------------------
 # deduplicate: Removing Duplicates
 # ---------------------------------------------------------------------------
@@ -49,6 +63,301 @@ class TestDeduplicate:
 
         assert result == ["a"]
 
+    def test_keep_order_keeps_first_occurrences(self) -> None:
+        """keep_order=True returns first occurrences in input order."""
+        result = lib_list.deduplicate(["b", "a", "c", "b", "a"], keep_order=True)
+
+        assert result == ["b", "a", "c"]
+
+    def test_key_is_called_once_per_element(self) -> None:
+        """The key function decides equality and runs exactly once per element."""
+        calls: list[str] = []
+
+        def lowered(value: str) -> str:
+            calls.append(value)
+            return value.lower()
+
+        result = lib_list.deduplicate(["Apple", "apple", "Berry", "APPLE"], key=lowered)
+
+        assert result == ["Apple", "Berry"]
+        assert calls == ["Apple", "apple", "Berry", "APPLE"]
+
+    def test_unhashable_elements_do_not_raise(self) -> None:
+        """Dicts and lists are deduplicated by value in the default mode."""
+        result = lib_list.deduplicate([{"id": 1}, [1, 2], {"id": 1}, [1, 2], "x"])
+
+        assert result == [{"id": 1}, [1, 2], "x"]
+
+    def test_nested_unhashable_values_compare_by_equality(self) -> None:
+        """Nested payloads collapse when equal and stay apart when only the container type differs."""
+        elements: list[Any] = [{"a": [1, {"b": 2}]}, {"a": [1, {"b": 2}]}, [1], (1,), {1}, frozenset({1})]
+
+        result = lib_list.deduplicate(elements, keep_order=True)
+
+        assert result == [{"a": [1, {"b": 2}]}, [1], (1,), {1}]
+
+    def test_unfreezable_values_fall_back_to_equality(self) -> None:
+        """Objects without a hash and without a canonical form are compared with ==."""
+
+        class Point:
+            __hash__ = None  # type: ignore[assignment]
+
+            def __init__(self, x: int) -> None:
+                self.x = x
+
+            def __eq__(self, other: object) -> bool:
+                return isinstance(other, Point) and other.x == self.x
+
+        first, duplicate, other = Point(1), Point(1), Point(2)
+
+        result = lib_list.deduplicate([first, duplicate, other], keep_order=True)
+
+        assert result == [first, other]
+        assert result[0] is first
+
+
+# ---------------------------------------------------------------------------
+# iter_deduplicate and BloomFilter: Streaming Deduplication
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.os_agnostic
+class TestIterDeduplicate:
+    """iter_deduplicate lazily yields first occurrences with bounded memory modes."""
+
+    def test_exact_mode_keeps_first_occurrences(self) -> None:
+        """Exact mode yields each value once, in input order."""
+        result = list(lib_list.iter_deduplicate(iter(["b", "a", "b", "c", "a"])))
+
+        assert result == ["b", "a", "c"]
+
+    def test_is_lazy(self) -> None:
+        """Elements are produced without exhausting an infinite source."""
+        stream = lib_list.iter_deduplicate(itertools.cycle(["a", "b"]))
+
+        assert next(stream) == "a"
+        assert next(stream) == "b"
+
+    def test_key_decides_equality(self) -> None:
+        """Elements with equal keys are duplicates; the first one is kept."""
+        records = [{"id": 1, "n": "x"}, {"id": 2, "n": "y"}, {"id": 1, "n": "z"}]
+
+        result = list(lib_list.iter_deduplicate(records, key=lambda record: record["id"]))
+
+        assert result == [{"id": 1, "n": "x"}, {"id": 2, "n": "y"}]
+
+    @pytest.mark.parametrize("mode", ["exact", "window", "bloom"])
+    def test_unhashable_values_are_compared_by_content(self, mode: str) -> None:
+        """Lists and dicts do not raise in any mode."""
+        result = list(lib_list.iter_deduplicate([[1], {"a": 1}, [1], {"a": 1}], mode=mode))
+
+        assert result == [[1], {"a": 1}]
+
+    def test_window_mode_forgets_old_values(self) -> None:
+        """Repeats beyond the window are yielded again; a repeat refreshes its entry."""
+        result = list(lib_list.iter_deduplicate(["a", "b", "a", "c", "a", "d", "e", "a"], mode="window", window=2))
+
+        assert result == ["a", "b", "c", "d", "e", "a"]
+
+    def test_bloom_mode_matches_exact_on_small_input(self) -> None:
+        """With ample capacity the Bloom mode agrees with the exact mode."""
+        elements = [f"line-{number % 50}" for number in range(500)]
+
+        result = list(lib_list.iter_deduplicate(elements, mode="bloom", bloom=lib_list.BloomFilter(10_000, error_rate=1e-6)))
+
+        assert result == list(lib_list.iter_deduplicate(elements))
+
+    def test_invalid_arguments_raise_at_call_time(self) -> None:
+        """Unknown modes, empty windows and misplaced filters raise immediately."""
+        with pytest.raises(ValueError, match="unknown deduplicate mode"):
+            lib_list.iter_deduplicate([], mode="fuzzy")
+        with pytest.raises(ValueError, match="window"):
+            lib_list.iter_deduplicate([], mode="window", window=0)
+        with pytest.raises(ValueError, match="bloom"):
+            lib_list.iter_deduplicate([], bloom=lib_list.BloomFilter(10))
+
+
+@pytest.mark.os_agnostic
+class TestBloomFilter:
+    """BloomFilter is a fixed-size set without false negatives."""
+
+    def test_no_false_negatives(self) -> None:
+        """Every added value is reported as present."""
+        bloom = lib_list.BloomFilter(1_000, error_rate=0.01)
+        for number in range(1_000):
+            bloom.add(number)
+
+        assert all(number in bloom for number in range(1_000))
+
+    def test_false_positive_rate_near_target(self) -> None:
+        """At capacity the observed false-positive rate stays close to the configured one."""
+        bloom = lib_list.BloomFilter(5_000, error_rate=0.01)
+        for number in range(5_000):
+            bloom.add(f"in-{number}")
+
+        false_positives = sum(f"out-{number}" in bloom for number in range(20_000))
+
+        assert false_positives / 20_000 < 0.02
+        assert bloom.estimated_error_rate == pytest.approx(0.01, rel=0.2)
+
+    def test_add_reports_previous_presence(self) -> None:
+        """add returns True only for values already recorded."""
+        bloom = lib_list.BloomFilter(100)
+
+        assert bloom.add("x") is False
+        assert bloom.add("x") is True
+        assert len(bloom) == 1
+
+    @pytest.mark.parametrize(("capacity", "error_rate"), [(0, 0.01), (10, 0.0), (10, 1.0)])
+    def test_invalid_sizing_raises(self, capacity: int, error_rate: float) -> None:
+        """Capacity below one or an error rate outside (0, 1) is rejected."""
+        with pytest.raises(ValueError, match="must be"):
+            lib_list.BloomFilter(capacity, error_rate)
+
+
+# ---------------------------------------------------------------------------
+# external_deduplicate and external_substract: Spill-to-Disk Set Operations
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.os_agnostic
+class TestExternalSetOperations:
+    """The external-memory helpers match the in-memory results under any budget."""
+
+    ELEMENTS: tuple[Any, ...] = ("b", "a", "b", "c", "a", "d", "c", "e", "b")
+
+    @pytest.mark.parametrize("budget", [1, 2, 3, 100])
+    def test_external_deduplicate_matches_stable_deduplicate(self, budget: int, tmp_path: Path) -> None:
+        """First occurrences come back in input order whether or not runs spill."""
+        result = list(lib_list.external_deduplicate(iter(self.ELEMENTS), max_items_in_memory=budget, temp_dir=str(tmp_path)))
+
+        assert result == lib_list.deduplicate(list(self.ELEMENTS), keep_order=True)
+
+    @pytest.mark.parametrize("budget", [1, 2, 3, 100])
+    def test_external_substract_matches_keep_sorting(self, budget: int, tmp_path: Path) -> None:
+        """Every occurrence of a subtrahend value is removed and order is kept."""
+        result = list(lib_list.external_substract(iter(self.ELEMENTS), iter(["b", "e", "z"]), max_items_in_memory=budget, temp_dir=str(tmp_path)))
+
+        assert result == lib_list.substract_all_keep_sorting(list(self.ELEMENTS), ["b", "e", "z"])
+
+    def test_unhashable_values_survive_spilling(self) -> None:
+        """Lists and dicts are compared by content after a pickle round trip."""
+        elements: list[Any] = [[1], {"a": 1}, [1], [2], {"a": 1}]
+
+        assert list(lib_list.external_deduplicate(elements, max_items_in_memory=1)) == [[1], {"a": 1}, [2]]
+        assert list(lib_list.external_substract(elements, [{"a": 1}], max_items_in_memory=1)) == [[1], [1], [2]]
+
+    def test_merge_fan_in_bounds_open_runs(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """More runs than the fan-in are merged in passes, keeping few files open at once."""
+        opened: list[Any] = []
+        temporary_file: Any = lib_list.tempfile.TemporaryFile
+        peak = [0]
+
+        def tracking_temporary_file(*args: Any, **kwargs: Any) -> Any:
+            handle: Any = temporary_file(*args, **kwargs)
+            opened.append(handle)
+            peak[0] = max(peak[0], sum(not candidate.closed for candidate in opened))
+            return handle
+
+        monkeypatch.setattr(lib_list, "_MERGE_FAN_IN", 3)
+        monkeypatch.setattr(lib_list.tempfile, "TemporaryFile", tracking_temporary_file)
+        minuend = [value % 37 for value in range(200)]
+
+        deduplicated = list(lib_list.external_deduplicate(minuend, max_items_in_memory=2))
+        subtracted = list(lib_list.external_substract(minuend, range(0, 37, 2), max_items_in_memory=2))
+
+        assert deduplicated == list(range(37))
+        assert subtracted == [value for value in minuend if value % 2]
+        assert len(opened) > 100
+        assert peak[0] <= 20
+
+    def test_repeated_subtrahend_value_stays_within_budget(self) -> None:
+        """A subtrahend that repeats one value does not pile its copies up in memory."""
+        tracemalloc.start()
+        try:
+            result = list(lib_list.external_substract(["a", "x", "b"], itertools.repeat("x", 30_000), max_items_in_memory=1000))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert result == ["a", "b"]
+        assert peak < 1_000_000
+
+    def test_key_applies_to_both_sides(self) -> None:
+        """The key function decides equality for deduplication and subtraction."""
+        assert list(lib_list.external_deduplicate(["A", "a", "B"], key=str.lower, max_items_in_memory=1)) == ["A", "B"]
+        assert list(lib_list.external_substract(["A", "b", "C"], ["a", "c"], key=str.lower, max_items_in_memory=1)) == ["b"]
+
+    def test_temporary_runs_are_removed(self, tmp_path: Path) -> None:
+        """No spill files remain once the result has been consumed."""
+        list(lib_list.external_deduplicate(range(50), max_items_in_memory=4, temp_dir=str(tmp_path)))
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_invalid_budget_raises_at_call_time(self) -> None:
+        """A budget below one is rejected before iteration starts."""
+        with pytest.raises(ValueError, match="max_items_in_memory"):
+            lib_list.external_substract([], [], max_items_in_memory=0)
+
+
+# ---------------------------------------------------------------------------
+# approximate_substract: Bloom-Filter Subtraction
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.os_agnostic
+class TestApproximateSubstract:
+    """approximate_substract removes every member and reports its error budget."""
+
+    def test_members_are_always_removed(self) -> None:
+        """No subtrahend value survives and the rest keeps its order."""
+        outcome = lib_list.approximate_substract(["a", "b", "c", "a", "d"], ["a", "d", "x"])
+
+        assert set(outcome.survivors) <= {"b", "c"}
+        assert outcome.survivors == sorted(outcome.survivors)
+
+    def test_verify_matches_exact_subtraction(self) -> None:
+        """With verify=True false positives are restored and the result is exact."""
+        minuend = [f"item-{number}" for number in range(2_000)]
+        subtrahend = [f"item-{number}" for number in range(0, 2_000, 3)]
+
+        outcome = lib_list.approximate_substract(minuend, iter(subtrahend), error_rate=0.2, verify=True)
+
+        assert outcome.survivors == lib_list.substract_all_keep_sorting(list(minuend), subtrahend)
+        assert outcome.removed == len(subtrahend)
+        assert outcome.false_positives is not None
+        assert outcome.false_positives > 0
+
+    def test_reports_error_rates_and_filter_size(self) -> None:
+        """The configured and estimated error rates and the filter size are reported."""
+        outcome = lib_list.approximate_substract(["a"], [f"x{number}" for number in range(1_000)], error_rate=0.01)
+
+        assert outcome.error_rate == 0.01
+        assert outcome.estimated_error_rate == pytest.approx(0.01, rel=0.2)
+        assert outcome.filter_bytes < 1_500
+        assert outcome.false_positives is None
+
+    def test_unverified_error_rate_stays_near_target(self) -> None:
+        """Without verification roughly error_rate of the non-members are dropped."""
+        minuend = [f"keep-{number}" for number in range(10_000)]
+
+        outcome = lib_list.approximate_substract(minuend, (f"drop-{number}" for number in range(5_000)), error_rate=0.01)
+
+        assert outcome.removed < 200
+
+    def test_unhashable_values(self) -> None:
+        """Lists and dicts are compared by content."""
+        outcome = lib_list.approximate_substract([[1], {"a": 1}, [2]], [[1], {"a": 1}], verify=True)
+
+        assert outcome.survivors == [[2]]
+
+    def test_empty_subtrahend_keeps_everything(self) -> None:
+        """An empty subtrahend removes nothing."""
+        outcome = lib_list.approximate_substract(["a", "b"], [], verify=True)
+
+        assert outcome.survivors == ["a", "b"]
+        assert outcome.removed == 0
+
 
 # ---------------------------------------------------------------------------
 # del_elements_containing: Filtering by Substring
@@ -91,6 +400,16 @@ class TestDelElementsContaining:
 
         assert original == ["a", "abba", "c"]
 
+    def test_in_place_compacts_the_input(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """in_place=True mutates and returns the input list, across several blocks."""
+        monkeypatch.setattr(lib_list, "_COMPACT_BLOCK_SIZE", 2)
+        original = ["a", "abba", "c", "b", "d", "bb", "e"]
+
+        result = lib_list.del_elements_containing(original, "b", in_place=True)
+
+        assert result is original
+        assert original == ["a", "c", "d", "e"]
+
 
 # ---------------------------------------------------------------------------
 # filter_contains: Selecting by Substring
@@ -129,6 +448,123 @@ class TestFilterContains:
 
         assert result == []
 
+    def test_ignores_strings_nested_in_other_values(self) -> None:
+        """A matching string inside a nested list does not select the list."""
+        result = lib_list.filter_contains(["x", ["a\nb"]], "a\nb")
+
+        assert result == []
+
+
+# ---------------------------------------------------------------------------
+# SubstringSet and *_any helpers: Multi-Needle Substring Search
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.os_agnostic
+class TestSubstringSet:
+    """SubstringSet finds many needles with one scan per element."""
+
+    def test_search_detects_any_needle(self) -> None:
+        """search reports whether at least one needle occurs."""
+        needles = lib_list.SubstringSet(["he", "she", "hers"])
+
+        assert [needles.search(text) for text in ["ushers", "xyz"]] == [True, False]
+
+    def test_find_all_reports_overlapping_needles(self) -> None:
+        """find_all lists every needle, including overlapping and nested ones."""
+        needles = lib_list.SubstringSet(["hers", "she", "he", "zz"])
+
+        assert needles.find_all("ushers") == ["hers", "she", "he"]
+
+    def test_empty_needle_matches_everything(self) -> None:
+        """An empty needle occurs in every string, like '' in text."""
+        assert lib_list.SubstringSet(["", "zz"]).search("abc") is True
+
+    def test_agrees_with_in_operator(self) -> None:
+        """The automaton agrees with the in operator for every needle."""
+        needle_list = ["ab", "b", "bab", "abc", "c", "aa"]
+        needles = lib_list.SubstringSet(needle_list)
+
+        for text in ["abab", "cab", "aab", "xyz", "babc", ""]:
+            assert needles.find_all(text) == [needle for needle in needle_list if needle in text], text
+
+    def test_filter_contains_any(self) -> None:
+        """filter_contains_any keeps strings containing any needle and drops non-strings."""
+        result = lib_list.filter_contains_any(["abcd", "def", 1, "xyz"], ["bc", "yz"])
+
+        assert result == ["abcd", "xyz"]
+
+    def test_del_elements_containing_any(self) -> None:
+        """del_elements_containing_any removes strings containing any needle."""
+        result = lib_list.del_elements_containing_any(["a", "abba", "cd", "e"], ["b", "d"])
+
+        assert result == ["a", "e"]
+
+    def test_del_elements_containing_any_empty_needles_returns_original(self) -> None:
+        """Without needles the original list is returned."""
+        original = ["a", "b"]
+
+        assert lib_list.del_elements_containing_any(original, []) is original
+
+    def test_is_element_containing_any(self) -> None:
+        """is_element_containing_any reports whether any element holds any needle."""
+        needles = lib_list.SubstringSet(["zz", "ef"])
+
+        assert lib_list.is_element_containing_any(["abc", "def"], needles) is True
+        assert lib_list.is_element_containing_any(["abc"], needles) is False
+
+    def test_classify_contains_reports_hits(self) -> None:
+        """classify_contains reports which elements each needle hit."""
+        result = lib_list.classify_contains(["abc", "bcd", "xyz", 1], ["bc", "y", "q"])
+
+        assert result == {"bc": ["abc", "bcd"], "y": ["xyz"], "q": []}
+
+
+# ---------------------------------------------------------------------------
+# SubstringIndex: Trigram-Indexed Substring Queries
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.os_agnostic
+class TestSubstringIndex:
+    """SubstringIndex answers repeated substring queries like the list helpers."""
+
+    INVENTORY: tuple[Any, ...] = ("alpha", "beta", "alphabet", "gamma", 7, None, "abba", "betamax")
+
+    @pytest.mark.parametrize("query", ["", "a", "al", "alp", "alpha", "bet", "max", "zzz", "ab"])
+    def test_filter_contains_matches_helper(self, query: str) -> None:
+        """filter_contains returns exactly what the list helper returns."""
+        index = lib_list.SubstringIndex(self.INVENTORY)
+
+        assert index.filter_contains(query) == lib_list.filter_contains(list(self.INVENTORY), query)
+
+    def test_is_element_containing(self) -> None:
+        """is_element_containing reports indexed hits and misses."""
+        index = lib_list.SubstringIndex(self.INVENTORY)
+
+        assert [index.is_element_containing(query) for query in ["phab", "mma", "xyz"]] == [True, True, False]
+
+    def test_del_elements_containing_keeps_non_matching(self) -> None:
+        """del_elements_containing keeps every element without the substring."""
+        index = lib_list.SubstringIndex(["alpha", "beta", "alphabet"])
+
+        assert index.del_elements_containing("lph") == ["beta"]
+
+    def test_trigrams_present_but_substring_absent(self) -> None:
+        """Candidates sharing all trigrams but not the substring are rejected."""
+        index = lib_list.SubstringIndex(["abcxbcd"])
+
+        assert index.filter_contains("abcd") == []
+
+    def test_snapshot_ignores_later_changes(self) -> None:
+        """The index reflects the list at construction time."""
+        source = ["alpha"]
+        index = lib_list.SubstringIndex(source)
+
+        source.append("alpine")
+
+        assert index.filter_contains("alp") == ["alpha"]
+
 
 # ---------------------------------------------------------------------------
 # filter_fnmatch: Shell Pattern Matching
@@ -168,6 +604,299 @@ class TestFilterFnmatch:
         assert result == ["ax", "bx"]
 
 
+# ---------------------------------------------------------------------------
+# filter_regex: Selecting by Regular Expression
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.os_agnostic
+class TestFilterRegex:
+    """filter_regex keeps the string elements in which the pattern finds a match."""
+
+    @pytest.mark.parametrize(
+        ("pattern", "expected"),
+        [(r"\d+", ["alpha1", "gamma22"]), ("^al", ["alpha1"]), ("a$", ["beta", "a"]), (r"\Aa", ["alpha1", "a"]), ("^$", [""])],
+    )
+    def test_matches_per_element(self, pattern: str, expected: list[str]) -> None:
+        """Anchors apply to each element and non-strings are skipped."""
+        elements: list[Any] = ["alpha1", "", "beta", 2, "gamma22", "a", "xt"]
+
+        assert lib_list.filter_regex(elements, pattern) == expected
+
+    def test_filter_regex_accepts_compiled_pattern(self) -> None:
+        """A compiled pattern keeps its flags."""
+        result = lib_list.filter_regex(["ABC", "abc", "x"], re.compile("^a", re.IGNORECASE))
+
+        assert result == ["ABC", "abc"]
+
+    def test_filter_regex_empty_list(self) -> None:
+        """An empty list returns an empty list."""
+        assert lib_list.filter_regex([], "a") == []
+
+
+# ---------------------------------------------------------------------------
+# GlobSet: Compiled Multi-Pattern Matching
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.os_agnostic
+class TestGlobSet:
+    """GlobSet answers whether any of its patterns matches an element."""
+
+    def test_matches_any_pattern(self) -> None:
+        """An element matching one of several patterns is accepted."""
+        assert lib_list.GlobSet(["*.txt", "*.py"]).match("main.py") is True
+
+    def test_rejects_when_no_pattern_matches(self) -> None:
+        """An element matching none of the patterns is rejected."""
+        assert lib_list.GlobSet(["*.txt", "*.py"]).match("main.rs") is False
+
+    def test_empty_set_matches_nothing(self) -> None:
+        """A GlobSet without patterns never matches."""
+        assert lib_list.GlobSet([]).match("") is False
+
+    def test_keeps_pattern_order(self) -> None:
+        """The patterns property reflects the supplied order."""
+        assert lib_list.GlobSet(["b*", "a*"]).patterns == ("b*", "a*")
+
+    def test_filter_skips_non_strings(self) -> None:
+        """filter keeps matching strings and drops non-strings."""
+        result = lib_list.GlobSet(["a*"]).filter(["abc", 1, "xyz", None])
+
+        assert result == ["abc"]
+
+    def test_agrees_with_fnmatch(self) -> None:
+        """The combined matcher agrees with fnmatch for every pattern shape."""
+        patterns = ["a?c", "[ab]x", "*.log", "build/*", "exact", "[!x]y"]
+        names = ["abc", "ax", "cx", "app.log", "build/out", "exact", "exactly", "zy", "xy"]
+        glob_set = lib_list.GlobSet(patterns)
+
+        for name in names:
+            expected = any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+            assert glob_set.match(name) is expected, name
+
+    def test_literal_pattern_requires_exact_match(self) -> None:
+        """Literal patterns match only the identical string."""
+        glob_set = lib_list.GlobSet(["build.log"])
+
+        assert [glob_set.match(name) for name in ["build.log", "build.logs"]] == [True, False]
+
+    def test_suffix_pattern_matches_ending(self) -> None:
+        """A *suffix pattern matches every string ending with the suffix."""
+        glob_set = lib_list.GlobSet(["*.log", "*.txt"])
+
+        assert glob_set.filter(["a.log", "b.txt", "c.logx", ".log"]) == ["a.log", "b.txt", ".log"]
+
+    def test_nested_prefix_patterns_match(self) -> None:
+        """Nested prefix* patterns find the shorter prefix behind a closer miss."""
+        glob_set = lib_list.GlobSet(["a*", "abc*"])
+
+        assert glob_set.match("abd") is True
+
+    def test_prefix_pattern_rejects_unrelated(self) -> None:
+        """prefix* patterns reject strings that start differently."""
+        assert lib_list.GlobSet(["build/*", "dist/*"]).match("src/build/x") is False
+
+    def test_star_only_matches_everything(self) -> None:
+        """A pattern made of stars matches any string, including the empty one."""
+        assert lib_list.GlobSet(["**"]).match("") is True
+
+    def test_case_sensitive_rejects_other_case(self) -> None:
+        """case_sensitive=True follows fnmatchcase on every platform."""
+        glob_set = lib_list.GlobSet(["*.TXT", "README"], case_sensitive=True)
+
+        assert glob_set.filter(["a.TXT", "a.txt", "README", "readme"]) == ["a.TXT", "README"]
+
+    def test_case_insensitive_folds_patterns_and_elements(self) -> None:
+        """case_sensitive=False casefolds patterns and elements for every pattern shape."""
+        glob_set = lib_list.GlobSet(["*.TXT", "Build/*", "readme", "[A]?C"], case_sensitive=False)
+
+        assert glob_set.filter(["x.txt", "BUILD/out", "README", "abc", "other"]) == ["x.txt", "BUILD/out", "README", "abc"]
+
+    def test_case_insensitive_returns_original_spelling(self) -> None:
+        """Casefolding only affects the comparison, not the returned elements."""
+        result = lib_list.filter_fnmatch(["Straße.TXT"], "strasse.txt", case_sensitive=False)
+
+        assert result == ["Straße.TXT"]
+
+    def test_helpers_forward_case_mode(self) -> None:
+        """The probe helpers accept the case_sensitive keyword."""
+        assert lib_list.is_fnmatching(["ABC"], "a*", case_sensitive=False) is True
+        assert lib_list.is_fnmatching_one_pattern(["ABC"], ["a*", "b*"], case_sensitive=True) is False
+
+    def test_filter_fnmatch_accepts_glob_set(self) -> None:
+        """filter_fnmatch keeps elements matching any pattern of a GlobSet."""
+        result = lib_list.filter_fnmatch(["abc", "def", "ghi"], lib_list.GlobSet(["a*", "g*"]))
+
+        assert result == ["abc", "ghi"]
+
+    def test_is_fnmatching_accepts_glob_set(self) -> None:
+        """is_fnmatching accepts a pre-built GlobSet."""
+        assert lib_list.is_fnmatching(["abc"], lib_list.GlobSet(["x*", "*c"])) is True
+
+
+# ---------------------------------------------------------------------------
+# classify_fnmatch: Single-Pass Pattern Bucketing
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.os_agnostic
+class TestClassifyFnmatch:
+    """classify_fnmatch buckets elements by every pattern they match."""
+
+    def test_buckets_by_pattern(self) -> None:
+        """Each pattern maps to the elements it matches, in input order."""
+        result = lib_list.classify_fnmatch(["a.py", "b.txt", "a.txt"], ["a*", "*.txt"])
+
+        assert result == {"a*": ["a.py", "a.txt"], "*.txt": ["b.txt", "a.txt"]}
+
+    def test_unmatched_pattern_maps_to_empty_list(self) -> None:
+        """Patterns without matches still appear with an empty bucket."""
+        result = lib_list.classify_fnmatch(["a.py"], ["*.rs"])
+
+        assert result == {"*.rs": []}
+
+    def test_skips_non_strings(self) -> None:
+        """Non-string elements never land in a bucket."""
+        result = lib_list.classify_fnmatch([1, None, "x"], ["*"])
+
+        assert result == {"*": ["x"]}
+
+    def test_agrees_with_filter_fnmatch(self) -> None:
+        """Every bucket equals filter_fnmatch for that pattern."""
+        patterns = ["*", "a?c", "[ab]*", "*.log", "build/*", "exact", "*b*"]
+        names = ["abc", "bx", "app.log", "build/out", "exact", "cab", ""]
+
+        result = lib_list.classify_fnmatch(names, patterns, case_sensitive=True)
+
+        assert result == {pattern: lib_list.filter_fnmatch(names, pattern, case_sensitive=True) for pattern in patterns}
+
+    def test_match_indices_reports_positions(self) -> None:
+        """GlobSet.match_indices lists the positions of all matching patterns."""
+        glob_set = lib_list.GlobSet(["*.py", "x*", "a?c", "*"])
+
+        assert glob_set.match_indices("abc") == [2, 3]
+
+
+# ---------------------------------------------------------------------------
+# PathGlobSet: Segment-Aware Globbing
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.os_agnostic
+class TestPathGlobSet:
+    """PathGlobSet matches /-separated paths segment by segment."""
+
+    def test_star_stays_inside_segment(self) -> None:
+        """A single star does not cross a directory separator."""
+        globs = lib_list.PathGlobSet(["src/*.py"])
+
+        assert [globs.match(path) for path in ["src/a.py", "src/pkg/a.py"]] == [True, False]
+
+    def test_double_star_spans_directories(self) -> None:
+        """** matches any number of directories, including none."""
+        globs = lib_list.PathGlobSet(["src/**/test_*.py"])
+
+        assert [globs.match(path) for path in ["src/test_a.py", "src/x/y/test_a.py", "src/x/a.py"]] == [True, True, False]
+
+    def test_trailing_double_star_matches_subtree(self) -> None:
+        """A trailing ** matches everything below the directory."""
+        globs = lib_list.PathGlobSet(["build/**"])
+
+        assert globs.filter(["build/a", "build/x/y", "src/build/a"]) == ["build/a", "build/x/y"]
+
+    @pytest.mark.parametrize(
+        ("pattern", "path", "expected"),
+        [("build/**", "build", False), ("*/**", "b", False), ("*/**", "a/b", True), ("**", "a", True), ("a/**/**", "a", False), ("a/**/**", "a/b/c", True)],
+    )
+    def test_trailing_double_star_needs_a_segment(self, pattern: str, path: str, expected: bool) -> None:
+        """A trailing ** matches one or more segments, as in PurePath.full_match and gitignore."""
+        globs = lib_list.PathGlobSet([pattern])
+
+        assert globs.match(path) is expected
+        assert globs.filter([path]) == ([path] if expected else [])
+
+    def test_can_match_below_prunes_directories(self) -> None:
+        """Directories that no pattern can reach are reported as prunable."""
+        globs = lib_list.PathGlobSet(["src/**/*.py", "docs/index.md"])
+
+        assert [globs.can_match_below(directory) for directory in ["src/a/b", "docs", "docs/api", "tests"]] == [True, True, False, False]
+
+    def test_filter_skips_non_strings_and_keeps_order(self) -> None:
+        """filter keeps input order and drops non-strings."""
+        globs = lib_list.PathGlobSet(["*/*.txt"])
+
+        assert globs.filter(["b/2.txt", 3, "a/1.txt", "a/1.md"]) == ["b/2.txt", "a/1.txt"]
+
+    def test_case_insensitive_segments(self) -> None:
+        """case_sensitive=False folds the case of each segment."""
+        globs = lib_list.PathGlobSet(["SRC/**/*.PY"], case_sensitive=False)
+
+        assert globs.match("src/a/b.py") is True
+
+    def test_filter_fnmatch_accepts_path_glob_set(self) -> None:
+        """filter_fnmatch switches to path-aware matching for a PathGlobSet."""
+        result = lib_list.filter_fnmatch(["a/b.py", "a/b/c.py"], lib_list.PathGlobSet(["a/**/*.py"]))
+
+        assert result == ["a/b.py", "a/b/c.py"]
+
+
+# ---------------------------------------------------------------------------
+# FilterRules: Ordered Include/Exclude Rules
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.os_agnostic
+class TestFilterRules:
+    """FilterRules decides each element by its first or last matching rule."""
+
+    def test_first_match_wins_by_default(self) -> None:
+        """The earliest matching rule decides the verdict."""
+        rules = lib_list.FilterRules([("include", "keep.log"), ("exclude", "*.log")])
+
+        assert rules.filter(["keep.log", "drop.log", "a.txt"]) == ["keep.log", "a.txt"]
+
+    def test_last_match_wins(self) -> None:
+        """With last_match_wins the latest matching rule decides."""
+        rules = lib_list.FilterRules([("exclude", "*.log"), ("include", "keep.log")], last_match_wins=True)
+
+        assert rules.filter(["keep.log", "drop.log"]) == ["keep.log"]
+
+    def test_substring_rules(self) -> None:
+        """*_containing rules test plain substrings."""
+        rules = lib_list.FilterRules([("exclude_containing", "/build/"), ("include_containing", "src")], default_include=False)
+
+        assert rules.filter(["src/a", "src/build/b", "docs/c"]) == ["src/a"]
+
+    def test_default_verdict_applies_without_match(self) -> None:
+        """default_include decides elements that no rule matches."""
+        rules = lib_list.FilterRules([("exclude", "*.tmp")], default_include=False)
+
+        assert rules.is_included("a.txt") is False
+
+    def test_iter_filter_streams_and_skips_non_strings(self) -> None:
+        """iter_filter consumes any iterable lazily and drops non-strings."""
+        rules = lib_list.FilterRules([("exclude", "b*")])
+
+        result = rules.iter_filter(iter(["a", 1, "b", None, "c"]))
+
+        assert list(result) == ["a", "c"]
+
+    def test_unknown_action_raises_value_error(self) -> None:
+        """An unknown rule action is rejected at construction."""
+        with pytest.raises(ValueError, match="unknown filter rule action"):
+            lib_list.FilterRules([("drop", "*")])
+
+    def test_matches_chained_helpers(self) -> None:
+        """One rule pass equals the chained filter_fnmatch / del_elements_containing pipeline."""
+        names = ["src/a.py", "src/.git/b.py", "src/c.txt", "tests/d.py"]
+        rules = lib_list.FilterRules([("exclude_containing", "/.git/"), ("include", "*.py")], default_include=False)
+
+        chained = lib_list.del_elements_containing(lib_list.filter_fnmatch(names, "*.py"), "/.git/")
+
+        assert rules.filter(names) == chained
+
+
 # ---------------------------------------------------------------------------
 # is_element_containing: Substring Presence Check
 # ---------------------------------------------------------------------------
@@ -273,6 +1002,12 @@ class TestIsFnmatchingOnePattern:
         """An empty element list returns False."""
         assert lib_list.is_fnmatching_one_pattern([], ["*"]) is False
 
+    def test_accepts_glob_set(self) -> None:
+        """A pre-built GlobSet can be passed instead of a pattern list."""
+        glob_set = lib_list.GlobSet(["*zz*", "*bc*"])
+
+        assert lib_list.is_fnmatching_one_pattern(["abc"], glob_set) is True
+
     def test_short_circuits_on_first_match(self) -> None:
         """Matching stops at the first successful pattern."""
         result = lib_list.is_fnmatching_one_pattern(["abc"], ["*a*", "*b*", "*c*"])
@@ -280,86 +1015,335 @@ class TestIsFnmatchingOnePattern:
         assert result is True
 
 
-# ---------------------------------------------------------------------------
-# substract_all_keep_sorting: In-Place Removal
-# ---------------------------------------------------------------------------
+# ---------------------------------------------------------------------------
+# substract_all_keep_sorting: In-Place Removal
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.os_agnostic
+class TestSubstractAllKeepSorting:
+    """substract_all_keep_sorting removes elements while preserving order."""
+
+    def test_mutates_and_returns_source(self) -> None:
+        """The function returns the same list object."""
+        minuend = ["a", "b", "b"]
+
+        result = lib_list.substract_all_keep_sorting(minuend, ["b"])
+
+        assert result is minuend
+
+    def test_removes_all_matching_elements(self) -> None:
+        """All occurrences of subtrahend elements are removed."""
+        minuend = ["a", "b", "b"]
+
+        lib_list.substract_all_keep_sorting(minuend, ["b"])
+
+        assert minuend == ["a"]
+
+    def test_empty_minuend_returns_empty(self) -> None:
+        """An empty minuend returns an empty list."""
+        assert lib_list.substract_all_keep_sorting([], ["a"]) == []
+
+    def test_empty_subtrahend_unchanged(self) -> None:
+        """An empty subtrahend leaves the minuend unchanged."""
+        minuend = ["a", "b"]
+
+        lib_list.substract_all_keep_sorting(minuend, [])
+
+        assert minuend == ["a", "b"]
+
+    def test_preserves_order(self) -> None:
+        """Element order is preserved after removal."""
+        minuend = ["c", "a", "b", "a"]
+
+        lib_list.substract_all_keep_sorting(minuend, ["a"])
+
+        assert minuend == ["c", "b"]
+
+    def test_key_removes_records_by_field(self) -> None:
+        """Records are compared by key and returned whole."""
+        records = [{"id": 1, "n": "x"}, {"id": 2, "n": "y"}, {"id": 1, "n": "z"}]
+
+        lib_list.substract_all_keep_sorting(records, [{"id": 1}], key=operator.itemgetter("id"))
+
+        assert records == [{"id": 2, "n": "y"}]
+
+    def test_key_is_called_once_per_element(self) -> None:
+        """Each element of either list has its key computed exactly once."""
+        calls: list[tuple[str, int]] = []
+
+        def second(pair: tuple[str, int]) -> int:
+            calls.append(pair)
+            return pair[1]
+
+        lib_list.substract_all_keep_sorting([("a", 1), ("b", 2)], [("x", 2)], key=second)
+
+        assert sorted(calls) == [("a", 1), ("b", 2), ("x", 2)]
+
+    def test_unhashable_values_are_compared_by_content(self) -> None:
+        """Dicts and lists no longer raise TypeError."""
+        minuend: list[Any] = [[1], {"a": 1}, [2]]
+
+        lib_list.substract_all_keep_sorting(minuend, [{"a": 1}])
+
+        assert minuend == [[1], [2]]
+
+    def test_low_memory_matches_default(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """low_memory=True compacts block by block with the same result."""
+        monkeypatch.setattr(lib_list, "_COMPACT_BLOCK_SIZE", 3)
+        minuend: list[Any] = ["a", "b", [1], "c", "b", "d", [1], "e"]
+
+        result = lib_list.substract_all_keep_sorting(minuend, ["b", [1]], low_memory=True)
+
+        assert result is minuend
+        assert minuend == ["a", "c", "d", "e"]
+
+    def test_low_memory_failure_keeps_list_consistent(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """A failing key leaves the survivors so far followed by the unprocessed rest."""
+        monkeypatch.setattr(lib_list, "_COMPACT_BLOCK_SIZE", 2)
+        minuend: list[Any] = ["a", "x", "b", "c", None, "d"]
+
+        with pytest.raises(TypeError):
+            lib_list.substract_all_keep_sorting(minuend, ["x"], key=str.lower, low_memory=True)
+
+        assert minuend == ["a", "b", "c", None, "d"]
+
+
+# ---------------------------------------------------------------------------
+# substract_all_unsorted_fast: Set Difference
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.os_agnostic
+class TestSubstractAllUnsortedFast:
+    """substract_all_unsorted_fast performs fast set difference."""
+
+    def test_removes_elements(self) -> None:
+        """Elements in subtrahend are removed from result."""
+        result = lib_list.substract_all_unsorted_fast(["a", "a", "b"], ["a"])
+
+        assert sorted(result) == ["b"]
+
+    def test_does_not_mutate_source(self) -> None:
+        """The source list is not modified."""
+        source = ["a", "a", "b"]
+
+        lib_list.substract_all_unsorted_fast(source, ["a"])
+
+        assert source == ["a", "a", "b"]
+
+    def test_empty_minuend_returns_empty(self) -> None:
+        """An empty minuend returns an empty list."""
+        result = lib_list.substract_all_unsorted_fast([], ["a"])
+
+        assert result == []
+
+    def test_deduplicates_result(self) -> None:
+        """The result contains only unique elements."""
+        result = lib_list.substract_all_unsorted_fast(["a", "a", "b", "b"], ["c"])
+
+        assert sorted(result) == ["a", "b"]
+
+    def test_key_keeps_first_record_per_surviving_key(self) -> None:
+        """With a key, one record per surviving key is returned."""
+        result = lib_list.substract_all_unsorted_fast([("a", 1), ("b", 2), ("c", 1)], [("x", 2)], key=operator.itemgetter(1))
+
+        assert result == [("a", 1)]
+
+
+# ---------------------------------------------------------------------------
+# sorted_* helpers: Merge-Based Set Algebra on Sorted Inputs
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.os_agnostic
+class TestSortedSetAlgebra:
+    """The sorted_* helpers walk pre-sorted inputs with two pointers."""
+
+    LEFT: tuple[str, ...] = ("a", "b", "b", "c", "d", "f")
+    RIGHT: tuple[str, ...] = ("b", "d", "d", "e")
+
+    def test_sorted_substract(self) -> None:
+        """Every occurrence of a right-hand value is removed."""
+        assert lib_list.sorted_substract(self.LEFT, self.RIGHT) == ["a", "c", "f"]
+
+    def test_sorted_intersect(self) -> None:
+        """Occurrences of shared values are kept from the left input."""
+        assert lib_list.sorted_intersect(self.LEFT, self.RIGHT) == ["b", "b", "d"]
+
+    def test_sorted_union(self) -> None:
+        """Both inputs merge into one sorted list of distinct values."""
+        assert lib_list.sorted_union(self.LEFT, self.RIGHT) == ["a", "b", "c", "d", "e", "f"]
+
+    def test_sorted_deduplicate(self) -> None:
+        """Adjacent repeats collapse to the first element."""
+        assert lib_list.sorted_deduplicate(self.LEFT) == ["a", "b", "c", "d", "f"]
+
+    def test_unhashable_orderable_values(self) -> None:
+        """Lists work because only < comparisons are used."""
+        left: list[Any] = [[1], [2], [2], [3]]
+
+        assert lib_list.sorted_substract(left, [[2]]) == [[1], [3]]
+        assert lib_list.sorted_deduplicate(left) == [[1], [2], [3]]
+
+    def test_key_orders_and_compares(self) -> None:
+        """A key function defines both the order and equality."""
+        records = [("a", 1), ("b", 2), ("c", 3)]
+
+        result = lib_list.sorted_substract(records, [("x", 2)], key=operator.itemgetter(1))
+
+        assert result == [("a", 1), ("c", 3)]
+
+    def test_unsorted_input_raises(self) -> None:
+        """A descent detected while walking raises ValueError."""
+        with pytest.raises(ValueError, match="minuend is not sorted"):
+            lib_list.sorted_substract(["b", "a"], ["a"])
+
+    def test_empty_inputs(self) -> None:
+        """Empty inputs produce the expected trivial results."""
+        assert lib_list.sorted_substract(["a"], []) == ["a"]
+        assert lib_list.sorted_intersect(["a"], []) == []
+        assert lib_list.sorted_union([], ["a"]) == ["a"]
+        assert lib_list.sorted_deduplicate([]) == []
+
+    @pytest.mark.parametrize(("elements", "expected"), [([], True), (["a"], True), (["a", "a", "b"], True), (["b", "a"], False)])
+    def test_is_sorted(self, elements: list[str], expected: bool) -> None:
+        """is_sorted reports ascending order, ties allowed."""
+        assert lib_list.is_sorted(elements) is expected
+
+
+# ---------------------------------------------------------------------------
+# intersect_keep_order, union_keep_order, symmetric_difference: N-ary Set Algebra
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.os_agnostic
+class TestNarySetAlgebra:
+    """The n-ary helpers combine any number of lists in one pass."""
+
+    def test_intersect_keeps_first_list_order_and_duplicates(self) -> None:
+        """Elements of the first list present everywhere else survive in order."""
+        result = lib_list.intersect_keep_order(["d", "a", "b", "a", "c"], ["a", "b", "c"], ["c", "a"])
+
+        assert result == ["a", "a", "c"]
+
+    def test_intersect_with_disjoint_list_is_empty(self) -> None:
+        """One disjoint list empties the intersection."""
+        assert lib_list.intersect_keep_order(["a", "b"], ["c"], ["a", "b"]) == []
+
+    def test_intersect_degenerate_arity(self) -> None:
+        """No lists give an empty list and a single list is copied."""
+        only = ["a", "b"]
+
+        assert lib_list.intersect_keep_order() == []
+        assert lib_list.intersect_keep_order(only) == only
+        assert lib_list.intersect_keep_order(only) is not only
+
+    def test_union_keeps_first_occurrences(self) -> None:
+        """Distinct values appear in the order they are first seen."""
+        assert lib_list.union_keep_order(["b", "a"], ["c", "a"], ["d", "b"]) == ["b", "a", "c", "d"]
 
+    def test_symmetric_difference_keeps_odd_memberships(self) -> None:
+        """Values contained in an odd number of lists survive; repeats within a list count once."""
+        result = lib_list.symmetric_difference(["a", "a", "b"], ["b", "c"], ["c", "a", "e"])
 
-@pytest.mark.os_agnostic
-class TestSubstractAllKeepSorting:
-    """substract_all_keep_sorting removes elements while preserving order."""
+        assert result == ["e"]
 
-    def test_mutates_and_returns_source(self) -> None:
-        """The function returns the same list object."""
-        minuend = ["a", "b", "b"]
+    def test_symmetric_difference_of_two_lists(self) -> None:
+        """For two lists the result is the classic symmetric difference."""
+        assert lib_list.symmetric_difference(["a", "b", "c"], ["b", "c", "d"]) == ["a", "d"]
 
-        result = lib_list.substract_all_keep_sorting(minuend, ["b"])
+    def test_unhashable_values(self) -> None:
+        """Dicts and lists are compared by content in every helper."""
+        first: list[Any] = [{"a": 1}, [1], [2]]
+        second: list[Any] = [[2], {"a": 1}, [3]]
 
-        assert result is minuend
+        assert lib_list.intersect_keep_order(first, second) == [{"a": 1}, [2]]
+        assert lib_list.union_keep_order(first, second) == [{"a": 1}, [1], [2], [3]]
+        assert lib_list.symmetric_difference(first, second) == [[1], [3]]
 
-    def test_removes_all_matching_elements(self) -> None:
-        """All occurrences of subtrahend elements are removed."""
-        minuend = ["a", "b", "b"]
 
-        lib_list.substract_all_keep_sorting(minuend, ["b"])
+# ---------------------------------------------------------------------------
+# find_near_duplicates, cluster_near_duplicates: MinHash LSH Similarity
+# ---------------------------------------------------------------------------
 
-        assert minuend == ["a"]
 
-    def test_empty_minuend_returns_empty(self) -> None:
-        """An empty minuend returns an empty list."""
-        assert lib_list.substract_all_keep_sorting([], ["a"]) == []
+@pytest.mark.os_agnostic
+class TestNearDuplicates:
+    """Near duplicates are proposed by LSH buckets and verified by exact Jaccard."""
 
-    def test_empty_subtrahend_unchanged(self) -> None:
-        """An empty subtrahend leaves the minuend unchanged."""
-        minuend = ["a", "b"]
+    NAMES: tuple[str, ...] = ("Quarterly report 2024.pdf", "quarterly  report 2024.PDF", "Quarterly report 2025.pdf", "invoice 0042.txt")
 
-        lib_list.substract_all_keep_sorting(minuend, [])
+    @staticmethod
+    def _jaccard(first: str, second: str) -> float:
+        left, right = ({text[offset : offset + 3] for offset in range(len(text) - 2)} for text in (first.casefold(), second.casefold()))
+        return len(left & right) / len(left | right)
 
-        assert minuend == ["a", "b"]
+    def test_pairs_report_exact_similarity(self) -> None:
+        """Case and whitespace variants score 1.0, a changed digit less."""
+        result = lib_list.find_near_duplicates(self.NAMES, threshold=0.7)
 
-    def test_preserves_order(self) -> None:
-        """Element order is preserved after removal."""
-        minuend = ["c", "a", "b", "a"]
+        assert result == [(0, 1, 1.0), (0, 2, 10 / 13), (1, 2, 10 / 13)]
 
-        lib_list.substract_all_keep_sorting(minuend, ["a"])
+    def test_threshold_excludes_weaker_pairs(self) -> None:
+        """Raising the threshold drops the pairs below it."""
+        assert lib_list.find_near_duplicates(self.NAMES, threshold=0.9) == [(0, 1, 1.0)]
 
-        assert minuend == ["c", "b"]
+    def test_matches_brute_force(self) -> None:
+        """On mutated copies of a few base strings every true pair is found and nothing else."""
+        bases = ("the quick brown fox jumps over", "lorem ipsum dolor sit amet etc", "pack my box with five dozen jugs")
+        elements = [base[:position] + "#" + base[position + 1 :] for base in bases for position in (3, 10, 17, 25)]
+        expected = [
+            (first, second) for first, second in itertools.combinations(range(len(elements)), 2) if self._jaccard(elements[first], elements[second]) >= 0.5
+        ]
 
+        result = lib_list.find_near_duplicates(elements, threshold=0.5)
 
-# ---------------------------------------------------------------------------
-# substract_all_unsorted_fast: Set Difference
-# ---------------------------------------------------------------------------
+        assert [(first, second) for first, second, _ in result] == expected
 
+    def test_results_do_not_depend_on_hash_seed(self) -> None:
+        """Interpreter runs with different string hash seeds report the same pairs."""
+        script = (
+            "from btx_lib_list import lib_list\n"
+            "bases = ('the quick brown fox jumps over', 'lorem ipsum dolor sit amet etc')\n"
+            "elements = [base[:position] + '#' + base[position + 1 :] for base in bases for position in range(0, 30, 2)]\n"
+            "print(lib_list.find_near_duplicates(elements, threshold=0.6, num_perm=32))\n"
+        )
 
-@pytest.mark.os_agnostic
-class TestSubstractAllUnsortedFast:
-    """substract_all_unsorted_fast performs fast set difference."""
+        environment = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
 
-    def test_removes_elements(self) -> None:
-        """Elements in subtrahend are removed from result."""
-        result = lib_list.substract_all_unsorted_fast(["a", "a", "b"], ["a"])
+        outputs = {
+            subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True, env={**environment, "PYTHONHASHSEED": seed}).stdout  # noqa: S603 - fixed script run with the current interpreter
+            for seed in ("1", "2", "3")
+        }
 
-        assert sorted(result) == ["b"]
+        assert len(outputs) == 1
 
-    def test_does_not_mutate_source(self) -> None:
-        """The source list is not modified."""
-        source = ["a", "a", "b"]
+    def test_clusters_in_first_occurrence_order(self) -> None:
+        """Clusters keep input order and strings without a partner are left out."""
+        elements = ["invoice 0042.txt", "Report 2024.pdf", "notes.md", "report 2024.PDF", "Invoice 0042.txt"]
 
-        lib_list.substract_all_unsorted_fast(source, ["a"])
+        result = lib_list.cluster_near_duplicates(elements)
 
-        assert source == ["a", "a", "b"]
+        assert result == [["invoice 0042.txt", "Invoice 0042.txt"], ["Report 2024.pdf", "report 2024.PDF"]]
 
-    def test_empty_minuend_returns_empty(self) -> None:
-        """An empty minuend returns an empty list."""
-        result = lib_list.substract_all_unsorted_fast([], ["a"])
+    def test_clusters_join_chains(self) -> None:
+        """Single linkage merges a chain even when its ends are dissimilar."""
+        result = lib_list.cluster_near_duplicates(list(self.NAMES[:3]), threshold=0.7)
 
-        assert result == []
+        assert result == [list(self.NAMES[:3])]
 
-    def test_deduplicates_result(self) -> None:
-        """The result contains only unique elements."""
-        result = lib_list.substract_all_unsorted_fast(["a", "a", "b", "b"], ["c"])
+    def test_short_strings_and_empty_input(self) -> None:
+        """Strings shorter than a shingle compare as a whole; no input gives no pairs."""
+        assert lib_list.find_near_duplicates(["ab", "AB", "ac"]) == [(0, 1, 1.0)]
+        assert lib_list.find_near_duplicates([]) == []
+        assert lib_list.cluster_near_duplicates([]) == []
 
-        assert sorted(result) == ["a", "b"]
+    @pytest.mark.parametrize("options", [{"threshold": 0}, {"threshold": 1.5}, {"shingle_size": 0}, {"num_perm": 0}])
+    def test_invalid_options_raise(self, options: dict[str, Any]) -> None:
+        """Thresholds outside (0, 1] and sizes below 1 are rejected."""
+        with pytest.raises(ValueError, match="must be"):
+            lib_list.find_near_duplicates(["a"], **options)
 
 
 # ---------------------------------------------------------------------------
@@ -400,6 +1384,16 @@ class TestLsDelEmptyElements:
         """An empty list returns an empty list."""
         assert lib_list.ls_del_empty_elements([]) == []
 
+    def test_in_place_compacts_the_input(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """in_place=True drops falsey values from the list itself."""
+        monkeypatch.setattr(lib_list, "_COMPACT_BLOCK_SIZE", 2)
+        original: list[Any] = ["", "a", None, 0, "b", "", "c"]
+
+        result = lib_list.ls_del_empty_elements(original, in_place=True)
+
+        assert result is original
+        assert original == ["a", "b", "c"]
+
 
 # ---------------------------------------------------------------------------
 # ls_double_quote_if_contains_blank: Quoting Spaces
@@ -644,6 +1638,21 @@ class TestLsRstripElements:
 # ---------------------------------------------------------------------------
 
 
+class _Version:
+    """Unhashable, totally ordered value without a frozen form."""
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __init__(self, number: int) -> None:
+        self.number = number
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Version) and other.number == self.number
+
+    def __lt__(self, other: _Version) -> bool:
+        return self.number < other.number
+
+
 @pytest.mark.os_agnostic
 class TestLsSubstract:
     """ls_substract removes single occurrences of elements."""
@@ -680,6 +1689,85 @@ class TestLsSubstract:
 
         assert minuend == ["c", "a", "b"]
 
+    def test_key_removes_first_records_per_key(self) -> None:
+        """With a key, the first k records sharing a removed key are dropped."""
+        minuend = [("a", 1), ("b", 1), ("c", 2), ("d", 1)]
+
+        lib_list.ls_substract(minuend, [("x", 1), ("y", 1)], key=operator.itemgetter(1))
+
+        assert minuend == [("c", 2), ("d", 1)]
+
+    def test_key_with_unhashable_keys(self) -> None:
+        """Unhashable keys are counted through their canonical frozen form."""
+        minuend: list[dict[str, Any]] = [{"k": {"a": 1}}, {"k": {"a": 1}}, {"k": 2}]
+
+        lib_list.ls_substract(minuend, [{"k": {"a": 1}}], key=operator.itemgetter("k"))
+
+        assert minuend == [{"k": {"a": 1}}, {"k": 2}]
+
+    def test_repeated_subtrahend_removes_first_occurrences(self) -> None:
+        """A value listed k times removes its first k occurrences."""
+        minuend = ["a", "b", "a", "c", "a"]
+
+        lib_list.ls_substract(minuend, ["a", "a", "z"])
+
+        assert minuend == ["b", "c", "a"]
+
+    def test_more_removals_than_occurrences(self) -> None:
+        """Extra removals of a value empty it out without error."""
+        minuend = ["a", "b"]
+
+        lib_list.ls_substract(minuend, ["a", "a", "a"])
+
+        assert minuend == ["b"]
+
+    def test_unhashable_orderable_values(self) -> None:
+        """Lists are compared by content and their first occurrences removed."""
+        first, second, third = [1], [2], [1]
+        minuend: list[Any] = [first, second, third]
+
+        lib_list.ls_substract(minuend, [[1]])
+
+        assert minuend == [[2], [1]]
+        assert minuend[1] is third
+
+    def test_unhashable_unorderable_values(self) -> None:
+        """Dicts are compared by content and their first occurrences removed."""
+        minuend: list[Any] = [{"a": 1}, {"b": 2}, {"a": 1}]
+
+        lib_list.ls_substract(minuend, [{"a": 1}])
+
+        assert minuend == [{"b": 2}, {"a": 1}]
+
+    @pytest.mark.parametrize(
+        ("minuend", "subtrahend", "expected"),
+        [
+            ([{1}, {2}], [{2}], [{1}]),
+            ([{1}, {2}, {3}], [{3}], [{1}, {2}]),
+            ([{1, 2}, {1}, {1}], [{1}], [{1, 2}, {1}]),
+            ([[{1}], [{2}]], [[{2}]], [[{1}]]),
+        ],
+    )
+    def test_sets_are_matched_by_equality_not_subset_order(self, minuend: list[Any], subtrahend: list[Any], expected: list[Any]) -> None:
+        """Sets, whose < means proper subset, are only removed when equal."""
+        lib_list.ls_substract(minuend, subtrahend)
+
+        assert minuend == expected
+
+    def test_orderable_values_without_frozen_form_use_sorted_merge(self) -> None:
+        """Unhashable objects with a total order are subtracted by sorted merge."""
+        minuend: list[Any] = [_Version(2), _Version(1), _Version(2)]
+
+        lib_list.ls_substract(minuend, [_Version(2)])
+
+        assert minuend == [_Version(1), _Version(2)]
+
+    def test_empty_subtrahend_keeps_list(self) -> None:
+        """An empty subtrahend returns the untouched minuend."""
+        minuend = ["a"]
+
+        assert lib_list.ls_substract(minuend, []) is minuend
+
 
 # ---------------------------------------------------------------------------
 # split_list_into_junks: Chunk Splitting
@@ -740,6 +1828,429 @@ class TestSplitListIntoJunks:
 
         assert lib_list.split_list_into_junks(data, junk_size=junk_size) == expected
 
+    def test_single_chunk_is_the_source_list(self) -> None:
+        """A list that fits into one chunk is returned itself, not copied."""
+        data = [1, 2, 3]
+
+        parts = lib_list.split_list_into_junks(data, junk_size=3)
+
+        assert parts[0] is data
+
+    def test_chunks_do_not_alias_the_source(self) -> None:
+        """Once split, every chunk is a fresh slice."""
+        data = list(range(5))
+
+        parts = lib_list.split_list_into_junks(data, junk_size=2)
+
+        assert all(part is not data for part in parts)
+
+
+# ---------------------------------------------------------------------------
+# iter_junks: Lazy Batching
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.os_agnostic
+class TestIterJunks:
+    """iter_junks yields batches lazily from any iterable."""
+
+    def test_batches_a_list(self) -> None:
+        """Lists are sliced into batches with a shorter final batch."""
+        assert list(lib_list.iter_junks(list(range(7)), junk_size=3)) == [[0, 1, 2], [3, 4, 5], [6]]
+
+    def test_batches_a_generator_lazily(self) -> None:
+        """Only the elements of the requested batch are consumed."""
+        source = itertools.count()
+
+        batches = lib_list.iter_junks(source, junk_size=2)
+
+        assert next(batches) == [0, 1]
+        assert next(source) == 2
+
+    @pytest.mark.parametrize("source", [(), "", iter([])])
+    def test_empty_source_yields_nothing(self, source: Any) -> None:
+        """An empty iterable produces no batches."""
+        assert list(lib_list.iter_junks(source, junk_size=2)) == []
+
+    def test_non_list_iterables_yield_lists(self) -> None:
+        """Tuples and strings are batched into lists as well."""
+        assert list(lib_list.iter_junks("abcde", junk_size=2)) == [["a", "b"], ["c", "d"], ["e"]]
+        assert list(lib_list.iter_junks((1, 2, 3))) == [[1, 2, 3]]
+
+    def test_invalid_size_raises_on_call(self) -> None:
+        """junk_size is validated before the first batch is requested."""
+        with pytest.raises(ValueError, match="junk_size"):
+            lib_list.iter_junks([1], junk_size=0)
+
+    def test_views_reference_the_source(self) -> None:
+        """as_views batches read through to the source list without copying it."""
+        data = list(range(5))
+
+        views = list(lib_list.iter_junks(data, junk_size=2, as_views=True))
+        data[4] = 40
+
+        assert [view.tolist() for view in views] == [[0, 1], [2, 3], [40]]
+
+    def test_views_need_a_list(self) -> None:
+        """Views cannot be taken of an iterator."""
+        source: Any = iter([1])
+
+        with pytest.raises(TypeError, match="as_views needs a list"):
+            lib_list.iter_junks(source, as_views=True)
+
+    def test_split_list_into_views(self) -> None:
+        """split_list_into_junks returns views, including for a single chunk."""
+        data = [1, 2, 3]
+
+        assert lib_list.split_list_into_junks(data, junk_size=2, as_views=True) == [[1, 2], [3]]
+        assert isinstance(lib_list.split_list_into_junks(data, as_views=True)[0], lib_list.ListView)
+
+    @pytest.mark.parametrize("as_views", [False, True])
+    def test_split_empty_list_gives_one_chunk(self, as_views: bool) -> None:
+        """An empty list comes back as one empty chunk whether or not views are requested."""
+        result = lib_list.split_list_into_junks([], junk_size=3, as_views=as_views)
+
+        assert result == [[]]
+
+
+# ---------------------------------------------------------------------------
+# ListView: Zero-Copy Slices
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.os_agnostic
+class TestListView:
+    """ListView behaves like a read-only slice of its base list."""
+
+    BASE: tuple[int, ...] = tuple(range(10))
+
+    @pytest.mark.parametrize(
+        "bounds",
+        [(None, None, None), (2, 8, None), (-3, None, None), (None, None, 3), (8, 1, -2), (None, None, -1), (5, 5, None), (-100, None, -1), (20, 30, None)],
+    )
+    def test_matches_list_slicing(self, bounds: tuple[int | None, int | None, int | None]) -> None:
+        """Length, iteration, reversal and tolist agree with base[start:stop:step]."""
+        base = list(self.BASE)
+        expected = base[slice(*bounds)]
+
+        view = lib_list.ListView(base, *bounds)
+
+        assert len(view) == len(expected)
+        assert list(view) == expected
+        assert list(reversed(view)) == expected[::-1]
+        assert view.tolist() == expected
+
+    def test_indexing_and_nested_slices(self) -> None:
+        """Indices read through to the base; slices give views of the same base."""
+        view = lib_list.ListView(list(self.BASE), 2, 9)
+
+        nested = view[1::2]
+
+        assert (view[0], view[-1]) == (2, 8)
+        assert isinstance(nested, lib_list.ListView)
+        assert nested.tolist() == [3, 5, 7]
+        assert nested[::-1].tolist() == [7, 5, 3]
+
+    def test_index_out_of_range_raises(self) -> None:
+        """Indices beyond the view raise IndexError, even if the base is longer."""
+        view = lib_list.ListView(list(self.BASE), 0, 3)
+
+        with pytest.raises(IndexError):
+            _ = view[3]
+
+    def test_sequence_protocol(self) -> None:
+        """Membership, index and count come from the Sequence mixins."""
+        view = lib_list.ListView(["a", "b", "a", "c"], 1)
+
+        assert "a" in view
+        assert view.index("c") == 2
+        assert view.count("a") == 1
+
+    def test_equality_and_hashing(self) -> None:
+        """Views equal lists and views with the same elements and are unhashable like lists."""
+        view = lib_list.ListView([1, 2, 3], 1)
+
+        assert view == [2, 3]
+        assert view == lib_list.ListView([0, 2, 3], 1)
+        assert view != [2]
+        assert view != (2, 3)
+        with pytest.raises(TypeError):
+            hash(view)
+
+    def test_tolist_is_a_copy(self) -> None:
+        """tolist returns a new list that does not alias the base."""
+        base = [1, 2, 3]
+
+        copied = lib_list.ListView(base).tolist()
+        copied.append(4)
+
+        assert base == [1, 2, 3]
+
+
+# ---------------------------------------------------------------------------
+# split_by_weight: Size-Capped Batches
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.os_agnostic
+class TestSplitByWeight:
+    """split_by_weight packs consecutive elements under a weight cap."""
+
+    def test_packs_by_length(self) -> None:
+        """Batches are closed before the next element would exceed the cap."""
+        result = lib_list.split_by_weight(["aaa", "bb", "c", "dd", "eeee"], max_weight=5)
+
+        assert result == [["aaa", "bb"], ["c", "dd"], ["eeee"]]
+
+    def test_oversized_element_is_isolated(self) -> None:
+        """An element heavier than the cap gets a batch of its own between its neighbours."""
+        result = lib_list.split_by_weight(["a", "b" * 10, "c"], max_weight=3)
+
+        assert result == [["a"], ["b" * 10], ["c"]]
+
+    def test_custom_weight_counts_bytes(self) -> None:
+        """A byte-length weight respects multi-byte characters."""
+        result = lib_list.split_by_weight(["ä", "ö", "ab"], max_weight=4, weight=lambda text: len(text.encode()))
+
+        assert result == [["ä", "ö"], ["ab"]]
+
+    def test_zero_weights_and_exact_fit(self) -> None:
+        """Weight-free elements join the current batch and an exact fit stays in one batch."""
+        result = lib_list.split_by_weight([2, 0, 3, 0], max_weight=5, weight=lambda number: number)
+
+        assert result == [[2, 0, 3, 0]]
+
+    def test_every_batch_within_cap(self) -> None:
+        """All multi-element batches respect the cap and concatenate back to the source."""
+        source = [text * size for size, text in zip((1, 7, 2, 9, 4, 4, 1, 12, 3), "abcdefghi", strict=True)]
+
+        result = lib_list.split_by_weight(iter(source), max_weight=8)
+
+        assert [element for batch in result for element in batch] == source
+        assert all(sum(map(len, batch)) <= 8 for batch in result if len(batch) > 1)
+
+    def test_empty_source(self) -> None:
+        """No elements give no batches."""
+        assert lib_list.split_by_weight([], max_weight=1) == []
+
+    def test_invalid_cap_raises(self) -> None:
+        """max_weight must be positive."""
+        with pytest.raises(ValueError, match="max_weight"):
+            lib_list.split_by_weight(["a"], max_weight=0)
+
+    def test_negative_weight_raises(self) -> None:
+        """A negative element weight is rejected."""
+        with pytest.raises(ValueError, match="weight must be >= 0"):
+            lib_list.split_by_weight([1, -1], max_weight=5, weight=lambda number: number)
+
+
+# ---------------------------------------------------------------------------
+# partition_balanced: N-Way Load Balancing
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.os_agnostic
+class TestPartitionBalanced:
+    """partition_balanced returns exactly n partitions of near-equal load."""
+
+    COSTS: tuple[int, ...] = (7, 1, 1, 1, 6, 2, 2, 3, 9, 4)
+
+    @staticmethod
+    def _cost(value: float) -> float:
+        return value
+
+    @pytest.mark.parametrize(("length", "n", "sizes"), [(7, 3, [3, 2, 2]), (6, 3, [2, 2, 2]), (2, 4, [1, 1, 0, 0]), (0, 2, [0, 0])])
+    def test_counts_differ_by_at_most_one(self, length: int, n: int, sizes: list[int]) -> None:
+        """Unweighted partitions are contiguous slices with near-equal lengths."""
+        result = lib_list.partition_balanced(range(length), n)
+
+        assert [len(part) for part in result] == sizes
+        assert [element for part in result for element in part] == list(range(length))
+
+    def test_lpt_balances_totals(self) -> None:
+        """Weighted partitions hold every element once, in input order, with close totals."""
+        result = lib_list.partition_balanced(self.COSTS, 3, weight=self._cost)
+
+        assert sorted(element for part in result for element in part) == sorted(self.COSTS)
+        assert all(part == sorted(part, key=self.COSTS.index) for part in result)
+        assert [sum(part) for part in result] == [12, 12, 12]
+
+    def test_lpt_spreads_zero_weights(self) -> None:
+        """Tied loads go to the partition with fewer elements, so zero weights are shared out."""
+        result = lib_list.partition_balanced(range(6), 3, weight=lambda _: 0)
+
+        assert [len(part) for part in result] == [2, 2, 2]
+
+    def test_lpt_fills_every_partition(self) -> None:
+        """With at least n elements no partition stays empty, even when some weigh nothing."""
+        result = lib_list.partition_balanced([0, 3, 8, 0, 3], 5, weight=self._cost)
+
+        assert sorted(len(part) for part in result) == [1, 1, 1, 1, 1]
+
+    def test_contiguous_cut_is_optimal(self) -> None:
+        """The contiguous split minimises the largest total over all cut positions."""
+        costs = list(self.COSTS)
+        best = min(
+            max(sum(costs[start:stop]) for start, stop in itertools.pairwise((0, *cuts, len(costs))))
+            for cuts in itertools.combinations(range(1, len(costs)), 2)
+        )
+
+        result = lib_list.partition_balanced(costs, 3, weight=self._cost, contiguous=True)
+
+        assert [element for part in result for element in part] == costs
+        assert max(sum(part) for part in result) == best
+
+    def test_contiguous_float_weights(self) -> None:
+        """Float weights are cut at the optimum too."""
+        result = lib_list.partition_balanced([0.5, 0.25, 0.25, 1.0], 2, weight=self._cost, contiguous=True)
+
+        assert result == [[0.5, 0.25, 0.25], [1.0]]
+
+    def test_contiguous_fills_every_partition(self) -> None:
+        """Zero weights and large elements still give n non-empty runs when possible."""
+        result = lib_list.partition_balanced([0, 0, 0, 10], 3, weight=self._cost, contiguous=True)
+
+        assert result == [[0, 0], [0], [10]]
+
+    def test_fewer_elements_than_partitions(self) -> None:
+        """Missing elements leave the trailing partitions empty."""
+        assert lib_list.partition_balanced(["a"], 3, weight=len) == [["a"], [], []]
+        assert lib_list.partition_balanced(["a"], 3, weight=len, contiguous=True) == [["a"], [], []]
+
+    def test_invalid_arguments_raise(self) -> None:
+        """n below one and negative weights are rejected."""
+        with pytest.raises(ValueError, match="n must be"):
+            lib_list.partition_balanced([1], 0)
+        with pytest.raises(ValueError, match="weight must be"):
+            lib_list.partition_balanced([1, -1], 2, weight=self._cost)
+
+
+# ---------------------------------------------------------------------------
+# map_junks: Parallel Batch Processing
+# ---------------------------------------------------------------------------
+
+
+def _fail_on_batch_with_three(batch: list[int]) -> int:
+    if 3 in batch:
+        msg = "three"
+        raise KeyError(msg)
+    return sum(batch)
+
+
+@pytest.mark.os_agnostic
+class TestMapJunks:
+    """map_junks runs a function over batches in a pool with bounded look-ahead."""
+
+    def test_results_in_batch_order(self) -> None:
+        """Ordered mode yields one result per batch in input order."""
+        result = list(lib_list.map_junks(sum, range(10), junk_size=3, workers=3))
+
+        assert result == [3, 12, 21, 9]
+
+    def test_unordered_yields_every_result(self) -> None:
+        """Unordered mode yields the same results, possibly reordered."""
+        result = lib_list.map_junks(sum, range(10), junk_size=3, workers=3, ordered=False)
+
+        assert sorted(result) == [3, 9, 12, 21]
+
+    def test_process_pool(self) -> None:
+        """A process pool receives list batches and returns their results."""
+        result = list(lib_list.map_junks(sum, range(10), junk_size=4, executor="process", workers=2))
+
+        assert result == [6, 22, 17]
+
+    def test_existing_executor_is_left_running(self) -> None:
+        """A caller-owned executor is used and not shut down."""
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            result = list(lib_list.map_junks(len, "abcde", junk_size=2, executor=executor))
+
+            assert result == [2, 2, 1]
+            assert executor.submit(len, "ab").result() == 2
+
+    def test_own_pool_lives_only_while_iterating(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """The pool is created on first iteration and shut down once iteration ends."""
+        events: list[str] = []
+
+        class RecordingPool(concurrent.futures.ThreadPoolExecutor):
+            def __init__(self, max_workers: int | None = None) -> None:
+                events.append("created")
+                super().__init__(max_workers=max_workers)
+
+            def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:  # noqa: FBT002 - mirrors Executor.shutdown
+                events.append("shut down")
+                super().shutdown(wait=wait, cancel_futures=cancel_futures)
+
+        monkeypatch.setattr(concurrent.futures, "ThreadPoolExecutor", RecordingPool)
+
+        lib_list.map_junks(len, "abc", junk_size=2)
+        results = lib_list.map_junks(len, "abc", junk_size=2)
+        created_before_iteration = list(events)
+        values = list(results)
+
+        assert created_before_iteration == []
+        assert values == [2, 1]
+        assert events == ["created", "shut down"]
+
+    def test_failure_carries_batch_index(self) -> None:
+        """A worker exception surfaces as JunkProcessingError with the batch index and cause."""
+        with pytest.raises(lib_list.JunkProcessingError, match="batch 1 failed") as caught:
+            list(lib_list.map_junks(_fail_on_batch_with_three, range(10), junk_size=2))
+
+        assert caught.value.batch_index == 1
+        assert isinstance(caught.value.__cause__, KeyError)
+
+    def test_results_before_the_failure_are_yielded(self) -> None:
+        """Batches ahead of the failing one are still delivered in ordered mode."""
+        results = lib_list.map_junks(_fail_on_batch_with_three, range(10), junk_size=2)
+
+        assert next(results) == 1
+        with pytest.raises(lib_list.JunkProcessingError):
+            next(results)
+
+    def test_in_flight_window_bounds_consumption(self) -> None:
+        """The source is read no further than max_in_flight batches ahead of the consumer."""
+        consumed = itertools.count()
+        source = (next(consumed) for _ in range(100))
+
+        results = lib_list.map_junks(len, source, junk_size=10, max_in_flight=2)
+        first = next(results)
+
+        assert next(consumed) <= 30
+        assert first + sum(results) == 100
+
+    def test_in_flight_window_bounds_concurrency(self) -> None:
+        """No more than max_in_flight batches run at once."""
+        lock = threading.Lock()
+        running: list[int] = [0, 0]
+
+        def track(batch: list[int]) -> int:
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.001)
+            with lock:
+                running[0] -= 1
+            return len(batch)
+
+        result = list(lib_list.map_junks(track, range(40), junk_size=2, workers=8, max_in_flight=3))
+
+        assert result == [2] * 20
+        assert running[1] <= 3
+
+    @pytest.mark.parametrize(
+        "options",
+        [{"junk_size": 0}, {"workers": 0}, {"max_in_flight": 0}, {"executor": "fiber"}],
+    )
+    def test_invalid_options_raise_on_call(self, options: dict[str, Any]) -> None:
+        """Invalid arguments raise ValueError before any batch is submitted."""
+        with pytest.raises(ValueError):
+            lib_list.map_junks(len, [1], **options)
+
+    def test_workers_with_existing_executor_raises(self) -> None:
+        """workers cannot resize a caller-owned executor."""
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor, pytest.raises(ValueError, match="workers only applies"):
+            lib_list.map_junks(len, [1], executor=executor, workers=2)
+
 
 # ---------------------------------------------------------------------------
 # str_in_list_lower_and_de_double: Normalize, Then Dedupe
@@ -773,6 +2284,49 @@ class TestStrInListLowerAndDeDouble:
         assert set(result) == {"hello", "world"}
 
 
+# ---------------------------------------------------------------------------
+# str_in_list_de_double_non_case_sensitive: First Spelling Wins
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.os_agnostic
+class TestStrInListDeDoubleNonCaseSensitive:
+    """Case-insensitive deduplication keeps the first original string in order."""
+
+    def test_keeps_first_spelling_in_input_order(self) -> None:
+        """Later case variants are dropped; survivors keep their position and casing."""
+        result = lib_list.str_in_list_de_double_non_case_sensitive(["Beta", "alpha", "BETA", "Alpha", "gamma"])
+
+        assert result == ["Beta", "alpha", "gamma"]
+
+    def test_casefold_matches_sharp_s(self) -> None:
+        """casefold treats 'ß' and 'SS' as equal, which lower() would not."""
+        assert lib_list.str_in_list_de_double_non_case_sensitive(["Straße", "STRASSE"]) == ["Straße"]
+
+    def test_without_normalisation_composed_forms_differ(self) -> None:
+        """Composed and decomposed accents stay distinct unless a form is requested."""
+        elements = ["Café", "CAFE\u0301"]
+
+        assert lib_list.str_in_list_de_double_non_case_sensitive(elements) == elements
+        assert lib_list.str_in_list_de_double_non_case_sensitive(elements, normalize_form="NFC") == ["Café"]
+
+    def test_nfkc_folds_compatibility_characters(self) -> None:
+        """NFKC folds full-width letters that NFC keeps apart."""
+        elements = ["\uff21\uff22\uff23", "abc"]
+
+        assert lib_list.str_in_list_de_double_non_case_sensitive(elements, normalize_form="NFC") == elements
+        assert lib_list.str_in_list_de_double_non_case_sensitive(elements, normalize_form="NFKC") == ["\uff21\uff22\uff23"]
+
+    def test_empty_list_returns_new_empty_list(self) -> None:
+        """An empty input gives an empty result."""
+        assert lib_list.str_in_list_de_double_non_case_sensitive([]) == []
+
+    def test_unknown_form_raises(self) -> None:
+        """Only the four unicodedata forms are accepted."""
+        with pytest.raises(ValueError, match="unknown normalize_form"):
+            lib_list.str_in_list_de_double_non_case_sensitive([], normalize_form="NFX")
+
+
 # ---------------------------------------------------------------------------
 # str_in_list_non_case_sensitive: Case-Insensitive Check
 # ---------------------------------------------------------------------------